@@ -0,0 +1,84 @@
+"""
+Run the benchmarks, each in a process of its own, and write their results
+with a description of the environment as one JSON document::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks rpc serializers
+
+Documents of successive releases can be compared to track regressions.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from importlib import metadata
+
+BENCHMARKS = ('client_dispatch', 'servicer', 'serializers', 'rpc', 'registration', 'list_stream')
+PACKAGES = ('django', 'djangorestframework', 'grpcio', 'protobuf')
+
+
+def get_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def get_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_environment():
+    return {
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'packages': {package: get_version(package) for package in PACKAGES},
+    }
+
+
+def run_benchmark(name):
+    process = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', f'benchmarks.{name}'], capture_output=True, text=True,
+    )
+    if process.returncode:
+        sys.stderr.write(process.stderr)
+        return {'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'failed'}
+    return json.loads(process.stdout)['results']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[0])
+    parser.add_argument('benchmarks', nargs='*', help=f'benchmarks to run among {", ".join(BENCHMARKS)}, all by default')
+    parser.add_argument('--output', help='file to write the results to, standard output by default')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+
+    document = {'environment': get_environment(), 'benchmarks': {}}
+    for name in args.benchmarks or BENCHMARKS:
+        sys.stderr.write(f'running {name}\n')
+        document['benchmarks'][name] = run_benchmark(name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 1 if any('error' in results for results in document['benchmarks'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Per-call Python overhead of the client dispatch, with the network call
+replaced by a handler returning a prebuilt response::
+
+    python -m benchmarks.client_dispatch
+"""
+from benchmarks.utils import measure, report, setup
+
+setup()
+
+from grpc_health.v1 import health_pb2  # noqa: E402
+
+from django_grpc_bus.client.client import ServiceClient, StubClient  # noqa: E402
+
+SERVICE = 'grpc.health.v1.Health'
+METHOD = 'Check'
+NUMBER = 100000
+
+
+def get_client():
+    client = StubClient(
+        'localhost:50051',
+        service_descriptors=[health_pb2.DESCRIPTOR.services_by_name['Health']],
+    )
+    response = health_pb2.HealthCheckResponse(status=health_pb2.HealthCheckResponse.SERVING)
+    methods_meta = client._service_methods_meta[SERVICE]
+    methods_meta[METHOD] = methods_meta[METHOD]._replace(handler=lambda request, **kwargs: response)
+    return client
+
+
+def main():
+    client = get_client()
+    service = ServiceClient(client=client, service_name=SERVICE)
+    request = health_pb2.HealthCheckRequest(service='')
+    results = {
+        'client.request': measure(lambda: client.request(SERVICE, METHOD, request, raw_output=True), NUMBER),
+        'service_client.method': measure(lambda: service.Check(request, raw_output=True), NUMBER),
+        'client.request_dict': measure(lambda: client.request(SERVICE, METHOD, {'service': ''}), NUMBER),
+        'service_client.method_dict': measure(lambda: service.Check({'service': ''}), NUMBER),
+    }
+    report('client_dispatch', {name: {'us_per_call': round(value, 3)} for name, value in results.items()})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Time to the first message, total time and peak Python memory of
+``ListModelMixin.list`` over large SQLite tables, by ``list_chunk_size``
+(``0`` reads the whole queryset at once)::
+
+    python -m benchmarks.list_stream
+
+The servicer is called directly, so the figures leave out the network.
+"""
+import datetime
+import decimal
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.utils import build_proto_module, report, setup
+
+setup(database=os.path.join(tempfile.mkdtemp(prefix='django_grpc_bus_benchmarks_'), 'list.sqlite3'))
+
+from django.utils import timezone  # noqa: E402
+
+from benchmarks.models import Narrow, Tag, Wide  # noqa: E402
+from django_grpc_bus.generics import ModelService  # noqa: E402
+from django_grpc_bus.serializers import CompiledModelProtoSerializer  # noqa: E402
+
+NARROW_ROWS = 100000
+WIDE_ROWS = 20000
+CHUNK_SIZES = (100, 1000, 0)
+BATCH_SIZE = 5000
+
+
+class Context:
+    def set_trailing_metadata(self, trailing_metadata):
+        pass
+
+    def abort(self, code, details):
+        raise RuntimeError(code, details)
+
+    def time_remaining(self):
+        return None
+
+
+def create_objects():
+    tags = Tag.objects.bulk_create([Tag(name=f'tag{i}') for i in range(5)])
+    Narrow.objects.bulk_create(
+        [Narrow(name=f'narrow{i}', quantity=i) for i in range(NARROW_ROWS)], batch_size=BATCH_SIZE
+    )
+    parent = Narrow.objects.first()
+    now = timezone.now()
+    Wide.objects.bulk_create([
+        Wide(
+            name=f'wide{i}', title='A wide row ' * 4, slug=f'wide-{i}', email=f'wide{i}@example.com',
+            url='https://example.com/', description='description ' * 20, status='published',
+            quantity=i, rank=i, views=i * 1000, ratio=i / 3, price=decimal.Decimal('19.99'),
+            weight=decimal.Decimal('1.250'), day=now.date(), time=now.time(), created=now, updated=now,
+            duration=datetime.timedelta(minutes=i), ip='127.0.0.1', parent=parent,
+        )
+        for i in range(WIDE_ROWS)
+    ], batch_size=BATCH_SIZE)
+    through = Wide.tags.through
+    through.objects.bulk_create([
+        through(wide_id=pk, tag_id=tag.pk)
+        for pk in Wide.objects.values_list('pk', flat=True) for tag in tags[:3]
+    ], batch_size=BATCH_SIZE)
+
+
+def get_service_class(model, proto_class):
+    meta = type('Meta', (), {'model': model, 'proto_class': proto_class, 'fields': '__all__'})
+    serializer_class = type(f'{model.__name__}Serializer', (CompiledModelProtoSerializer,), {'Meta': meta})
+    return type(f'{model.__name__}Service', (ModelService,), {
+        'queryset': model.objects.all(),
+        'serializer_class': serializer_class,
+    })
+
+
+def run_list(servicer, request):
+    start = time.perf_counter()
+    messages = servicer.list(request, Context())
+    next(messages)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in messages)
+    return first, time.perf_counter() - start, count
+
+
+def bench_model(model):
+    pb2 = build_proto_module(model)
+    service_class = get_service_class(model, getattr(pb2, f'{model.__name__}Data'))
+    request = getattr(pb2, f'{model.__name__}ListRequest')()
+    results = {}
+    for chunk_size in CHUNK_SIZES:
+        servicer = type(service_class.__name__, (service_class,), {'list_chunk_size': chunk_size}).as_servicer()
+        run_list(servicer, request)
+        first, total, count = run_list(servicer, request)
+
+        tracemalloc.start()
+        run_list(servicer, request)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[f'chunk_size_{chunk_size}'] = {
+            'messages': count,
+            'first_message_ms': round(first * 1e3, 3),
+            'total_ms': round(total * 1e3, 3),
+            'peak_memory_mb': round(peak / 2 ** 20, 3),
+        }
+    return results
+
+
+def main():
+    create_objects()
+    report('list_stream', {'narrow': bench_model(Narrow), 'wide': bench_model(Wide)})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Models used by the benchmarks, ``Narrow`` has a handful of columns and
+``Wide`` covers every field type the proto generator maps.
+"""
+import uuid
+
+from django.db import models
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=32)
+
+
+class Narrow(models.Model):
+    name = models.CharField(max_length=64)
+    quantity = models.IntegerField(default=0)
+    active = models.BooleanField(default=True)
+
+
+class Wide(models.Model):
+    name = models.CharField(max_length=64)
+    title = models.CharField(max_length=128)
+    slug = models.SlugField()
+    email = models.EmailField()
+    url = models.URLField()
+    description = models.TextField()
+    status = models.CharField(max_length=16, choices=[('draft', 'Draft'), ('published', 'Published')])
+    quantity = models.IntegerField(default=0)
+    rank = models.PositiveIntegerField(default=0)
+    views = models.BigIntegerField(default=0)
+    ratio = models.FloatField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    weight = models.DecimalField(max_digits=8, decimal_places=3, default=0)
+    active = models.BooleanField(default=True)
+    featured = models.BooleanField(default=False)
+    uuid = models.UUIDField(default=uuid.uuid4)
+    day = models.DateField()
+    time = models.TimeField()
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+    duration = models.DurationField()
+    ip = models.GenericIPAddressField()
+    parent = models.ForeignKey(Narrow, null=True, on_delete=models.SET_NULL)
+    tags = models.ManyToManyField(Tag)
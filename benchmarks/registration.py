@@ -0,0 +1,116 @@
+"""
+Cold start of a ``ReflectionClient`` against a service whose messages sit at
+the top of a deep tree of proto files (``DEPTH`` levels of ``WIDTH`` files,
+each importing every file of the level below), resolved through reflection,
+loaded from a warm descriptor cache, or registered lazily::
+
+    python -m benchmarks.registration
+"""
+import importlib
+import os
+import tempfile
+from concurrent import futures
+
+from benchmarks.utils import compile_protos, measure_each, report, setup, summarize
+
+setup()
+
+import grpc  # noqa: E402
+from google.protobuf import descriptor_pool, symbol_database  # noqa: E402
+from grpc_reflection.v1alpha import reflection  # noqa: E402
+
+from django_grpc_bus.client.client import ReflectionClient  # noqa: E402
+from django_grpc_bus.client.descriptor_cache import DescriptorCache  # noqa: E402
+
+DEPTH = 10
+WIDTH = 3
+NUMBER = 20
+PACKAGE = 'benchmarks.registration'
+SERVICE = f'{PACKAGE}.Deep'
+
+
+def write_protos(directory):
+    """Write the proto tree, return the file names, the service file last."""
+    file_names = []
+    below = []
+    for level in range(DEPTH):
+        names = []
+        for index in range(WIDTH):
+            name = f'level{level}_{index}'
+            imports = ''.join(f'import "{dependency}.proto";\n' for dependency in below)
+            fields = ''.join(
+                f'    {dependency.capitalize()} {dependency} = {number};\n'
+                for number, dependency in enumerate(below, start=1)
+            )
+            with open(os.path.join(directory, f'{name}.proto'), 'w') as f:
+                f.write(
+                    f'syntax = "proto3";\npackage {PACKAGE};\n{imports}\n'
+                    f'message {name.capitalize()} {{\n{fields}'
+                    f'    string name = {len(below) + 1};\n    int64 value = {len(below) + 2};\n}}\n'
+                )
+            names.append(name)
+        file_names.extend(f'{name}.proto' for name in names)
+        below = names
+
+    imports = ''.join(f'import "{dependency}.proto";\n' for dependency in below)
+    methods = ''.join(
+        f'    rpc Get{dependency.capitalize()}({dependency.capitalize()}) returns ({dependency.capitalize()}) {{}}\n'
+        for dependency in below
+    )
+    with open(os.path.join(directory, 'deep.proto'), 'w') as f:
+        f.write(f'syntax = "proto3";\npackage {PACKAGE};\n{imports}\nservice Deep {{\n{methods}}}\n')
+    return file_names + ['deep.proto']
+
+
+def start_server():
+    directory = tempfile.mkdtemp(prefix='django_grpc_bus_benchmarks_')
+    file_names = write_protos(directory)
+    compile_protos(directory, file_names)
+    # Importing the service module adds the whole tree to the default pool
+    # served by reflection.
+    importlib.import_module('deep_pb2')
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    reflection.enable_server_reflection([SERVICE, reflection.SERVICE_NAME], server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    return server, f'127.0.0.1:{port}', len(file_names)
+
+
+def new_client(endpoint, **kwargs):
+    """A client with a pool of its own, as in a new process."""
+    pool = descriptor_pool.DescriptorPool()
+    client = ReflectionClient(
+        endpoint, descriptor_pool=pool, symbol_db=symbol_database.SymbolDatabase(pool=pool), **kwargs
+    )
+    client.channel.close()
+    return client
+
+
+def main():
+    server, endpoint, file_count = start_server()
+    cache_dir = tempfile.mkdtemp(prefix='django_grpc_bus_benchmarks_')
+    try:
+        new_client(endpoint, descriptor_cache=DescriptorCache(cache_dir))
+
+        def lazy_service():
+            pool = descriptor_pool.DescriptorPool()
+            client = ReflectionClient(
+                endpoint, lazy=True, descriptor_pool=pool, symbol_db=symbol_database.SymbolDatabase(pool=pool)
+            )
+            client.service(SERVICE)
+            client.channel.close()
+
+        results = {
+            'reflection': summarize(measure_each(lambda: new_client(endpoint), NUMBER), 1e3, 'ms'),
+            'descriptor_cache': summarize(measure_each(
+                lambda: new_client(endpoint, descriptor_cache=DescriptorCache(cache_dir)), NUMBER
+            ), 1e3, 'ms'),
+            'lazy_service': summarize(measure_each(lazy_service, NUMBER), 1e3, 'ms'),
+        }
+    finally:
+        server.stop(None)
+    report('registration', {'proto_files': file_count, 'cold_start': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Unary and streaming calls through ``ReflectionClient`` and ``StubClient``
+against an in-process server backed by a SQLite file, as dicts and as raw
+protobuf messages::
+
+    python -m benchmarks.rpc
+
+Latencies are measured one call at a time, throughput with ``CONCURRENCY``
+threads sharing the client.
+"""
+import os
+import tempfile
+import time
+from concurrent import futures
+
+from benchmarks.utils import build_proto_module, measure_each, report, setup, summarize
+
+setup(database=os.path.join(tempfile.mkdtemp(prefix='django_grpc_bus_benchmarks_'), 'rpc.sqlite3'))
+
+import grpc  # noqa: E402
+from grpc_reflection.v1alpha import reflection  # noqa: E402
+
+from benchmarks.models import Narrow  # noqa: E402
+from django_grpc_bus.client.client import ReflectionClient, StubClient  # noqa: E402
+from django_grpc_bus.generics import ModelService  # noqa: E402
+from django_grpc_bus.serializers import CompiledModelProtoSerializer  # noqa: E402
+
+UNARY_NUMBER = 2000
+STREAM_NUMBER = 50
+STREAM_SIZE = 1000
+CONCURRENCY = 8
+
+
+def start_server():
+    pb2 = build_proto_module(Narrow, with_grpc=True)
+    import Narrow_pb2_grpc
+
+    class NarrowSerializer(CompiledModelProtoSerializer):
+        class Meta:
+            model = Narrow
+            proto_class = pb2.NarrowData
+            fields = '__all__'
+
+    class NarrowService(ModelService):
+        queryset = Narrow.objects.all()
+        serializer_class = NarrowSerializer
+
+    descriptor = pb2.DESCRIPTOR.services_by_name['Narrow']
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=CONCURRENCY * 2))
+    Narrow_pb2_grpc.add_NarrowServicer_to_server(NarrowService.as_servicer(descriptor=descriptor), server)
+    reflection.enable_server_reflection([descriptor.full_name, reflection.SERVICE_NAME], server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    return server, f'127.0.0.1:{port}', pb2, descriptor
+
+
+def measure_throughput(func, number):
+    """Calls per second of ``func`` run ``number`` times over ``CONCURRENCY`` threads."""
+    with futures.ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        start = time.perf_counter()
+        for _ in executor.map(lambda _: func(), range(number)):
+            pass
+        return number / (time.perf_counter() - start)
+
+
+def bench_client(client, service_name, pb2, raw_output):
+    service = client.service(service_name)
+    pk = Narrow.objects.values_list('pk', flat=True).first()
+    retrieve_request = pb2.NarrowRetrieveRequest(id=pk) if raw_output else {'id': pk}
+    list_request = pb2.NarrowListRequest() if raw_output else {}
+
+    def retrieve():
+        return service.retrieve(retrieve_request, raw_output=raw_output)
+
+    def list_all():
+        return list(service.list(list_request, raw_output=raw_output))
+
+    for _ in range(10):
+        retrieve()
+    list_all()
+
+    stream_durations = measure_each(list_all, STREAM_NUMBER)
+    return {
+        'unary': {
+            **summarize(measure_each(retrieve, UNARY_NUMBER)),
+            'calls_per_second': round(measure_throughput(retrieve, UNARY_NUMBER)),
+        },
+        'stream': {
+            **summarize(stream_durations, unit=1e3, suffix='ms'),
+            'messages_per_second': round(STREAM_SIZE * len(stream_durations) / sum(stream_durations)),
+            'streams_per_second': round(measure_throughput(list_all, STREAM_NUMBER), 1),
+        },
+    }
+
+
+def main():
+    Narrow.objects.bulk_create([Narrow(name=f'narrow{i}', quantity=i) for i in range(STREAM_SIZE)])
+    server, endpoint, pb2, descriptor = start_server()
+    try:
+        clients = {
+            'reflection_client': ReflectionClient(endpoint),
+            'stub_client': StubClient(endpoint, service_descriptors=[descriptor]),
+        }
+        results = {}
+        for client_name, client in clients.items():
+            for mode, raw_output in (('dict', False), ('proto', True)):
+                results[f'{client_name}.{mode}'] = bench_client(client, descriptor.full_name, pb2, raw_output)
+    finally:
+        server.stop(None)
+    report('rpc', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+``ModelProtoSerializer`` against ``CompiledModelProtoSerializer`` on a narrow
+and a wide model, encoding one instance and a list, decoding one incoming
+message and a list of them::
+
+    python -m benchmarks.serializers
+"""
+import datetime
+import decimal
+
+from benchmarks.utils import build_proto_module, measure, report, setup
+
+setup()
+
+from django.utils import timezone  # noqa: E402
+
+from benchmarks.models import Narrow, Tag, Wide  # noqa: E402
+from django_grpc_bus.serializers import CompiledModelProtoSerializer, ModelProtoSerializer  # noqa: E402
+
+NUMBER = 2000
+LIST_SIZE = 500
+
+
+def get_serializer_classes(model, proto_class):
+    meta = type('Meta', (), {'model': model, 'proto_class': proto_class, 'fields': '__all__'})
+    return {
+        'drf': type(f'{model.__name__}Serializer', (ModelProtoSerializer,), {'Meta': meta}),
+        'compiled': type(f'{model.__name__}CompiledSerializer', (CompiledModelProtoSerializer,), {'Meta': meta}),
+    }
+
+
+def create_objects():
+    tags = Tag.objects.bulk_create([Tag(name=f'tag{i}') for i in range(5)])
+    narrows = Narrow.objects.bulk_create([Narrow(name=f'narrow{i}', quantity=i) for i in range(LIST_SIZE)])
+    now = timezone.now()
+    wides = Wide.objects.bulk_create([
+        Wide(
+            name=f'wide{i}', title='A wide row ' * 4, slug=f'wide-{i}', email=f'wide{i}@example.com',
+            url='https://example.com/', description='description ' * 20, status='published',
+            quantity=i, rank=i, views=i * 1000, ratio=i / 3, price=decimal.Decimal('19.99'),
+            weight=decimal.Decimal('1.250'), day=now.date(), time=now.time(), created=now, updated=now,
+            duration=datetime.timedelta(minutes=i), ip='127.0.0.1', parent=narrows[i],
+        )
+        for i in range(LIST_SIZE)
+    ])
+    for wide in wides:
+        wide.tags.set(tags[:3])
+
+
+def bench_model(model, queryset):
+    proto_class = getattr(build_proto_module(model), f'{model.__name__}Data')
+    instances = list(queryset)
+    instance = instances[0]
+    results = {}
+    for name, serializer_class in get_serializer_classes(model, proto_class).items():
+        message = serializer_class(instance).message
+        messages = serializer_class(instances, many=True).message
+        results[f'{name}.message'] = round(measure(lambda: serializer_class(instance).message, NUMBER), 3)
+        results[f'{name}.list_message'] = round(
+            measure(lambda: serializer_class(instances, many=True).message, NUMBER // 100) / len(instances), 3
+        )
+        results[f'{name}.message_to_data'] = round(
+            measure(lambda: serializer_class(message=message).initial_data, NUMBER), 3
+        )
+        results[f'{name}.list_message_to_data'] = round(
+            measure(lambda: serializer_class(message=messages, many=True).initial_data, NUMBER // 100)
+            / len(messages), 3
+        )
+    return results
+
+
+def main():
+    create_objects()
+    results = {
+        'narrow': bench_model(Narrow, Narrow.objects.all()),
+        'wide': bench_model(Wide, Wide.objects.prefetch_related('tags')),
+    }
+    report('serializers', {'us_per_object': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-call overhead of the servicers built by ``Service.as_servicer()``, with
+a handler returning its request::
+
+    python -m benchmarks.servicer
+"""
+from benchmarks.utils import measure, report, setup
+
+setup()
+
+from grpc_health.v1 import health_pb2  # noqa: E402
+
+from django_grpc_bus.connections import PersistentConnections  # noqa: E402
+from django_grpc_bus.services import Service  # noqa: E402
+
+NUMBER = 100000
+
+
+class Context:
+    def time_remaining(self):
+        return None
+
+
+class EchoService(Service):
+    def Check(self, request, context):
+        return request
+
+
+class InitEchoService(EchoService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+
+def main():
+    descriptor = health_pb2.DESCRIPTOR.services_by_name['Health']
+    request = health_pb2.HealthCheckRequest(service='')
+    context = Context()
+    service = EchoService()
+    servicer = EchoService.as_servicer(descriptor=descriptor)
+    lazy_servicer = EchoService.as_servicer()
+    init_servicer = InitEchoService.as_servicer(descriptor=descriptor)
+    persistent_servicer = EchoService.as_servicer(descriptor=descriptor, connection_policy=PersistentConnections)
+    new_service = EchoService._get_instance_factory({})
+
+    def init_service():
+        service = EchoService()
+        service.request = request
+        service.context = context
+        service.action = 'Check'
+        return service
+
+    results = {
+        'instance.init': measure(init_service, NUMBER),
+        'instance.factory': measure(lambda: new_service(request, context, 'Check'), NUMBER),
+        'service.method': measure(lambda: service.Check(request, context), NUMBER),
+        'servicer.handler': measure(lambda: servicer.Check(request, context), NUMBER),
+        'servicer.lazy_handler': measure(lambda: lazy_servicer.Check(request, context), NUMBER),
+        'servicer.handler_with_init': measure(lambda: init_servicer.Check(request, context), NUMBER),
+        'servicer.persistent_connections': measure(lambda: persistent_servicer.Check(request, context), NUMBER),
+    }
+    report('servicer', {name: {'us_per_call': round(value, 3)} for name, value in results.items()})
+
+
+if __name__ == '__main__':
+    main()
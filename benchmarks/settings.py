@@ -0,0 +1,28 @@
+"""
+Django settings used by the benchmarks.
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SECRET_KEY = 'benchmarks'
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.auth',
+    'django_grpc_bus',
+    'benchmarks',
+]
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARKS_DATABASE', ':memory:'),
+    }
+}
+
+USE_TZ = True
+
+MESSAGE_BUS = {
+    'SERVLETS': {},
+}
@@ -0,0 +1,88 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def setup(database=None):
+    """
+    Configure Django and create the tables. Benchmarks serving requests from
+    other threads need a ``database`` file, an in-memory SQLite database is
+    private to its connection.
+    """
+    if database:
+        os.environ['BENCHMARKS_DATABASE'] = database
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def compile_protos(directory, file_names, with_grpc=False):
+    """Compile the ``file_names`` protos of ``directory`` and make them importable."""
+    from grpc_tools import protoc
+
+    include = os.path.join(os.path.dirname(protoc.__file__), '_proto')
+    args = ['protoc', f'--proto_path={directory}', f'--proto_path={include}', f'--python_out={directory}']
+    if with_grpc:
+        args.append(f'--grpc_python_out={directory}')
+    status = protoc.main(args + [os.path.join(directory, name) for name in file_names])
+    if status != 0:
+        raise RuntimeError(f'protoc failed for {", ".join(file_names)}')
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+def build_proto_module(model, with_grpc=False):
+    """
+    Generate, compile and import the ``_pb2`` module of ``model``, its
+    ``_pb2_grpc`` module is importable as well ``with_grpc``.
+    """
+    from django_grpc_bus.protobuf.generators import ModelProtoGenerator
+
+    name = model.__name__
+    directory = tempfile.mkdtemp(prefix='django_grpc_bus_benchmarks_')
+    with open(os.path.join(directory, f'{name}.proto'), 'w') as f:
+        f.write(ModelProtoGenerator(model).get_proto())
+    compile_protos(directory, [f'{name}.proto'], with_grpc=with_grpc)
+    return importlib.import_module(f'{name}_pb2')
+
+
+def measure(func, number):
+    """Run ``func`` ``number`` times, return the mean time per call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def measure_each(func, number):
+    """Run ``func`` ``number`` times, return the duration of every call in seconds."""
+    durations = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations, unit=1e6, suffix='us'):
+    """Mean, median and 99th percentile of ``durations``, in microseconds by default."""
+    durations = sorted(durations)
+
+    def percentile(rank):
+        return durations[min(len(durations) - 1, int(len(durations) * rank))] * unit
+
+    return {
+        f'mean_{suffix}': round(sum(durations) / len(durations) * unit, 3),
+        f'p50_{suffix}': round(percentile(.5), 3),
+        f'p99_{suffix}': round(percentile(.99), 3),
+    }
+
+
+def report(name, results):
+    json.dump({'benchmark': name, 'results': results}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
@@ -0,0 +1,173 @@
+import asyncio
+import collections
+import inspect
+from typing import Any, Dict, NamedTuple
+
+import grpc
+
+from .protobuf import batch as batch_pb
+from .services import AsyncBatchItemContext, BatchItemAborted, SyncServicerContext
+
+
+class BatchMethod(NamedTuple):
+    servicer: Any
+    action: str
+    input_type: Any
+    output_type: Any
+
+
+class _HandlerCallDetails(collections.namedtuple('_HandlerCallDetails', ('method', 'invocation_metadata')),
+                          grpc.HandlerCallDetails):
+    pass
+
+
+def _not_implemented(request, context):
+    context.abort(grpc.StatusCode.UNIMPLEMENTED, 'Method not found!')
+
+
+async def _async_not_implemented(request, context):
+    await context.abort(grpc.StatusCode.UNIMPLEMENTED, 'Method not found!')
+
+
+class BatchServicer:
+    """
+    Serves ``django_grpc_bus.Batch/Call``, which runs many requests of one
+    unary method of the registered services in a single call. The requests
+    of a batch share one db connection cycle and the responses are returned
+    in order, a failed request gets its own status code and details.
+
+    Only the ``batch_actions`` of the services (``retrieve`` by default) can
+    be batched. The server ``interceptors`` see ``Batch/Call`` and are run
+    again for every request of a batch, with the method of the request, so
+    that per method checks apply to the batched requests too.
+    """
+
+    def __init__(self, interceptors=None):
+        self.methods: Dict[str, BatchMethod] = {}
+        self.interceptors = list(interceptors or ())
+
+    def add_service(self, servicer, service_class, service_descriptor):
+        batch_actions = getattr(service_class, 'batch_actions', ())
+        for method in service_descriptor.methods:
+            if method.name not in batch_actions or method.client_streaming or method.server_streaming:
+                continue
+            if inspect.iscoroutinefunction(getattr(service_class, method.name, None)):
+                continue
+            self.methods[f'/{service_descriptor.full_name}/{method.name}'] = BatchMethod(
+                servicer=servicer,
+                action=method.name,
+                input_type=batch_pb.get_message_class(method.input_type),
+                output_type=batch_pb.get_message_class(method.output_type),
+            )
+
+    def _get_intercept(self, method_name, context):
+        """
+        Return ``intercept(behavior)`` running ``behavior`` through the
+        interceptors as a call of ``method_name``, ``None`` without
+        interceptors.
+        """
+        if not self.interceptors:
+            return None
+        details = _HandlerCallDetails(method_name, context.invocation_metadata())
+
+        def intercept(behavior):
+            handler = grpc.unary_unary_rpc_method_handler(behavior)
+            for interceptor in reversed(self.interceptors):
+                handler = interceptor.intercept_service(lambda _, handler=handler: handler, details)
+                if handler is None:
+                    return _not_implemented
+            return handler.unary_unary
+        return intercept
+
+    async def _intercept_async(self, method_name, context, behavior):
+        """``grpc.aio`` counterpart of :meth:`_get_intercept`, for one ``behavior``."""
+        details = _HandlerCallDetails(method_name, context.invocation_metadata())
+        handler = grpc.unary_unary_rpc_method_handler(behavior)
+        for interceptor in reversed(self.interceptors):
+            async def continuation(_, handler=handler):
+                return handler
+            handler = await interceptor.intercept_service(continuation, details)
+            if handler is None:
+                return _async_not_implemented
+        return handler.unary_unary
+
+    @staticmethod
+    def _make_response(results):
+        response = batch_pb.BatchResponse()
+        for message, item_context in results:
+            result = response.results.add(
+                code=item_context.code().value[0],
+                details=item_context.details() or '',
+            )
+            if message is not None and item_context.code() == grpc.StatusCode.OK:
+                result.response = message.SerializeToString()
+        return response
+
+    @staticmethod
+    def _parse_requests(method: BatchMethod, request):
+        return [method.input_type.FromString(data) for data in request.requests]
+
+    def call(self, request, context):
+        method = self.methods.get(request.method)
+        if method is None:
+            context.abort(grpc.StatusCode.UNIMPLEMENTED, f'{request.method} can not be batched.')
+        results = method.servicer._run_batch(
+            method.action, self._parse_requests(method, request), context,
+            intercept=self._get_intercept(request.method, context),
+        )
+        return self._make_response(results)
+
+    def get_handler(self):
+        return grpc.method_handlers_generic_handler(batch_pb.SERVICE_NAME, {
+            batch_pb.METHOD_NAME: grpc.unary_unary_rpc_method_handler(
+                self.call,
+                request_deserializer=batch_pb.BatchRequest.FromString,
+                response_serializer=batch_pb.BatchResponse.SerializeToString,
+            ),
+        })
+
+    def get_async_handler(self, executor=None):
+        async def call(request, context):
+            method = self.methods.get(request.method)
+            if method is None:
+                await context.abort(grpc.StatusCode.UNIMPLEMENTED, f'{request.method} can not be batched.')
+            loop = asyncio.get_running_loop()
+            sync_context = SyncServicerContext(context, loop)
+            requests = self._parse_requests(method, request)
+            if not self.interceptors:
+                results = await loop.run_in_executor(
+                    executor, method.servicer._run_batch, method.action, requests, sync_context
+                )
+                return self._make_response(results)
+
+            # The aio interceptors run on the loop, so the requests are run
+            # one at a time through them.
+            async def run(item_request, item_context):
+                [(response, result_context)] = await loop.run_in_executor(
+                    executor, method.servicer._run_batch, method.action, [item_request], sync_context
+                )
+                if result_context.code() != grpc.StatusCode.OK:
+                    await item_context.abort(result_context.code(), result_context.details())
+                return response
+
+            behavior = await self._intercept_async(request.method, context, run)
+            results = []
+            for item_request in requests:
+                item_context = AsyncBatchItemContext(context)
+                response = None
+                try:
+                    response = await behavior(item_request, item_context)
+                except BatchItemAborted:
+                    pass
+                except Exception as error:  # pylint: disable=broad-except
+                    item_context.fail(error)
+                results.append((response, item_context))
+            return self._make_response(results)
+
+        return grpc.method_handlers_generic_handler(batch_pb.SERVICE_NAME, {
+            batch_pb.METHOD_NAME: grpc.unary_unary_rpc_method_handler(
+                call,
+                request_deserializer=batch_pb.BatchRequest.FromString,
+                response_serializer=batch_pb.BatchResponse.SerializeToString,
+            ),
+        })
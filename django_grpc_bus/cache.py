@@ -0,0 +1,242 @@
+"""
+Read-through cache of the responses of ``retrieve()`` and ``list()``.
+Messages are kept serialized and a hit is parsed back without touching the
+database or the serializer::
+
+    class PostService(generics.ModelService):
+        queryset = Post.objects.all()
+        serializer_class = PostProtoSerializer
+        response_cache = ResponseCache(timeout=60, max_entries=10000)
+
+Objects are cached by model, primary key, serialized fields and queryset
+scope, lists by model, request and queryset scope.  The ``post_save``, ``post_delete`` and ``m2m_changed``
+signals of the model drop its cached objects and lists, once when they are
+sent and once more when the transaction commits.  Changes that send no signal
+(``QuerySet.update()``, changes of related objects, writes of other processes
+to an in-process cache) only expire with the timeout.
+
+Services with a ``cache_max_age`` also let clients cache their ``retrieve()``
+responses: the response carries ``cache-control`` and ``etag`` trailing
+metadata, and a request sending the ``etag`` back as ``if-none-match`` gets
+an empty message flagged ``not-modified`` while the object is unchanged, see
+:class:`~django_grpc_bus.client.response_cache.ClientCache`.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import signals
+
+CACHE_CONTROL_METADATA_KEY = 'cache-control'
+ETAG_METADATA_KEY = 'etag'
+IF_NONE_MATCH_METADATA_KEY = 'if-none-match'
+NOT_MODIFIED_METADATA_KEY = 'not-modified'
+
+
+class ResponseCache:
+    """
+    Response cache held in an in-process LRU of at most ``max_entries``
+    entries, each expiring ``timeout`` seconds after it is set (``None``
+    never expires).  Lists of more than ``max_list_size`` messages are not
+    cached.
+    """
+
+    def __init__(self, timeout=300, max_entries=10000, max_list_size=1000, key_prefix='grpc'):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.max_list_size = max_list_size
+        self.key_prefix = key_prefix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._watched = {}
+
+    def _get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                return None
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        expires = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _add(self, key, value):
+        """Set ``key`` unless it is set, return its value."""
+        with self._lock:
+            if key not in self._entries:
+                expires = None if self.timeout is None else time.monotonic() + self.timeout
+                self._entries[key] = (expires, value)
+            return self._entries[key][1]
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_model_key(self, model):
+        return '%s:%s' % (self.key_prefix, model._meta.label_lower)
+
+    def _get_object_key(self, model, pk):
+        return '%s:%s' % (self.get_model_key(model), pk)
+
+    def _get_version(self, key):
+        """
+        Version of the entries under ``key``, changed by every invalidation
+        so entries cached before it are never read again.
+        """
+        key = '%s:version' % key
+        version = self._get(key)
+        if version is None:
+            version = self._add(key, uuid.uuid4().hex)
+        return version
+
+    def get_object_key(self, model, pk):
+        """
+        Key of the ``pk`` object, to be taken before the object is read from
+        the database so that an object invalidated meanwhile is stored under a
+        stale key.
+        """
+        key = self._get_object_key(model, pk)
+        return '%s:%s' % (key, self._get_version(key))
+
+    def get_object(self, key, variant):
+        """Serialized message of a cached object, ``None`` on a miss."""
+        entry = self._get(key)
+        return entry.get(variant) if entry else None
+
+    def set_object(self, key, variant, data):
+        entry = dict(self._get(key) or {})
+        entry[variant] = data
+        self._set(key, entry)
+
+    def get_list_key(self, model, variant):
+        """
+        Key of a list, to be taken before the list is read from the database
+        so that a list invalidated meanwhile is stored under a stale key.
+        """
+        key = self.get_model_key(model)
+        return '%s:list:%s:%s' % (key, self._get_version(key), variant)
+
+    def get_list(self, key):
+        """``(messages, trailing_metadata)`` of a cached list, ``None`` on a miss."""
+        return self._get(key)
+
+    def set_list(self, key, messages, trailing_metadata=None):
+        if len(messages) <= self.max_list_size:
+            self._set(key, (tuple(messages), tuple(trailing_metadata or ())))
+
+    def _invalidate(self, model, pks):
+        for key in [self._get_object_key(model, pk) for pk in pks] + [self.get_model_key(model)]:
+            self._set('%s:version' % key, uuid.uuid4().hex)
+
+    def invalidate(self, model, pks, using=None):
+        """
+        Drop the cached ``pks`` objects and the lists of ``model``, now and
+        when the current transaction commits.
+        """
+        pks = [str(pk) for pk in pks]
+        self._invalidate(model, pks)
+        transaction.on_commit(lambda: self._invalidate(model, pks), using=using)
+
+    def watch(self, model):
+        """Invalidate the entries of ``model`` on its signals."""
+        if model in self._watched:
+            return
+        signals.post_save.connect(self._on_save, sender=model, weak=False)
+        signals.post_delete.connect(self._on_save, sender=model, weak=False)
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            self._watched[through] = (model, field)
+            signals.m2m_changed.connect(self._on_m2m_changed, sender=through, weak=False)
+        self._watched[model] = (model, None)
+
+    def _on_save(self, sender, instance, using=None, **kwargs):
+        self.invalidate(sender, [instance.pk], using)
+
+    def _on_m2m_changed(self, sender, instance, action, reverse, pk_set, using=None, **kwargs):
+        model, field = self._watched[sender]
+        if not reverse:
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                self.invalidate(model, [instance.pk], using)
+        elif action == 'pre_clear':
+            pks = model._base_manager.using(using).filter(**{field.name: instance.pk}).values_list('pk', flat=True)
+            self.invalidate(model, list(pks), using)
+        elif action in ('post_add', 'post_remove'):
+            self.invalidate(model, pk_set, using)
+
+
+class DjangoResponseCache(ResponseCache):
+    """
+    Response cache held in the Django cache ``alias``, which is shared
+    between processes when its backend is.  Entries expire after ``timeout``
+    seconds and the backend evicts them on its own terms.
+    """
+
+    def __init__(self, alias='default', timeout=300, max_list_size=1000, key_prefix='grpc'):
+        super().__init__(timeout=timeout, max_list_size=max_list_size, key_prefix=key_prefix)
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _get(self, key):
+        return self.cache.get(key)
+
+    def _set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def _add(self, key, value):
+        self.cache.add(key, value, self.timeout)
+        return self.cache.get(key, value)
+
+    def _delete(self, key):
+        self.cache.delete(key)
+
+    def get_model_key(self, model):
+        # Keys live in a namespace of their own, so that clear() leaves the
+        # other entries of the alias alone.
+        key = '%s:namespace' % self.key_prefix
+        namespace = self.cache.get(key)
+        if namespace is None:
+            self.cache.add(key, uuid.uuid4().hex, None)
+            namespace = self.cache.get(key)
+        return '%s:%s:%s' % (self.key_prefix, namespace, model._meta.label_lower)
+
+    def clear(self):
+        """Drop every entry of this cache, by moving to a new namespace."""
+        self.cache.set('%s:namespace' % self.key_prefix, uuid.uuid4().hex, None)
+
+
+class TrailingMetadataRecorder:
+    """
+    Servicer context keeping a copy of the trailing metadata set through it,
+    to be cached along with the response.
+    """
+
+    def __init__(self, context):
+        self._context = context
+        self.trailing_metadata = ()
+
+    def set_trailing_metadata(self, trailing_metadata):
+        self.trailing_metadata = tuple(trailing_metadata)
+        return self._context.set_trailing_metadata(trailing_metadata)
+
+    def __getattr__(self, item):
+        return getattr(self._context, item)
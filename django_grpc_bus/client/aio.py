@@ -0,0 +1,312 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Dict, List
+
+import grpc
+from google.protobuf import descriptor_pb2
+from google.protobuf.descriptor import ServiceDescriptor
+from grpc_reflection.v1alpha import reflection_pb2_grpc
+
+from .client import (
+    BaseGrpcClient, MethodMetaData, MethodType, ReflectionDescriptorMixin, ServiceClient, parse_request_data,
+)
+from .descriptor_cache import DescriptorCache
+from .policies import AsyncGuardedMultiCallable, AsyncHedgedMultiCallable
+
+
+async def parse_async_stream_requests(stream_requests_data, input_type):
+    if hasattr(stream_requests_data, '__aiter__'):
+        async for request_data in stream_requests_data:
+            yield parse_request_data(request_data or {}, input_type)
+    else:
+        for request_data in stream_requests_data:
+            yield parse_request_data(request_data or {}, input_type)
+
+
+class AsyncReflectionStream:
+    """
+    asyncio counterpart of :class:`~django_grpc_bus.client.client.ReflectionStream`::
+
+        async with AsyncReflectionStream(stub) as stream:
+            responses = await stream.request(*requests)
+    """
+
+    def __init__(self, stub):
+        self._call = stub.ServerReflectionInfo()
+
+    async def request(self, *requests):
+        for request in requests:
+            await self._call.write(request)
+        return [await self._call.read() for _ in requests]
+
+    async def initial_metadata(self):
+        return await self._call.initial_metadata()
+
+    async def close(self):
+        await self._call.done_writing()
+        while await self._call.read() is not grpc.aio.EOF:
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            self._call.cancel()
+        return False
+
+
+class AsyncBaseGrpcClient(BaseGrpcClient):
+    """
+    Base class of the ``grpc.aio`` clients. Method handlers are built exactly
+    like the sync ones, but unary response methods return awaitables and
+    stream response methods return async iterators::
+
+        client = await get_by_endpoint('localhost:50051')
+        service = await client.service('Post')
+        post = await service.retrieve({'id': 1})
+        async for post in service.list():
+            ...
+
+    Registration needs network I/O, so it is not done on ``__init__``; await
+    ``register_all_service()`` or use :func:`get_by_endpoint`.
+    """
+    grpc_module = grpc.aio
+    guarded_multi_callable_class = AsyncGuardedMultiCallable
+    hedged_multi_callable_class = AsyncHedgedMultiCallable
+
+    def __init__(self, endpoint, symbol_db=None, descriptor_pool=None, lazy=False, ssl=False, compression=None,
+                 **kwargs):
+        super().__init__(endpoint, symbol_db, descriptor_pool, lazy=lazy, ssl=ssl, compression=compression, **kwargs)
+        self._register_lock = asyncio.Lock()
+
+    async def _get_service_names(self):
+        raise NotImplementedError()
+
+    async def load_service_names(self):
+        if self._service_names is None:
+            self._service_names = await self._get_service_names()
+        return self._service_names
+
+    async def register_service(self, service_name):
+        super().register_service(service_name)
+
+    async def register_all_service(self):
+        async with self._register_lock:
+            if self.has_server_registered:
+                return
+            for service in await self.load_service_names():
+                await self.register_service(service)
+            self.has_server_registered = True
+
+    def check_method_available(self, service, method, method_type: MethodType = None):
+        if not self.has_server_registered and service not in self._service_methods_meta:
+            raise ValueError(
+                f"{service} is not registered for {self.endpoint}. "
+                f"Await `register_all_service()` or `service()` first.")
+        return self._check_method_meta(service, method, method_type)
+
+    def _request(self, service, method, request, raw_output=None, **kwargs):
+        method_meta = self.get_method_meta(service, method)
+        if raw_output is None:
+            raw_output = self.proto_mode
+        self._set_timeout(kwargs, self.get_timeout(service, method, method_meta.method_type))
+        record = self._sample_call(service, method, method_meta)
+        if method_meta.method_type.is_unary_response:
+            return self._unary_response_request(
+                method_meta, request, raw_output, self._get_cached_handler(service, method, method_meta), record,
+                **kwargs
+            )
+        return self._stream_response_request(method_meta, request, raw_output, record, **kwargs)
+
+    def _get_cached_handler(self, service, method, method_meta: MethodMetaData):
+        response_cache = self.get_response_cache(service, method, method_meta)
+        if response_cache is None:
+            return None
+        return partial(response_cache.async_call, method_meta.handler, service, method)
+
+    @staticmethod
+    def _parse_request(method_meta: MethodMetaData, request):
+        if method_meta.method_type.is_unary_request:
+            return parse_request_data(request, method_meta.input_type)
+        return parse_async_stream_requests(request, method_meta.input_type)
+
+    async def _unary_response_request(self, method_meta: MethodMetaData, request, raw_output=False, handler=None,
+                                      record=None, **kwargs):
+        handler = handler or method_meta.handler
+        if record is not None:
+            return await self.instrumentation.async_call(
+                record, handler, request, method_meta.input_type, raw_output, kwargs,
+                request_parser=parse_request_data, response_parser=self._parse_response,
+            )
+        result = await handler(self._parse_request(method_meta, request), **kwargs)
+        return result if raw_output else self._parse_response(result)
+
+    def _stream_response_request(self, method_meta: MethodMetaData, request, raw_output=False, record=None,
+                                 **kwargs):
+        if record is not None:
+            return self.instrumentation.async_stream_call(
+                record, method_meta.handler, request, method_meta.input_type, raw_output, kwargs,
+                request_parser=parse_request_data, response_parser=self._parse_response,
+            )
+        return self._stream_responses(method_meta, request, raw_output, **kwargs)
+
+    async def _stream_responses(self, method_meta: MethodMetaData, request, raw_output=False, **kwargs):
+        async for response in method_meta.handler(self._parse_request(method_meta, request), **kwargs):
+            yield response if raw_output else self._parse_response(response)
+
+    def get_method_callable(self, service, method):
+        self.check_method_available(service, method)
+        method_meta = self.get_method_meta(service, method)
+        timeout = self.get_timeout(service, method, method_meta.method_type)
+        set_timeout = self._set_timeout
+        if method_meta.method_type.is_unary_response:
+            handler = self._get_cached_handler(service, method, method_meta)
+
+            async def method_callable(request=None, raw_output=self.proto_mode, **kwargs):
+                set_timeout(kwargs, timeout)
+                return await self._unary_response_request(
+                    method_meta, request, raw_output, handler, self._sample_call(service, method, method_meta),
+                    **kwargs
+                )
+        else:
+            def method_callable(request=None, raw_output=self.proto_mode, **kwargs):
+                set_timeout(kwargs, timeout)
+                return self._stream_response_request(
+                    method_meta, request, raw_output, self._sample_call(service, method, method_meta), **kwargs
+                )
+        method_callable.__name__ = method
+        return method_callable
+
+    async def batch(self, service, method, requests, raw_output=None, raise_exception=False, **kwargs):
+        method_meta, batch_request = self._make_batch_request(service, method, requests)
+        self._set_timeout(kwargs, self.get_timeout(service, method))
+        batch_response = await self.batch_handler(batch_request, **kwargs)
+        return self._parse_batch_response(method_meta, batch_response, raw_output, raise_exception)
+
+    async def service(self, name):
+        service_names = await self.load_service_names()
+        if name not in service_names:
+            raise ValueError(f"{name} does not support. Available service {service_names}")
+        if name not in self._service_methods_meta:
+            await self.register_service(name)
+        return ServiceClient(client=self, service_name=name)
+
+    async def close(self, grace=None):
+        for channel in self.channels:
+            await channel.close(grace)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+
+class AsyncReflectionClient(ReflectionDescriptorMixin, AsyncBaseGrpcClient):
+
+    def __init__(self, endpoint, symbol_db=None, descriptor_pool=None, lazy=False, ssl=False, compression=None,
+                 descriptor_cache: DescriptorCache = None, **kwargs):
+        super().__init__(endpoint, symbol_db, descriptor_pool, ssl=ssl, lazy=lazy, compression=compression, **kwargs)
+        self.reflection_stub = reflection_pb2_grpc.ServerReflectionStub(self.channel)
+        self._init_descriptors(descriptor_cache)
+
+    async def _list_services(self):
+        async with AsyncReflectionStream(self.reflection_stub) as stream:
+            responses = await stream.request(self._list_services_request())
+        return self._parse_list_services_response(responses[0])
+
+    async def _get_schema(self):
+        """Service names and schema fingerprint of the server."""
+        async with AsyncReflectionStream(self.reflection_stub) as stream:
+            responses = await stream.request(self._list_services_request())
+            service_names = self._parse_list_services_response(responses[0])
+            fingerprint = self._get_schema_fingerprint(service_names, await stream.initial_metadata())
+            if fingerprint is None:
+                responses = await stream.request(*self._file_containing_symbol_requests(service_names))
+                fingerprint = self._get_schema_fingerprint(service_names, (), responses)
+        return service_names, fingerprint
+
+    async def _get_service_names(self):
+        if self.descriptor_cache is None:
+            return await self._list_services()
+
+        service_names = None
+        fingerprint = self.descriptor_cache.fingerprint
+        if not fingerprint:
+            service_names, fingerprint = await self._get_schema()
+        cached_service_names = self._load_descriptor_cache(fingerprint)
+        if cached_service_names is not None:
+            return cached_service_names
+        return service_names if service_names is not None else await self._list_services()
+
+    async def _resolve_services(self, service_names):
+        resolved: Dict[str, descriptor_pb2.FileDescriptorProto] = {}
+        requests = self._file_containing_symbol_requests(service_names)
+        async with AsyncReflectionStream(self.reflection_stub) as stream:
+            while requests:
+                logging.debug(f"resolve {len(requests)} file descriptors from {self.endpoint}")
+                requests = self._collect_file_descriptors(await stream.request(*requests), resolved)
+        self._register_file_descriptors(resolved)
+
+    async def register_service(self, service_name):
+        logging.debug(f"start {service_name} register")
+        if not self._loaded_from_cache:
+            await self._resolve_services([service_name])
+        BaseGrpcClient.register_service(self, service_name)
+
+    async def register_all_service(self):
+        async with self._register_lock:
+            if self.has_server_registered:
+                return
+            service_names = await self.load_service_names()
+            if not self._loaded_from_cache:
+                await self._resolve_services(service_names)
+            for service in service_names:
+                BaseGrpcClient.register_service(self, service)
+            self.has_server_registered = True
+            self._save_descriptor_cache()
+
+
+class AsyncStubClient(AsyncBaseGrpcClient):
+
+    def __init__(self, endpoint, service_descriptors: List[ServiceDescriptor], symbol_db=None, lazy=False,
+                 descriptor_pool=None, ssl=False, compression=None,
+                 **kwargs):
+        super().__init__(endpoint, symbol_db, descriptor_pool, ssl=ssl, compression=compression, lazy=lazy, **kwargs)
+        self.service_descriptors = service_descriptors
+
+    async def _get_service_names(self):
+        svcs = [x.full_name for x in self.service_descriptors]
+        return svcs
+
+
+AsyncClient = AsyncReflectionClient
+
+_cached_clients: Dict[str, AsyncClient] = {}
+
+
+async def get_by_endpoint(endpoint, service_descriptors=None, **kwargs) -> AsyncClient:
+    if endpoint not in _cached_clients:
+        if service_descriptors:
+            client = AsyncStubClient(endpoint, service_descriptors=service_descriptors, **kwargs)
+        else:
+            client = AsyncClient(endpoint, **kwargs)
+        _cached_clients[endpoint] = client
+    client = _cached_clients[endpoint]
+    if not client._lazy:
+        await client.register_all_service()
+    return client
+
+
+def reset_cached_client(endpoint=None):
+    global _cached_clients
+    if endpoint:
+        if endpoint in _cached_clients:
+            del _cached_clients[endpoint]
+    else:
+        _cached_clients = {}
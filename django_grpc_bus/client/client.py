@@ -1,6 +1,8 @@
 import logging
+import queue
 from enum import Enum
 from functools import partial
+from types import SimpleNamespace
 from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, TypeVar
 
 import grpc
@@ -10,6 +12,16 @@ from google.protobuf.descriptor_pb2 import ServiceDescriptorProto
 from google.protobuf.json_format import MessageToDict, ParseDict
 from grpc_reflection.v1alpha import reflection_pb2, reflection_pb2_grpc
 
+from .. import deadlines, exceptions
+from ..protobuf import batch as batch_pb
+from ..protobuf.json_format import MessageView
+from ..reflection import SCHEMA_FINGERPRINT_METADATA_KEY
+from .descriptor_cache import DescriptorCache, make_fingerprint
+from .instrumentation import CallRecord, ClientHook, Instrumentation
+from .policies import CircuitBreaker, GuardedMultiCallable, HedgedMultiCallable, HedgingPolicy
+from .pool import ChannelPool
+from .response_cache import ClientCache
+
 
 class DescriptorImport:
     def __init__(self, ):
@@ -31,19 +43,71 @@ def reflection_request(channel, requests):
         print(err)
 
 
+class ReflectionStream:
+    """
+    A single ``ServerReflectionInfo`` stream. Requests are pipelined and the
+    server answers them in order, so a whole batch costs one round trip::
+
+        with ReflectionStream(stub) as stream:
+            responses = stream.request(*requests)
+    """
+    _CLOSE = object()
+
+    def __init__(self, stub):
+        self._requests = queue.Queue()
+        self._responses = stub.ServerReflectionInfo(iter(self._requests.get, self._CLOSE))
+
+    def request(self, *requests):
+        for request in requests:
+            self._requests.put(request)
+        return [next(self._responses) for _ in requests]
+
+    def initial_metadata(self):
+        return self._responses.initial_metadata()
+
+    def close(self):
+        self._requests.put(self._CLOSE)
+        for _ in self._responses:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._responses.cancel()
+        return False
+
+
 class BaseClient:
+    grpc_module = grpc
+
     def __init__(self, endpoint, symbol_db=None, descriptor_pool=None, channel_options=None, ssl=False,
-                 compression=None, **kwargs):
+                 compression=None, pool_size=1, pool_policy=ChannelPool.ROUND_ROBIN, **kwargs):
         self.endpoint = endpoint
         self._symbol_db = symbol_db or _symbol_database.Default()
         self._desc_pool = descriptor_pool or _descriptor_pool.Default()
         self.compression = compression
         self.channel_options = channel_options
-        if ssl:
-            self._channel = grpc.secure_channel(endpoint, grpc.ssl_channel_credentials(), options=self.channel_options,
-                                                compression=self.compression)
+        self.ssl = ssl
+        self.pool = None
+        if pool_size > 1:
+            self.pool = ChannelPool(self._create_channel, pool_size, options=self.channel_options, policy=pool_policy)
+            self._channel = self.pool.channels[0]
         else:
-            self._channel = grpc.insecure_channel(endpoint, options=self.channel_options, compression=self.compression)
+            self._channel = self._create_channel(self.channel_options)
+
+    def _create_channel(self, options):
+        if self.ssl:
+            return self.grpc_module.secure_channel(self.endpoint, grpc.ssl_channel_credentials(),
+                                                   options=options, compression=self.compression)
+        return self.grpc_module.insecure_channel(self.endpoint, options=options, compression=self.compression)
+
+    @property
+    def channels(self):
+        return self.pool.channels if self.pool is not None else [self._channel]
 
     @property
     def channel(self):
@@ -56,10 +120,11 @@ class BaseClient:
         return _cached_clients[endpoint]
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        try:
-            self._channel._close()
-        except Exception:  # pylint: disable=bare-except
-            pass
+        for channel in self.channels:
+            try:
+                channel._close()
+            except Exception:  # pylint: disable=bare-except
+                pass
         return False
 
     def __del__(self):
@@ -93,6 +158,15 @@ def parse_stream_responses(responses: Iterable):
         yield parse_response(resp)
 
 
+def parse_lazy_response(response):
+    return MessageView(response)
+
+
+def parse_lazy_stream_responses(responses: Iterable):
+    for resp in responses:
+        yield MessageView(resp)
+
+
 class MethodType(Enum):
     UNARY_UNARY = 'unary_unary'
     STREAM_UNARY = 'stream_unary'
@@ -115,6 +189,10 @@ class MethodType(Enum):
     def response_parser(self):
         return parse_response if self.is_unary_response else parse_stream_responses
 
+    @property
+    def lazy_response_parser(self):
+        return parse_lazy_response if self.is_unary_response else parse_lazy_stream_responses
+
 
 class MethodMetaData(NamedTuple):
     input_type: Any
@@ -126,6 +204,8 @@ class MethodMetaData(NamedTuple):
 IS_REQUEST_STREAM = TypeVar("IS_REQUEST_STREAM")
 IS_RESPONSE_STREAM = TypeVar("IS_RESPONSE_STREAM")
 
+STATUS_CODES = {code.value[0]: code for code in grpc.StatusCode}
+
 MethodTypeMatch: Dict[Tuple[IS_REQUEST_STREAM, IS_RESPONSE_STREAM], MethodType] = {
     (False, False): MethodType.UNARY_UNARY,
     (True, False): MethodType.STREAM_UNARY,
@@ -135,16 +215,41 @@ MethodTypeMatch: Dict[Tuple[IS_REQUEST_STREAM, IS_RESPONSE_STREAM], MethodType]
 
 
 class BaseGrpcClient(BaseClient):
+    guarded_multi_callable_class = GuardedMultiCallable
+    hedged_multi_callable_class = HedgedMultiCallable
 
     def __init__(self, endpoint, symbol_db=None, descriptor_pool=None, lazy=False, ssl=False, compression=None,
-                 **kwargs):
+                 proto_mode=False, lazy_dict=False, response_cache: ClientCache = None,
+                 hooks: Iterable[ClientHook] = None, hook_sample_rate: float = 1.0, timeout: float = None,
+                 method_timeouts: Dict[str, float] = None, stream_timeout: float = None,
+                 circuit_breaker: CircuitBreaker = None, hedging: HedgingPolicy = None, **kwargs):
         super().__init__(endpoint, symbol_db, descriptor_pool, ssl=ssl, compression=compression, **kwargs)
         self._service_names = None
         self._lazy = lazy
+        # proto_mode returns the response messages as they are, lazy_dict
+        # wraps them in a MessageView instead of converting them to dicts.
+        self.proto_mode = proto_mode
+        self.lazy_dict = lazy_dict
+        # Caches the responses of the unary methods it lists.
+        self.response_cache = response_cache
+        # Measures a ``hook_sample_rate`` share of the calls for the hooks.
+        self.instrumentation = Instrumentation(hooks, hook_sample_rate) if hooks else None
+        # Default call timeouts in seconds, ``stream_timeout`` for the
+        # streaming methods and ``method_timeouts`` keyed by method name or
+        # ``package.Service/method``.
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.method_timeouts = method_timeouts or {}
+        # Fails the calls fast while the endpoint keeps erroring, and hedges
+        # the idempotent methods.
+        self.circuit_breaker = circuit_breaker
+        self.hedging = hedging
         self.has_server_registered = False
         self._services_module_name = {}
         self._service_methods_meta: Dict[str, Dict[str, MethodMetaData]] = {}
 
+        self._batch_handler = None
+
         self._unary_unary_handler = {}
         self._unary_stream_handler = {}
         self._stream_unary_handler = {}
@@ -156,6 +261,9 @@ class BaseGrpcClient(BaseClient):
     def check_method_available(self, service, method, method_type: MethodType = None):
         if not self.has_server_registered:
             self.register_all_service()
+        return self._check_method_meta(service, method, method_type)
+
+    def _check_method_meta(self, service, method, method_type: MethodType = None):
         methods_meta = self._service_methods_meta.get(service)
         if not methods_meta:
             raise ValueError(
@@ -182,8 +290,8 @@ class BaseGrpcClient(BaseClient):
             output_type = self._symbol_db.GetPrototype(method_desc.output_type)
             method_type = MethodTypeMatch[(method_proto.client_streaming, method_proto.server_streaming)]
 
-            method_register_func = getattr(self.channel, method_type.value)
-            handler = method_register_func(
+            handler = self._make_multi_callable(
+                method_type,
                 method=self._make_method_full_name(service_full_name, method_name),
                 request_serializer=input_type.SerializeToString,
                 response_deserializer=output_type.FromString
@@ -196,6 +304,20 @@ class BaseGrpcClient(BaseClient):
             )
         return metadata
 
+    def _make_multi_callable(self, method_type: MethodType, **kwargs):
+        if self.pool is not None:
+            multi_callable = self.pool.multi_callable(method_type.value, **kwargs)
+        else:
+            multi_callable = getattr(self.channel, method_type.value)(**kwargs)
+        # Every hedged attempt goes through the circuit breaker.
+        if self.circuit_breaker is not None:
+            multi_callable = self.guarded_multi_callable_class(multi_callable, self.circuit_breaker)
+        if self.hedging is not None and self.hedging.is_hedged(kwargs['method'], method_type):
+            multi_callable = self.hedged_multi_callable_class(
+                multi_callable, self.hedging, stream=not method_type.is_unary_response
+            )
+        return multi_callable
+
     def register_service(self, service_name):
         logging.debug(f"start {service_name} register")
         svc_desc = self._desc_pool.FindServiceByName(service_name)
@@ -227,38 +349,183 @@ class BaseGrpcClient(BaseClient):
     def _make_method_full_name(service, method):
         return f"/{service}/{method}"
 
-    def _request(self, service, method, request, raw_output=False, **kwargs):
+    def get_response_parser(self, method_type: MethodType):
+        if self.lazy_dict:
+            return method_type.lazy_response_parser
+        return method_type.response_parser
+
+    def _parse_response(self, response):
+        return parse_lazy_response(response) if self.lazy_dict else parse_response(response)
+
+    def get_timeout(self, service, method, method_type: MethodType = MethodType.UNARY_UNARY):
+        """
+        Default timeout of ``service.method``, ``None`` for no deadline.
+        Streaming methods default to ``stream_timeout``.
+        """
+        timeout = self.timeout if method_type is MethodType.UNARY_UNARY else self.stream_timeout
+        if not self.method_timeouts:
+            return timeout
+        full_name = f'{service}/{method}'
+        if full_name in self.method_timeouts:
+            return self.method_timeouts[full_name]
+        return self.method_timeouts.get(method, timeout)
+
+    @staticmethod
+    def _set_timeout(kwargs, timeout):
+        """
+        Set the ``timeout`` of a call, unless the caller gave one, shortened
+        to the time left by the request being served.
+        """
+        timeout = kwargs.get('timeout', timeout)
+        remaining = deadlines.time_remaining()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = max(remaining, 0)
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return kwargs
+
+    def _sample_call(self, service, method, method_meta: MethodMetaData):
+        """The record of a call to measure, ``None`` if it is not sampled."""
+        if self.instrumentation is not None and self.instrumentation.sample():
+            return CallRecord(self.endpoint, service, method, method_meta.method_type)
+        return None
+
+    def get_response_cache(self, service, method, method_meta: MethodMetaData):
+        """The response cache of ``service.method``, ``None`` if not cached."""
+        if (self.response_cache is not None and method_meta.method_type == MethodType.UNARY_UNARY
+                and self.response_cache.is_cached(service, method)):
+            return self.response_cache
+        return None
+
+    def _request(self, service, method, request, raw_output=None, **kwargs):
         # does not check request is available
         method_meta = self.get_method_meta(service, method)
+        if raw_output is None:
+            raw_output = self.proto_mode
+        handler = method_meta.handler
+        response_cache = self.get_response_cache(service, method, method_meta)
+        if response_cache is not None:
+            handler = partial(response_cache.call, handler, service, method)
+        self._set_timeout(kwargs, self.get_timeout(service, method, method_meta.method_type))
+
+        record = self._sample_call(service, method, method_meta)
+        if record is not None:
+            return self.instrumentation.call(
+                record, handler, request, method_meta.input_type, raw_output, kwargs,
+                request_parser=parse_request_data, response_parser=self._parse_response,
+            )
 
-        _request = method_meta.method_type.request_parser(request, method_meta.input_type)
-        result = method_meta.handler(_request, **kwargs)
-
+        result = handler(method_meta.method_type.request_parser(request, method_meta.input_type), **kwargs)
         if raw_output:
             return result
         else:
-            return method_meta.method_type.response_parser(result)
+            return self.get_response_parser(method_meta.method_type)(result)
 
-    def request(self, service, method, request=None, raw_output=False, **kwargs):
+    def request(self, service, method, request=None, raw_output=None, **kwargs):
         self.check_method_available(service, method)
         return self._request(service, method, request, raw_output, **kwargs)
 
-    def unary_unary(self, service, method, request=None, raw_output=False, **kwargs):
+    def unary_unary(self, service, method, request=None, raw_output=None, **kwargs):
         self.check_method_available(service, method, MethodType.UNARY_UNARY)
         return self._request(service, method, request, raw_output, **kwargs)
 
-    def unary_stream(self, service, method, request=None, raw_output=False, **kwargs):
+    def unary_stream(self, service, method, request=None, raw_output=None, **kwargs):
         self.check_method_available(service, method, MethodType.UNARY_STREAM)
         return self._request(service, method, request, raw_output, **kwargs)
 
-    def stream_unary(self, service, method, requests, raw_output=False, **kwargs):
+    def stream_unary(self, service, method, requests, raw_output=None, **kwargs):
         self.check_method_available(service, method, MethodType.STREAM_UNARY)
         return self._request(service, method, requests, raw_output, **kwargs)
 
-    def stream_stream(self, service, method, requests, raw_output=False, **kwargs):
+    def stream_stream(self, service, method, requests, raw_output=None, **kwargs):
         self.check_method_available(service, method, MethodType.STREAM_STREAM)
         return self._request(service, method, requests, raw_output, **kwargs)
 
+    @property
+    def batch_handler(self):
+        if self._batch_handler is None:
+            self._batch_handler = self._make_multi_callable(
+                MethodType.UNARY_UNARY,
+                method=batch_pb.METHOD_FULL_NAME,
+                request_serializer=batch_pb.BatchRequest.SerializeToString,
+                response_deserializer=batch_pb.BatchResponse.FromString,
+            )
+        return self._batch_handler
+
+    def _make_batch_request(self, service, method, requests):
+        self.check_method_available(service, method, MethodType.UNARY_UNARY)
+        method_meta = self.get_method_meta(service, method)
+        batch_request = batch_pb.BatchRequest(
+            method=self._make_method_full_name(service, method),
+            requests=[
+                parse_request_data(request, method_meta.input_type).SerializeToString()
+                for request in requests
+            ],
+        )
+        return method_meta, batch_request
+
+    def _parse_batch_response(self, method_meta: MethodMetaData, batch_response, raw_output=None,
+                              raise_exception=False):
+        if raw_output is None:
+            raw_output = self.proto_mode
+        response_parser = self.get_response_parser(method_meta.method_type)
+        results = []
+        for result in batch_response.results:
+            if result.code:
+                error = exceptions.BatchItemError(STATUS_CODES.get(result.code, result.code), result.details)
+                if raise_exception:
+                    raise error
+                results.append(error)
+                continue
+            response = method_meta.output_type.FromString(result.response)
+            results.append(response if raw_output else response_parser(response))
+        return results
+
+    def batch(self, service, method, requests, raw_output=None, raise_exception=False, **kwargs):
+        """
+        Call the unary ``method`` once per request in a single RPC, returning
+        the responses in order. A failed request gets a ``BatchItemError`` in
+        its place, or raises it with ``raise_exception``.
+        """
+        method_meta, batch_request = self._make_batch_request(service, method, requests)
+        self._set_timeout(kwargs, self.get_timeout(service, method))
+        batch_response = self.batch_handler(batch_request, **kwargs)
+        return self._parse_batch_response(method_meta, batch_response, raw_output, raise_exception)
+
+    def get_method_callable(self, service, method):
+        """
+        Return a callable for ``service.method``, equivalent to
+        ``partial(self.request, service, method)``. The method is validated
+        and its handler, parsers and timeout resolved once, so a call only
+        parses the request, invokes the handler and parses the response.
+        """
+        self.check_method_available(service, method)
+        method_meta = self.get_method_meta(service, method)
+        handler = method_meta.handler
+        input_type = method_meta.input_type
+        request_parser = method_meta.method_type.request_parser
+        response_parser = self.get_response_parser(method_meta.method_type)
+        response_cache = self.get_response_cache(service, method, method_meta)
+        if response_cache is not None:
+            handler = partial(response_cache.call, handler, service, method)
+        timeout = self.get_timeout(service, method, method_meta.method_type)
+        set_timeout = self._set_timeout
+
+        def method_callable(request=None, raw_output=self.proto_mode, **kwargs):
+            set_timeout(kwargs, timeout)
+            record = self._sample_call(service, method, method_meta)
+            if record is not None:
+                return self.instrumentation.call(
+                    record, handler, request, input_type, raw_output, kwargs,
+                    request_parser=parse_request_data, response_parser=self._parse_response,
+                )
+            result = handler(request_parser(request, input_type), **kwargs)
+            if raw_output:
+                return result
+            return response_parser(result)
+        method_callable.__name__ = method
+        return method_callable
+
     def get_service_descriptor(self, service):
         return self._desc_pool.FindServiceByName(service)
 
@@ -285,13 +552,123 @@ class BaseGrpcClient(BaseClient):
             raise ValueError(f"{name} does not support. Available service {self.service_names}")
 
 
-class ReflectionClient(BaseGrpcClient):
+class ReflectionDescriptorMixin:
+    """
+    Descriptor pool and descriptor cache handling shared by the sync and the
+    asyncio reflection clients. Subclasses only do the reflection I/O.
+    """
+    descriptor_cache: DescriptorCache = None
+
+    def _init_descriptors(self, descriptor_cache: DescriptorCache = None):
+        self.registered_file_names = set()
+        self.descriptor_cache = descriptor_cache
+        self._schema_fingerprint = None
+        self._resolved_file_descriptors = []
+        self._loaded_from_cache = False
+
+    @staticmethod
+    def _list_services_request():
+        return reflection_pb2.ServerReflectionRequest(list_services="")
+
+    @staticmethod
+    def _parse_list_services_response(response):
+        return tuple([s.name for s in response.list_services_response.service])
+
+    @staticmethod
+    def _get_schema_fingerprint(service_names, initial_metadata, responses=None):
+        """
+        Fingerprint reported in the ``initial_metadata`` of the reflection
+        call, or else hashed from the ``file_containing_symbol`` responses
+        of ``service_names``. ``None`` when responses are still needed.
+        """
+        for key, value in initial_metadata or ():
+            if key == SCHEMA_FINGERPRINT_METADATA_KEY:
+                return value
+        if responses is None:
+            return None
+        return make_fingerprint(service_names, [
+            file_descriptor
+            for response in responses
+            for file_descriptor in ReflectionDescriptorMixin._parse_file_descriptor_response(response)
+        ])
+
+    def _load_descriptor_cache(self, fingerprint):
+        self._schema_fingerprint = fingerprint
+        cached = self.descriptor_cache.load(self.endpoint, fingerprint)
+        if cached is None:
+            return None
+        logging.debug(f"load {len(cached.file_descriptors)} file descriptors of {self.endpoint} from cache")
+        for file_descriptor in cached.file_descriptors:
+            self._add_file_descriptor(file_descriptor)
+        self._loaded_from_cache = True
+        return cached.service_names
+
+    def _save_descriptor_cache(self):
+        if self.descriptor_cache is not None and not self._loaded_from_cache:
+            self.descriptor_cache.save(
+                self.endpoint,
+                self.service_names,
+                self._resolved_file_descriptors,
+                fingerprint=self._schema_fingerprint,
+            )
+
+    @staticmethod
+    def _parse_file_descriptor_response(response) -> List[descriptor_pb2.FileDescriptorProto]:
+        if response.HasField('error_response'):
+            raise ValueError(
+                f"reflection request failed with {response.error_response.error_code}: "
+                f"{response.error_response.error_message}")
+        return [
+            descriptor_pb2.FileDescriptorProto.FromString(proto)
+            for proto in response.file_descriptor_response.file_descriptor_proto
+        ]
+
+    @staticmethod
+    def _file_containing_symbol_requests(symbols):
+        return [reflection_pb2.ServerReflectionRequest(file_containing_symbol=symbol) for symbol in symbols]
+
+    def _collect_file_descriptors(self, responses, resolved: Dict[str, descriptor_pb2.FileDescriptorProto]):
+        """
+        Add the file descriptors of ``responses`` to ``resolved`` and return
+        the requests for the dependencies that are still missing.
+        """
+        for response in responses:
+            for file_descriptor in self._parse_file_descriptor_response(response):
+                resolved.setdefault(file_descriptor.name, file_descriptor)
+        missing = sorted({
+            dep_file_name
+            for file_descriptor in resolved.values()
+            for dep_file_name in file_descriptor.dependency
+            if dep_file_name not in resolved and dep_file_name not in self.registered_file_names
+        })
+        return [reflection_pb2.ServerReflectionRequest(file_by_filename=name) for name in missing]
+
+    def _add_file_descriptor(self, file_descriptor):
+        self._desc_pool.Add(file_descriptor)
+        self.registered_file_names.add(file_descriptor.name)
+        self._resolved_file_descriptors.append(file_descriptor)
+
+    def _register_file_descriptors(self, file_descriptors: Dict[str, descriptor_pb2.FileDescriptorProto]):
+        def register(name):
+            if name in self.registered_file_names:
+                return
+            file_descriptor = file_descriptors[name]
+            for dep_file_name in file_descriptor.dependency:
+                register(dep_file_name)
+            self._add_file_descriptor(file_descriptor)
+            logging.debug(f"{name} registered")
+
+        for file_name in file_descriptors:
+            register(file_name)
+
+
+class ReflectionClient(ReflectionDescriptorMixin, BaseGrpcClient):
 
     def __init__(self, endpoint, symbol_db=None, descriptor_pool=None, lazy=False, ssl=False, compression=None,
-                 **kwargs):
+                 descriptor_cache: DescriptorCache = None, **kwargs):
         super().__init__(endpoint, symbol_db, descriptor_pool, ssl=ssl, lazy=lazy, compression=compression, **kwargs)
         self.reflection_stub = reflection_pb2_grpc.ServerReflectionStub(self.channel)
-        self.registered_file_names = set()
+        self._init_descriptors(descriptor_cache)
         if not self._lazy:
             self.register_all_service()
 
@@ -305,45 +682,64 @@ class ReflectionClient(BaseGrpcClient):
             raise ValueError('response have more then one result')
         return results[0]
 
-    def _get_service_names(self):
-        request = reflection_pb2.ServerReflectionRequest(list_services="")
-        resp = self._reflection_single_request(request)
-        services = tuple([s.name for s in resp.list_services_response.service])
-        return services
-
-    def _get_file_descriptor_by_name(self, name):
-        request = reflection_pb2.ServerReflectionRequest(file_by_filename=name)
-        result = self._reflection_single_request(request)
-        proto = result.file_descriptor_response.file_descriptor_proto[0]
-        return descriptor_pb2.FileDescriptorProto.FromString(proto)
-
-    def _get_file_descriptor_by_symbol(self, symbol):
-        request = reflection_pb2.ServerReflectionRequest(file_containing_symbol=symbol)
-        result = self._reflection_single_request(request)
-        proto = result.file_descriptor_response.file_descriptor_proto[0]
-        return descriptor_pb2.FileDescriptorProto.FromString(proto)
-
-    def _register_file_descriptor(self, file_descriptor):
-        logging.debug(f"start {file_descriptor.name} register")
-        dependencies = list(file_descriptor.dependency)
-        logging.debug(f"find {len(dependencies)} dependency in {file_descriptor.name}")
-        for dep_file_name in dependencies:
-            if dep_file_name not in self.registered_file_names:
-                dep_desc = self._get_file_descriptor_by_name(dep_file_name)
-                self._register_file_descriptor(dep_desc)
-                self.registered_file_names.add(dep_file_name)
-            else:
-                logging.debug(f'{dep_file_name} already registered')
+    def _list_services(self):
+        resp = self._reflection_single_request(self._list_services_request())
+        return self._parse_list_services_response(resp)
 
-        self._desc_pool.Add(file_descriptor)
-        logging.debug(f"end {file_descriptor.name} register")
+    def _get_schema(self):
+        """Service names and schema fingerprint of the server."""
+        with ReflectionStream(self.reflection_stub) as stream:
+            service_names = self._parse_list_services_response(stream.request(self._list_services_request())[0])
+            fingerprint = self._get_schema_fingerprint(service_names, stream.initial_metadata())
+            if fingerprint is None:
+                responses = stream.request(*self._file_containing_symbol_requests(service_names))
+                fingerprint = self._get_schema_fingerprint(service_names, (), responses)
+        return service_names, fingerprint
+
+    def _get_service_names(self):
+        if self.descriptor_cache is None:
+            return self._list_services()
+
+        service_names = None
+        fingerprint = self.descriptor_cache.fingerprint
+        if not fingerprint:
+            service_names, fingerprint = self._get_schema()
+        cached_service_names = self._load_descriptor_cache(fingerprint)
+        if cached_service_names is not None:
+            return cached_service_names
+        return service_names if service_names is not None else self._list_services()
+
+    def _resolve_file_descriptors(self, symbols, stream: ReflectionStream):
+        """
+        Resolve the files defining ``symbols`` with their transitive
+        dependencies, sending one batch of requests per dependency level.
+        """
+        resolved: Dict[str, descriptor_pb2.FileDescriptorProto] = {}
+        requests = self._file_containing_symbol_requests(symbols)
+        while requests:
+            logging.debug(f"resolve {len(requests)} file descriptors from {self.endpoint}")
+            requests = self._collect_file_descriptors(stream.request(*requests), resolved)
+        return resolved
+
+    def _resolve_services(self, service_names):
+        with ReflectionStream(self.reflection_stub) as stream:
+            self._register_file_descriptors(self._resolve_file_descriptors(service_names, stream))
 
     def register_service(self, service_name):
         logging.debug(f"start {service_name} register")
-        file_descriptor = self._get_file_descriptor_by_symbol(service_name)
-        self._register_file_descriptor(file_descriptor)
+        if not self._loaded_from_cache:
+            self._resolve_services([service_name])
         super(ReflectionClient, self).register_service(service_name)
 
+    def register_all_service(self):
+        service_names = self.service_names
+        if not self._loaded_from_cache:
+            self._resolve_services(service_names)
+        for service in service_names:
+            super(ReflectionClient, self).register_service(service)
+        self.has_server_registered = True
+        self._save_descriptor_cache()
+
 
 class StubClient(BaseGrpcClient):
 
@@ -367,16 +763,45 @@ class ServiceClient:
         self.name = service_name
         self._methods_meta = self.client.get_methods_meta(self.name)
         self._method_names = tuple(self._methods_meta.keys())
+        self._messages = None
         self._register_methods()
 
     def _register_methods(self):
         for method in self._method_names:
-            setattr(self, method, partial(self.client.request, self.name, method))
+            if hasattr(type(self), method) or method in self.__dict__:
+                raise ValueError(
+                    f"{self.name}.{method} collides with the `{method}` attribute of {type(self).__name__}, "
+                    f"call it with `client.get_method_callable({self.name!r}, {method!r})` instead.")
+            setattr(self, method, self.client.get_method_callable(self.name, method))
 
     @property
     def method_names(self):
         return self._method_names
 
+    def batch(self, method, requests, **kwargs):
+        """
+        Call the unary ``method`` for every request in a single RPC::
+
+            posts = service.batch('retrieve', [{'id': 1}, {'id': 2}])
+        """
+        return self.client.batch(self.name, method, requests, **kwargs)
+
+    @property
+    def messages(self):
+        """
+        Namespace of the message classes used by the service methods, to
+        build requests without a dict conversion::
+
+            service.retrieve(service.messages.PostRetrieveRequest(id=1))
+        """
+        if self._messages is None:
+            message_types = {}
+            for method_meta in self._methods_meta.values():
+                for message_type in (method_meta.input_type, method_meta.output_type):
+                    message_types[message_type.DESCRIPTOR.name] = message_type
+            self._messages = SimpleNamespace(**message_types)
+        return self._messages
+
 
 Client = ReflectionClient
 
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from google.protobuf import descriptor_pb2
+
+logger = logging.getLogger(__name__)
+
+
+class CachedDescriptors(NamedTuple):
+    fingerprint: str
+    service_names: Tuple[str, ...]
+    file_descriptors: List[descriptor_pb2.FileDescriptorProto]
+
+
+def make_fingerprint(service_names: Iterable[str],
+                     file_descriptors: Iterable[descriptor_pb2.FileDescriptorProto] = ()) -> str:
+    """
+    Fingerprint of a server schema built from the services it reports
+    through reflection and the files defining them.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(service_names):
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+    for file_descriptor in sorted(file_descriptors, key=lambda file_descriptor: file_descriptor.name):
+        digest.update(file_descriptor.SerializeToString(deterministic=True))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class DescriptorCache:
+    """
+    Persists the ``FileDescriptorProto`` set resolved through reflection for
+    an endpoint, so a warm client can register every service without
+    reflection traffic::
+
+        cache = DescriptorCache('/var/cache/grpc_bus')
+        client = ReflectionClient('localhost:50051', descriptor_cache=cache)
+
+    Entries are keyed by endpoint and stamped with a schema fingerprint. When
+    ``fingerprint`` is given (e.g. the deployed release of the producer) the
+    cache is trusted as is, otherwise the fingerprint is the one reported by
+    the server in the ``schema-fingerprint`` metadata of the reflection call,
+    or one hashed from the files defining the listed services, and a mismatch
+    rebuilds the entry. Files are
+    replaced atomically, so any number of processes can share one directory.
+    """
+
+    def __init__(self, path, fingerprint: Optional[str] = None):
+        self.path = path
+        self.fingerprint = fingerprint
+
+    def get_cache_file(self, endpoint):
+        name = hashlib.sha1(endpoint.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, f'{name}.json')
+
+    def load(self, endpoint, fingerprint=None) -> Optional[CachedDescriptors]:
+        fingerprint = fingerprint or self.fingerprint
+        cache_file = self.get_cache_file(endpoint)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.warning(f'Unable to read descriptor cache {cache_file}: {error}')
+            return None
+
+        if content.get('endpoint') != endpoint:
+            return None
+        if fingerprint and content.get('fingerprint') != fingerprint:
+            logger.debug(f'descriptor cache for {endpoint} is stale')
+            return None
+        return CachedDescriptors(
+            fingerprint=content['fingerprint'],
+            service_names=tuple(content['services']),
+            file_descriptors=[
+                descriptor_pb2.FileDescriptorProto.FromString(base64.b64decode(proto))
+                for proto in content['files']
+            ],
+        )
+
+    def save(self, endpoint, service_names, file_descriptors, fingerprint=None):
+        fingerprint = fingerprint or self.fingerprint or make_fingerprint(service_names, file_descriptors)
+        content = {
+            'endpoint': endpoint,
+            'fingerprint': fingerprint,
+            'services': list(service_names),
+            'files': [
+                base64.b64encode(file_descriptor.SerializeToString()).decode('ascii')
+                for file_descriptor in file_descriptors
+            ],
+        }
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(content, f)
+            os.replace(tmp_path, self.get_cache_file(endpoint))
+        except OSError as error:
+            logger.warning(f'Unable to write descriptor cache for {endpoint}: {error}')
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self, endpoint):
+        try:
+            os.remove(self.get_cache_file(endpoint))
+        except FileNotFoundError:
+            pass
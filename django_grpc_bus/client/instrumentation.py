@@ -0,0 +1,272 @@
+"""
+Client call instrumentation. Hooks get a :class:`CallRecord` for every
+sampled call, timing its three phases: building the request messages from
+dicts (``ParseDict``), waiting on the network and the server, and converting
+the responses back (``MessageToDict``)::
+
+    stats = CallStats()
+    client = ReflectionClient('localhost:50051', hooks=[stats], hook_sample_rate=0.1)
+    ...
+    stats.snapshot()
+
+Unsampled calls go through the plain code path, so the overhead is bounded by
+the sample rate.
+"""
+import logging
+import random
+import threading
+from time import perf_counter
+from typing import Iterable
+
+import grpc
+
+logger = logging.getLogger(__name__)
+
+
+class CallRecord:
+    """
+    Measures of one call. Streamed messages add up, ``network_seconds`` is
+    the time spent waiting for the handler or the next response message.
+    Messages passed as protobuf messages or returned raw have no
+    serialization or deserialization time.
+    """
+    __slots__ = (
+        'endpoint', 'service', 'method', 'method_type', 'serialize_seconds', 'network_seconds',
+        'deserialize_seconds', 'request_messages', 'request_bytes', 'response_messages', 'response_bytes',
+        'retries', 'code',
+    )
+
+    def __init__(self, endpoint, service, method, method_type):
+        self.endpoint = endpoint
+        self.service = service
+        self.method = method
+        self.method_type = method_type
+        self.serialize_seconds = 0.0
+        self.network_seconds = 0.0
+        self.deserialize_seconds = 0.0
+        self.request_messages = 0
+        self.request_bytes = 0
+        self.response_messages = 0
+        self.response_bytes = 0
+        # Attempts made after the first one.
+        self.retries = 0
+        self.code = grpc.StatusCode.OK
+
+    @property
+    def total_seconds(self):
+        return self.serialize_seconds + self.network_seconds + self.deserialize_seconds
+
+    def set_error(self, error):
+        self.code = error.code() if isinstance(error, grpc.RpcError) else grpc.StatusCode.UNKNOWN
+
+    def __repr__(self):
+        return (f'<CallRecord {self.service}/{self.method} {self.code.name} '
+                f'serialize={self.serialize_seconds:.6f} network={self.network_seconds:.6f} '
+                f'deserialize={self.deserialize_seconds:.6f}>')
+
+
+class ClientHook:
+    """Base class of the hooks, called with the record of every sampled call."""
+
+    def on_call(self, record: CallRecord):
+        raise NotImplementedError('on_call() must be implemented.')
+
+
+class LoggingHook(ClientHook):
+    def __init__(self, logger_name=__name__, level=logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def on_call(self, record: CallRecord):
+        self.logger.log(
+            self.level, '%s %s/%s %s serialize=%.6fs network=%.6fs deserialize=%.6fs '
+                        'request=%dB response=%dB retries=%d',
+            record.endpoint, record.service, record.method, record.code.name, record.serialize_seconds,
+            record.network_seconds, record.deserialize_seconds, record.request_bytes, record.response_bytes,
+            record.retries,
+        )
+
+
+class CallStats(ClientHook):
+    """Totals of the sampled calls per ``(endpoint, service, method)``."""
+    _totals = (
+        'serialize_seconds', 'network_seconds', 'deserialize_seconds', 'request_messages', 'request_bytes',
+        'response_messages', 'response_bytes', 'retries',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def on_call(self, record: CallRecord):
+        key = (record.endpoint, record.service, record.method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {'calls': 0, 'codes': {}, **dict.fromkeys(self._totals, 0)}
+            stats['calls'] += 1
+            stats['codes'][record.code.name] = stats['codes'].get(record.code.name, 0) + 1
+            for name in self._totals:
+                stats[name] += getattr(record, name)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**stats, 'codes': dict(stats['codes'])} for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+class Instrumentation:
+    """
+    Runs sampled calls measuring them, and reports them to ``hooks``.
+    ``request_parser`` builds a request message from a dict and
+    ``response_parser`` converts a response message.
+    """
+
+    def __init__(self, hooks: Iterable[ClientHook], sample_rate: float = 1.0):
+        self.hooks = tuple(hooks)
+        self.sample_rate = sample_rate
+
+    def sample(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def report(self, record: CallRecord):
+        for hook in self.hooks:
+            try:
+                hook.on_call(record)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Client hook %r failed.', hook)
+
+    @staticmethod
+    def _parse_request(record, request, input_type, request_parser):
+        start = perf_counter()
+        message = request_parser(request, input_type)
+        record.serialize_seconds += perf_counter() - start
+        record.request_messages += 1
+        record.request_bytes += message.ByteSize()
+        return message
+
+    def _parse_requests(self, record, requests, input_type, request_parser):
+        for request in requests:
+            yield self._parse_request(record, request or {}, input_type, request_parser)
+
+    async def _parse_async_requests(self, record, requests, input_type, request_parser):
+        if hasattr(requests, '__aiter__'):
+            async for request in requests:
+                yield self._parse_request(record, request or {}, input_type, request_parser)
+        else:
+            for request in requests:
+                yield self._parse_request(record, request or {}, input_type, request_parser)
+
+    def _build_request(self, record, request, input_type, request_parser, is_async=False):
+        if record.method_type.is_unary_request:
+            return self._parse_request(record, request, input_type, request_parser)
+        if is_async:
+            return self._parse_async_requests(record, request, input_type, request_parser)
+        return self._parse_requests(record, request, input_type, request_parser)
+
+    @staticmethod
+    def _set_network_seconds(record, start):
+        record.network_seconds = perf_counter() - start
+        if not record.method_type.is_unary_request:
+            # Streamed requests are parsed while the call runs.
+            record.network_seconds -= record.serialize_seconds
+
+    @staticmethod
+    def _parse_response(record, response, raw_output, response_parser):
+        record.response_messages += 1
+        record.response_bytes += response.ByteSize()
+        if raw_output:
+            return response
+        start = perf_counter()
+        data = response_parser(response)
+        record.deserialize_seconds += perf_counter() - start
+        return data
+
+    def call(self, record: CallRecord, handler, request, input_type, raw_output, kwargs,
+             request_parser, response_parser):
+        """Run a sampled call, returning what ``BaseGrpcClient._request`` does."""
+        if not record.method_type.is_unary_response:
+            return self._stream_call(record, handler, request, input_type, raw_output, kwargs,
+                                     request_parser, response_parser)
+        try:
+            message = self._build_request(record, request, input_type, request_parser)
+            start = perf_counter()
+            try:
+                response = handler(message, **kwargs)
+            finally:
+                self._set_network_seconds(record, start)
+            return self._parse_response(record, response, raw_output, response_parser)
+        except BaseException as error:
+            record.set_error(error)
+            raise
+        finally:
+            self.report(record)
+
+    def _stream_call(self, record, handler, request, input_type, raw_output, kwargs,
+                     request_parser, response_parser):
+        try:
+            message = self._build_request(record, request, input_type, request_parser)
+            start = perf_counter()
+            responses = handler(message, **kwargs)
+            while True:
+                try:
+                    response = next(responses)
+                except StopIteration:
+                    break
+                finally:
+                    record.network_seconds += perf_counter() - start
+                yield self._parse_response(record, response, raw_output, response_parser)
+                start = perf_counter()
+        except GeneratorExit:
+            # The caller stopped reading, the record covers what it read.
+            raise
+        except BaseException as error:
+            record.set_error(error)
+            raise
+        finally:
+            self.report(record)
+
+    async def async_call(self, record: CallRecord, handler, request, input_type, raw_output, kwargs,
+                         request_parser, response_parser):
+        """``grpc.aio`` counterpart of :meth:`call` for unary responses."""
+        try:
+            message = self._build_request(record, request, input_type, request_parser, is_async=True)
+            start = perf_counter()
+            try:
+                response = await handler(message, **kwargs)
+            finally:
+                self._set_network_seconds(record, start)
+            return self._parse_response(record, response, raw_output, response_parser)
+        except BaseException as error:
+            record.set_error(error)
+            raise
+        finally:
+            self.report(record)
+
+    async def async_stream_call(self, record: CallRecord, handler, request, input_type, raw_output, kwargs,
+                                request_parser, response_parser):
+        """``grpc.aio`` counterpart of :meth:`call` for streamed responses."""
+        try:
+            message = self._build_request(record, request, input_type, request_parser, is_async=True)
+            start = perf_counter()
+            responses = handler(message, **kwargs).__aiter__()
+            while True:
+                try:
+                    response = await responses.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    record.network_seconds += perf_counter() - start
+                yield self._parse_response(record, response, raw_output, response_parser)
+                start = perf_counter()
+        except GeneratorExit:
+            # The caller stopped reading, the record covers what it read.
+            raise
+        except BaseException as error:
+            record.set_error(error)
+            raise
+        finally:
+            self.report(record)
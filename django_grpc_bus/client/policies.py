@@ -0,0 +1,481 @@
+"""
+Client side policies of the servlets against degraded producers: a circuit
+breaker failing the calls fast while a producer keeps erroring, and hedged
+requests cutting the tail latency of idempotent methods::
+
+    client = ReflectionClient(
+        'localhost:50051',
+        circuit_breaker=CircuitBreaker(failure_rate=0.5, open_seconds=30),
+        hedging=HedgingPolicy(methods=['retrieve', 'list'], delay=0.05),
+    )
+
+Retries with backoff are left to gRPC, see ``Servlet.get_service_config``.
+"""
+import asyncio
+import collections
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable
+
+import grpc
+
+from .. import exceptions
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+def get_status_codes(codes):
+    """``grpc.StatusCode`` members of ``codes``, given as members or names."""
+    return frozenset(code if isinstance(code, grpc.StatusCode) else grpc.StatusCode[code] for code in codes)
+
+
+class CircuitBreaker:
+    """
+    Opens once ``failure_rate`` of the calls of the last ``window`` seconds
+    failed with one of ``failure_codes``, over at least ``minimum_calls``
+    calls. Calls are then refused with :class:`~django_grpc_bus.exceptions.CircuitOpenError`
+    for ``open_seconds``, after which ``half_open_calls`` trial calls are let
+    through: the circuit closes if they all succeed and opens again otherwise.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    default_failure_codes = ('UNAVAILABLE', 'DEADLINE_EXCEEDED', 'RESOURCE_EXHAUSTED', 'INTERNAL')
+
+    def __init__(self, failure_rate: float = 0.5, minimum_calls: int = 20, window: int = 10,
+                 open_seconds: float = 30, half_open_calls: int = 5, failure_codes: Iterable = None, name=None):
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.failure_codes = get_status_codes(failure_codes or self.default_failure_codes)
+        self.name = name
+        self.state = self.CLOSED
+        self.opened_at = None
+        # Total of the open transitions and of the refused calls.
+        self.opened = 0
+        self.rejected = 0
+        # [second, calls, failures] of the last ``window`` seconds.
+        self._buckets = collections.deque()
+        self._calls = 0
+        self._failures = 0
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        oldest = int(now) - self.window
+        while self._buckets and self._buckets[0][0] <= oldest:
+            second, calls, failures = self._buckets.popleft()
+            self._calls -= calls
+            self._failures -= failures
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.opened += 1
+        self._buckets.clear()
+        self._calls = self._failures = 0
+        logger.warning('Circuit breaker of %s opened', self.name)
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.opened_at = None
+        logger.info('Circuit breaker of %s closed', self.name)
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` if the call may not be made."""
+        if self.state == self.CLOSED:
+            return
+        with self._lock:
+            if self.state == self.OPEN:
+                retry_in = self.opened_at + self.open_seconds - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise exceptions.CircuitOpenError(self.name, retry_in)
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                self._trials = self._trial_successes = 0
+            if self.state == self.HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    # Trials which never told their outcome are given up
+                    # after ``open_seconds``.
+                    if self.opened_at + self.open_seconds > time.monotonic():
+                        self.rejected += 1
+                        raise exceptions.CircuitOpenError(self.name, 0)
+                    self.opened_at = time.monotonic()
+                    self._trials = self._trial_successes = 0
+                self._trials += 1
+
+    def record(self, code):
+        """
+        Count the outcome of a call ended with the status ``code``. Calls
+        cancelled by the client, like the hedged attempts that lost, say
+        nothing about the servlet and are not counted.
+        """
+        failed = code in self.failure_codes
+        now = time.monotonic()
+        with self._lock:
+            if code == grpc.StatusCode.CANCELLED:
+                if self.state == self.HALF_OPEN:
+                    self._trials = max(self._trials - 1, 0)
+                return
+            if self.state == self.HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._close()
+                return
+            if self.state == self.OPEN:
+                return
+            self._expire(now)
+            second = int(now)
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, 0, 0])
+            bucket = self._buckets[-1]
+            bucket[1] += 1
+            self._calls += 1
+            if failed:
+                bucket[2] += 1
+                self._failures += 1
+                if self._calls >= self.minimum_calls and self._failures >= self.failure_rate * self._calls:
+                    self._open(now)
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                self._expire(now)
+            return {
+                'state': self.state,
+                'calls': self._calls,
+                'failures': self._failures,
+                'failure_rate': self._failures / self._calls if self._calls else 0.0,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'retry_in': max(self.opened_at + self.open_seconds - now, 0) if self.state == self.OPEN else None,
+            }
+
+
+class GuardedMultiCallable:
+    """
+    Method handler refusing the calls while its :class:`CircuitBreaker` is
+    open and telling it the outcome of the others.
+    """
+
+    def __init__(self, multi_callable, circuit_breaker: CircuitBreaker):
+        self.circuit_breaker = circuit_breaker
+        self._multi_callable = multi_callable
+
+    def _record_call(self, call):
+        self.circuit_breaker.record(call.code())
+
+    def _invoke(self, attr, *args, **kwargs):
+        self.circuit_breaker.before_call()
+        try:
+            result = getattr(self._multi_callable, attr)(*args, **kwargs)
+        except grpc.RpcError as error:
+            self.circuit_breaker.record(error.code())
+            raise
+        if hasattr(result, 'add_done_callback'):
+            # Futures and streaming calls are counted once they are done.
+            result.add_done_callback(self._record_call)
+        else:
+            self.circuit_breaker.record(grpc.StatusCode.OK)
+        return result
+
+    def __call__(self, *args, **kwargs):
+        return self._invoke('__call__', *args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._invoke('with_call', *args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._invoke('future', *args, **kwargs)
+
+
+class AsyncGuardedMultiCallable(GuardedMultiCallable):
+    """``grpc.aio`` counterpart of :class:`GuardedMultiCallable`."""
+
+    def _record_call(self, call):
+        # The status of the aio calls is only awaitable.
+        asyncio.ensure_future(self._record_status(call))
+
+    async def _record_status(self, call):
+        self.circuit_breaker.record(await call.code())
+
+    def __call__(self, *args, **kwargs):
+        self.circuit_breaker.before_call()
+        call = self._multi_callable(*args, **kwargs)
+        call.add_done_callback(self._record_call)
+        return call
+
+
+class RetryThrottle:
+    """
+    Token bucket of gRPC's ``retryThrottling`` for the attempts made by the
+    client: every attempt failing with a non fatal code takes a token, every
+    successful call gives ``token_ratio`` back, and more attempts are only
+    sent while more than half of the ``max_tokens`` are left.
+    """
+
+    def __init__(self, max_tokens: float = 10, token_ratio: float = 0.1):
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def allows_attempt(self):
+        return self._tokens > self.max_tokens / 2
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self._tokens = min(self._tokens + self.token_ratio, self.max_tokens)
+            else:
+                self._tokens = max(self._tokens - 1, 0)
+
+
+class HedgingPolicy:
+    """
+    Hedging of the idempotent unary request ``methods`` (method names or
+    ``package.Service/method``): up to ``max_attempts`` copies of a call are
+    sent, each ``delay`` seconds after the previous one, or at once when an
+    attempt fails with one of ``non_fatal_status_codes``. The first response
+    wins and the other attempts are cancelled. With a ``throttle`` no more
+    copies are sent while too many attempts fail.
+    """
+
+    def __init__(self, methods: Iterable[str] = ('retrieve', 'list'), max_attempts: int = 2, delay: float = 0.05,
+                 non_fatal_status_codes: Iterable = ('UNAVAILABLE',), throttle: RetryThrottle = None):
+        self.methods = frozenset(methods)
+        self.max_attempts = max_attempts
+        self.delay = delay
+        self.non_fatal_status_codes = get_status_codes(non_fatal_status_codes)
+        self.throttle = throttle
+
+    def is_hedged(self, method_full_name, method_type):
+        """Whether the ``/package.Service/method`` calls are hedged."""
+        if not method_type.is_unary_request:
+            return False
+        name = method_full_name.lstrip('/')
+        return name in self.methods or name.rpartition('/')[2] in self.methods
+
+    def is_non_fatal(self, error):
+        return isinstance(error, grpc.RpcError) and error.code() in self.non_fatal_status_codes
+
+    def allows_attempt(self):
+        """Whether another copy of a call may be sent."""
+        return self.throttle is None or self.throttle.allows_attempt()
+
+    def record(self, error=None):
+        """Record the outcome of an attempt, ``error`` being ``None`` for a response."""
+        if self.throttle is None:
+            return
+        if error is None:
+            self.throttle.record(True)
+        elif self.is_non_fatal(error):
+            self.throttle.record(False)
+
+
+def _get_attempt_kwargs(kwargs, deadline):
+    """``kwargs`` of an attempt, its timeout reduced to the time left."""
+    if deadline is None:
+        return kwargs
+    return {**kwargs, 'timeout': max(deadline - time.monotonic(), 0)}
+
+
+class _HedgedStream:
+    """Responses of the winning attempt, its first message already read."""
+
+    def __init__(self, call, first):
+        self._call = call
+        self._first = first
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._first is not _END:
+            message, self._first = self._first, _END
+            return message
+        return next(self._call)
+
+    def __getattr__(self, item):
+        return getattr(self._call, item)
+
+
+class HedgedMultiCallable:
+    """
+    Method handler hedging the calls of a unary request method according to
+    its :class:`HedgingPolicy`. Stream responses win with their first message,
+    read in a thread of its own for each attempt. ``future()`` calls are not
+    hedged.
+    """
+
+    def __init__(self, multi_callable, policy: HedgingPolicy, stream=False):
+        self.policy = policy
+        self.stream = stream
+        self._multi_callable = multi_callable
+
+    def _start(self, request, kwargs, results):
+        if not self.stream:
+            call = self._multi_callable.future(request, **kwargs)
+            call.add_done_callback(lambda _: results.put((call, call)))
+            return call
+
+        call = self._multi_callable(request, **kwargs)
+
+        def read_first():
+            outcome = Future()
+            try:
+                outcome.set_result(next(call, _END))
+            except Exception as error:  # pylint: disable=broad-except
+                outcome.set_exception(error)
+            results.put((call, outcome))
+        threading.Thread(target=read_first, daemon=True).start()
+        return call
+
+    def _hedge(self, request, kwargs):
+        """Return the winning ``(call, result)``, the result of a stream being its first message."""
+        policy = self.policy
+        timeout = kwargs.get('timeout')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = queue.Queue()
+        calls = [self._start(request, kwargs, results)]
+        max_attempts = policy.max_attempts
+        failures = 0
+        error = winner = None
+        try:
+            while True:
+                try:
+                    call, outcome = results.get(timeout=policy.delay if len(calls) < max_attempts else None)
+                except queue.Empty:
+                    pass
+                else:
+                    error = outcome.exception()
+                    policy.record(error)
+                    if error is None:
+                        winner = call
+                        return call, outcome.result()
+                    failures += 1
+                    if not policy.is_non_fatal(error) or failures == max_attempts:
+                        raise error
+                if len(calls) < max_attempts and not policy.allows_attempt():
+                    max_attempts = len(calls)
+                if len(calls) < max_attempts:
+                    try:
+                        calls.append(self._start(request, _get_attempt_kwargs(kwargs, deadline), results))
+                    except exceptions.CircuitOpenError:
+                        max_attempts = len(calls)
+                if failures == len(calls):
+                    raise error
+        finally:
+            for call in calls:
+                if call is not winner:
+                    call.cancel()
+
+    def with_call(self, request, **kwargs):
+        call, response = self._hedge(request, kwargs)
+        return response, call
+
+    def __call__(self, request, **kwargs):
+        call, result = self._hedge(request, kwargs)
+        if self.stream:
+            return _HedgedStream(call, result)
+        return result
+
+    def future(self, request, **kwargs):
+        return self._multi_callable.future(request, **kwargs)
+
+
+class _AsyncHedgedCall:
+    """Awaitable of a hedged aio unary call, then proxy of the winning call."""
+
+    def __init__(self, coroutine):
+        self._coroutine = coroutine
+        self._call = None
+
+    def __await__(self):
+        self._call, response = yield from self._coroutine.__await__()
+        return response
+
+    def __getattr__(self, item):
+        return getattr(self._call, item)
+
+
+class AsyncHedgedMultiCallable(HedgedMultiCallable):
+    """``grpc.aio`` counterpart of :class:`HedgedMultiCallable`."""
+
+    def _start(self, request, kwargs, tasks):
+        call = self._multi_callable(request, **kwargs)
+        task = asyncio.ensure_future(call.read() if self.stream else call)
+        tasks[task] = call
+        return task
+
+    async def _hedge(self, request, kwargs):
+        policy = self.policy
+        timeout = kwargs.get('timeout')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tasks = {}
+        pending = {self._start(request, kwargs, tasks)}
+        max_attempts = policy.max_attempts
+        failures = 0
+        error = winner = None
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, timeout=policy.delay if len(tasks) < max_attempts else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    error = task.exception()
+                    policy.record(error)
+                    if error is None:
+                        winner = tasks[task]
+                        return winner, task.result()
+                    failures += 1
+                    if not policy.is_non_fatal(error) or failures == max_attempts:
+                        raise error
+                if len(tasks) < max_attempts and not policy.allows_attempt():
+                    max_attempts = len(tasks)
+                if len(tasks) < max_attempts:
+                    try:
+                        pending.add(self._start(request, _get_attempt_kwargs(kwargs, deadline), tasks))
+                    except exceptions.CircuitOpenError:
+                        max_attempts = len(tasks)
+                if failures == len(tasks):
+                    raise error
+        finally:
+            for task, call in tasks.items():
+                if call is winner:
+                    continue
+                if task.done():
+                    # Retrieved, so that the failures are not logged.
+                    if not task.cancelled():
+                        task.exception()
+                else:
+                    task.cancel()
+                    call.cancel()
+
+    async def _stream(self, request, kwargs):
+        call, message = await self._hedge(request, kwargs)
+        try:
+            while message is not grpc.aio.EOF:
+                yield message
+                message = await call.read()
+        finally:
+            call.cancel()
+
+    def __call__(self, request, **kwargs):
+        if self.stream:
+            return self._stream(request, kwargs)
+        return _AsyncHedgedCall(self._hedge(request, kwargs))
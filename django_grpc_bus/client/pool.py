@@ -0,0 +1,88 @@
+import itertools
+import threading
+from typing import Callable, List
+
+
+class ChannelPool:
+    """
+    A pool of channels to one endpoint. Every channel gets distinct channel
+    args and its own subchannel pool, so gRPC opens a separate HTTP/2
+    connection for each of them and calls are not capped by the
+    max-concurrent-streams limit of a single connection.
+
+    Calls are spread with the ``round_robin`` or the ``least_in_flight``
+    policy.
+    """
+    ROUND_ROBIN = 'round_robin'
+    LEAST_IN_FLIGHT = 'least_in_flight'
+    policies = (ROUND_ROBIN, LEAST_IN_FLIGHT)
+
+    def __init__(self, create_channel: Callable, size: int, options=None, policy: str = ROUND_ROBIN):
+        if policy not in self.policies:
+            raise ValueError(f"{policy} is not a channel pool policy. Available policies {self.policies}")
+        self.size = size
+        self.policy = policy
+        self.channels = [create_channel(self.get_channel_options(options, index)) for index in range(size)]
+        self.in_flight: List[int] = [0] * size
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_channel_options(options, index):
+        return list(options or []) + [
+            ('grpc.use_local_subchannel_pool', 1),
+            ('django_grpc_bus.channel_index', index),
+        ]
+
+    def acquire(self) -> int:
+        if self.policy == self.ROUND_ROBIN:
+            return next(self._counter) % self.size
+        with self._lock:
+            index = min(range(self.size), key=self.in_flight.__getitem__)
+            self.in_flight[index] += 1
+        return index
+
+    def release(self, index: int):
+        if self.policy == self.ROUND_ROBIN:
+            return
+        with self._lock:
+            self.in_flight[index] -= 1
+
+    def multi_callable(self, method_type: str, **kwargs):
+        return PooledMultiCallable(
+            self, [getattr(channel, method_type)(**kwargs) for channel in self.channels]
+        )
+
+
+class PooledMultiCallable:
+    """
+    Method handler bound to every channel of a :class:`ChannelPool`, each
+    invocation goes through the channel picked by the pool.
+    """
+
+    def __init__(self, pool: ChannelPool, multi_callables):
+        self.pool = pool
+        self._multi_callables = multi_callables
+
+    def _invoke(self, attr, *args, **kwargs):
+        index = self.pool.acquire()
+        try:
+            result = getattr(self._multi_callables[index], attr)(*args, **kwargs)
+        except BaseException:
+            self.pool.release(index)
+            raise
+        if hasattr(result, 'add_done_callback'):
+            # Futures and streaming calls stay in flight until they are done.
+            result.add_done_callback(lambda _: self.pool.release(index))
+        else:
+            self.pool.release(index)
+        return result
+
+    def __call__(self, *args, **kwargs):
+        return self._invoke('__call__', *args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._invoke('with_call', *args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._invoke('future', *args, **kwargs)
@@ -1,8 +1,16 @@
+import ipaddress
+import json
+
+import grpc
 from grpc._channel import _Rendezvous
 
 from django_grpc_bus import exceptions
+from django_grpc_bus.client import aio
 from django_grpc_bus.client.client import get_by_endpoint
-from django_grpc_bus.settings import message_bus_settings
+from django_grpc_bus.client.descriptor_cache import DescriptorCache
+from django_grpc_bus.client.policies import CircuitBreaker, HedgingPolicy, RetryThrottle
+from django_grpc_bus.client.response_cache import ClientCache
+from django_grpc_bus.settings import message_bus_settings, perform_import
 
 
 class Servlet:
@@ -11,12 +19,199 @@ class Servlet:
         self._servlet = self._get_servlet()
         self._host = self._servlet.get('host', 'localhost')
         self._port = self._servlet.get('port', 50051)
+        self._endpoint = self._get_endpoint()
+        self.circuit_breaker = self.get_circuit_breaker()
         self._client = None
 
     def get_client(self):
         return get_by_endpoint(
-            endpoint=f'{self._host}:{self._port}'
+            endpoint=self._endpoint,
+            **self.get_client_options()
+        )
+
+    def _get_endpoint(self):
+        """
+        The channel target, either ``target`` (any gRPC resolver target such
+        as ``dns:///producer:50051``), a static ``ipv4:``/``ipv6:`` target
+        built from the ``hosts`` list, or ``host:port``.
+        """
+        if self._servlet.get('target'):
+            return self._servlet['target']
+        hosts = self._servlet.get('hosts')
+        if not hosts:
+            return f'{self._host}:{self._port}'
+        if not isinstance(hosts, (list, tuple)):
+            raise exceptions.ServerConfigError(
+                f'Invalid hosts config for {self.name}. It must be a list.'
+            )
+
+        addresses = []
+        for address in hosts:
+            if isinstance(address, dict):
+                host, port = address.get('host', 'localhost'), address.get('port', self._port)
+            else:
+                host, port = self._split_host_port(str(address))
+            host = host.strip('[]')
+            try:
+                addresses.append((ipaddress.ip_address(host), port))
+            except ValueError:
+                raise exceptions.ServerConfigError(
+                    f'Invalid host `{host}` for {self.name}. The hosts list only '
+                    f'accepts IP addresses, use `target` with a `dns:///` '
+                    f'target for host names.'
+                )
+        versions = {ip.version for ip, port in addresses}
+        if len(versions) > 1:
+            raise exceptions.ServerConfigError(
+                f'Invalid hosts config for {self.name}. IPv4 and IPv6 '
+                f'addresses can not be mixed.'
+            )
+        if versions == {6}:
+            return 'ipv6:' + ','.join(f'[{ip}]:{port}' for ip, port in addresses)
+        return 'ipv4:' + ','.join(f'{ip}:{port}' for ip, port in addresses)
+
+    def _split_host_port(self, address):
+        """
+        ``(host, port)`` of a ``host[:port]`` address, IPv6 addresses being
+        enclosed in brackets (``[::1]:50051``). The port defaults to the
+        servlet ``port``.
+        """
+        if address.startswith('['):
+            host, bracket, port = address[1:].partition(']')
+            if not bracket or (port and not port.startswith(':')):
+                raise exceptions.ServerConfigError(f'Invalid host `{address}` for {self.name}.')
+            return host, port[1:] or self._port
+        if address.count(':') > 1:
+            raise exceptions.ServerConfigError(
+                f'Invalid host `{address}` for {self.name}. IPv6 addresses '
+                f'must be enclosed in brackets, e.g. `[::1]:50051`.'
+            )
+        host, _, port = address.partition(':')
+        return host, port or self._port
+
+    @property
+    def is_balanced(self):
+        return bool(self._servlet.get('target') or self._servlet.get('hosts'))
+
+    def get_service_config(self):
+        """
+        gRPC service config of the servlet channels. Balanced servlets use the
+        ``lb_policy`` (``round_robin`` by default) and skip backends that are
+        not ``SERVING`` through the ``grpc.health.v1`` service registered by
+        ``BasicHandler``.
+        """
+        service_config = {}
+        lb_policy = self._servlet.get('lb_policy', 'round_robin' if self.is_balanced else None)
+        if lb_policy:
+            service_config['loadBalancingConfig'] = [{lb_policy: {}}]
+        if self._servlet.get('health_check', self.is_balanced):
+            service_config['healthCheckConfig'] = {'serviceName': ''}
+        retry = self._get_policy_config('retry')
+        if retry is not None:
+            service_config['methodConfig'] = [{'name': [{}], 'retryPolicy': self.get_retry_policy(retry)}]
+        throttling = self._get_policy_config('retry_throttling')
+        if throttling is not None:
+            service_config['retryThrottling'] = {
+                'maxTokens': throttling.get('max_tokens', 10),
+                'tokenRatio': throttling.get('token_ratio', 0.1),
+            }
+        return service_config
+
+    @staticmethod
+    def get_retry_policy(retry):
+        """
+        gRPC ``retryPolicy`` of the servlet ``retry`` option. The calls
+        failing with one of its ``status_codes`` are retried by gRPC up to
+        ``max_attempts`` times in all, with an exponential backoff.
+        """
+        return {
+            'maxAttempts': retry.get('max_attempts', 3),
+            'initialBackoff': f"{retry.get('initial_backoff', 0.1)}s",
+            'maxBackoff': f"{retry.get('max_backoff', 1)}s",
+            'backoffMultiplier': retry.get('backoff_multiplier', 2),
+            'retryableStatusCodes': [
+                getattr(code, 'name', code) for code in retry.get('status_codes', ['UNAVAILABLE'])
+            ],
+        }
+
+    def _get_policy_config(self, key):
+        """The ``key`` policy options, ``{}`` for ``True`` and ``None`` when unset."""
+        config = self._servlet.get(key)
+        if not config:
+            return None
+        if config is True:
+            return {}
+        if not isinstance(config, dict):
+            raise exceptions.ServerConfigError(
+                f'Invalid {key} config for {self.name}. It must be a dict or True.'
+            )
+        return config
+
+    def get_circuit_breaker(self):
+        config = self._get_policy_config('circuit_breaker')
+        if config is None:
+            return None
+        return CircuitBreaker(name=self.name, **config)
+
+    def get_hedging_policy(self):
+        """
+        Hedging of the servlet, its attempts throttled by the
+        ``retry_throttling`` option like the retries made by gRPC.
+        """
+        config = self._get_policy_config('hedging')
+        if config is None:
+            return None
+        throttling = self._get_policy_config('retry_throttling')
+        if throttling is not None:
+            config = {**config, 'throttle': RetryThrottle(**throttling)}
+        return HedgingPolicy(**config)
+
+    def get_client_options(self):
+        options = {
+            'pool_size': self._servlet.get('channels', 1),
+            'proto_mode': self._servlet.get('proto_mode', False),
+            'lazy_dict': self._servlet.get('lazy_dict', False),
+            'timeout': self._servlet.get('timeout', message_bus_settings.SERVICE_TIMEOUT),
+            'stream_timeout': self._servlet.get('stream_timeout', message_bus_settings.SERVICE_STREAM_TIMEOUT),
+            'method_timeouts': self._servlet.get('method_timeouts'),
+        }
+        service_config = self.get_service_config()
+        if service_config:
+            options['channel_options'] = [('grpc.service_config', json.dumps(service_config))]
+        if 'channel_policy' in self._servlet:
+            options['pool_policy'] = self._servlet['channel_policy']
+        cache_dir = self._servlet.get(
+            'descriptor_cache', message_bus_settings.DESCRIPTOR_CACHE_DIR
         )
+        if cache_dir:
+            options['descriptor_cache'] = DescriptorCache(
+                cache_dir, fingerprint=self._servlet.get('schema_fingerprint')
+            )
+        if self._servlet.get('response_cache'):
+            options['response_cache'] = ClientCache(**self._servlet['response_cache'])
+        if self.circuit_breaker is not None:
+            options['circuit_breaker'] = self.circuit_breaker
+        hedging = self.get_hedging_policy()
+        if hedging is not None:
+            options['hedging'] = hedging
+        hooks = self.get_hooks()
+        if hooks:
+            options['hooks'] = hooks
+            options['hook_sample_rate'] = self._servlet.get(
+                'hook_sample_rate', message_bus_settings.CLIENT_HOOK_SAMPLE_RATE
+            )
+        return options
+
+    def get_hooks(self):
+        """
+        Client hooks of the servlet, its ``hooks`` or else the ``CLIENT_HOOKS``
+        setting. Hooks are given as instances, classes or their import paths.
+        """
+        if 'hooks' in self._servlet:
+            hooks = [perform_import(hook, 'hooks') for hook in self._servlet['hooks']]
+        else:
+            hooks = message_bus_settings.CLIENT_HOOKS or []
+        return [hook() if isinstance(hook, type) else hook for hook in hooks]
 
     def check_client(self):
         if not self._client:
@@ -25,7 +220,7 @@ class Servlet:
             except _Rendezvous as error:
                 raise exceptions.GRPCException(
                     f'Unable to communicate with `{self.name}` service '
-                    f'running at {self._host}:{self._port} '
+                    f'running at {self._endpoint} '
                     f'due to `{error._state.details}`. Failed with '
                     f'status code `{error._state.code}`.'
                 )
@@ -57,6 +252,10 @@ class Servlet:
     def port(self):
         return self._port
 
+    @property
+    def endpoint(self):
+        return self._endpoint
+
     @property
     def name(self):
         return self._name
@@ -94,7 +293,66 @@ class Registry(object):
             })
         return r_dict
 
+    def get_circuit_states(self):
+        """Snapshot of the circuit breaker of every servlet having one."""
+        return {
+            name: servlet.circuit_breaker.snapshot()
+            for name, servlet in self.registry_dict.items() if servlet.circuit_breaker is not None
+        }
+
+
+class AsyncServlet(Servlet):
+    """
+    Servlet backed by an asyncio client, its services are bound once
+    ``check_client()`` has been awaited.
+    """
+
+    async def get_client(self):
+        return await aio.get_by_endpoint(
+            endpoint=self._endpoint,
+            **self.get_client_options()
+        )
+
+    async def check_client(self):
+        if not self._client:
+            try:
+                client = await self.get_client()
+                for service in await client.load_service_names():
+                    setattr(self, service, await client.service(service))
+            except grpc.aio.AioRpcError as error:
+                raise exceptions.GRPCException(
+                    f'Unable to communicate with `{self.name}` service '
+                    f'running at {self._endpoint} '
+                    f'due to `{error.details()}`. Failed with '
+                    f'status code `{error.code()}`.'
+                )
+            self._client = client
+        return self
+
+
+class AsyncRegistry(Registry):
+    """
+    asyncio counterpart of ``registry``, servlets are awaited::
+
+        servlet = await aio_registry.servlet_name
+        data = await servlet.service_name.retrieve({'id': 1})
+    """
+
+    def __getattr__(self, item):
+        if item in self.get_servlets():
+            return self.registry_dict.get(item).check_client()
+        raise exceptions.ServiceNotFound(item, self.get_servlets().keys())
+
+    def register(self):
+        r_dict = dict()
+        for servlet, config in self.get_servlets().items():
+            r_dict.update({
+                servlet: AsyncServlet(name=servlet)
+            })
+        return r_dict
+
 
 registry = Registry()
+aio_registry = AsyncRegistry()
 
 
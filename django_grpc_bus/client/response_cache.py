@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+from ..cache import (
+    CACHE_CONTROL_METADATA_KEY, ETAG_METADATA_KEY, IF_NONE_MATCH_METADATA_KEY, NOT_MODIFIED_METADATA_KEY,
+)
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class CachedResponse(NamedTuple):
+    expires: float
+    etag: Optional[str]
+    response: object
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[int]:
+    """
+    Seconds a response may be used without revalidation according to its
+    ``cache-control`` metadata, ``None`` without a hint.
+    """
+    if not cache_control:
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else None
+
+
+class ClientCache:
+    """
+    Caches the responses of idempotent unary methods on the client::
+
+        cache = ClientCache(methods=['retrieve'], ttl=30, max_entries=1000)
+        client = ReflectionClient('localhost:50051', response_cache=cache)
+
+    ``methods`` are method names (any service) or ``package.Service/method``
+    full names.  Responses are kept by method, serialized request and call
+    metadata in an LRU of ``max_entries``, for the ``max-age`` of their
+    ``cache-control`` trailing metadata or else ``ttl`` seconds.  An expired
+    response holding an ``etag`` is revalidated with ``if-none-match``, and
+    reused when the server flags it ``not-modified``.
+
+    Calls with their own ``credentials`` are not cached.  Cached response
+    messages are shared between the calls returning them and must not be
+    modified.
+    """
+
+    def __init__(self, methods: Iterable[str] = ('retrieve',), ttl: float = 30, max_entries: int = 1000):
+        self.methods = frozenset(methods)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_cached(self, service, method):
+        return method in self.methods or f'{service}/{method}' in self.methods
+
+    def _get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def get_key(service, method, request, metadata=None):
+        metadata = tuple(tuple(item) for item in metadata or ())
+        return service, method, request.SerializeToString(deterministic=True), metadata
+
+    def _prepare(self, key, kwargs):
+        """
+        Return the cached entry of ``key`` and whether it is fresh, adding the
+        ``if-none-match`` metadata of a stale entry to the call ``kwargs``.
+        """
+        entry = self._get(key)
+        if entry is None:
+            return None, False
+        if entry.expires > time.monotonic():
+            return entry, True
+        if entry.etag:
+            kwargs['metadata'] = tuple(kwargs.get('metadata') or ()) + ((IF_NONE_MATCH_METADATA_KEY, entry.etag),)
+        return entry, False
+
+    def _store(self, key, entry, response, trailing_metadata):
+        trailing_metadata = {name: value for name, value in trailing_metadata or ()}
+        if entry is not None and entry.etag and trailing_metadata.get(NOT_MODIFIED_METADATA_KEY):
+            response = entry.response
+        cache_control = trailing_metadata.get(CACHE_CONTROL_METADATA_KEY)
+        if cache_control and 'no-store' in cache_control:
+            return response
+        max_age = parse_max_age(cache_control)
+        ttl = self.ttl if max_age is None else max_age
+        etag = trailing_metadata.get(ETAG_METADATA_KEY)
+        if ttl > 0 or etag:
+            self._set(key, CachedResponse(time.monotonic() + ttl, etag, response))
+        return response
+
+    def call(self, handler, service, method, request, **kwargs):
+        """Return the response of ``handler(request)``, from the cache if fresh."""
+        if kwargs.get('credentials') is not None:
+            return handler(request, **kwargs)
+        key = self.get_key(service, method, request, kwargs.get('metadata'))
+        entry, fresh = self._prepare(key, kwargs)
+        if fresh:
+            return entry.response
+        response, call = handler.with_call(request, **kwargs)
+        return self._store(key, entry, response, call.trailing_metadata())
+
+    async def async_call(self, handler, service, method, request, **kwargs):
+        """``grpc.aio`` counterpart of :meth:`call`."""
+        if kwargs.get('credentials') is not None:
+            return await handler(request, **kwargs)
+        key = self.get_key(service, method, request, kwargs.get('metadata'))
+        entry, fresh = self._prepare(key, kwargs)
+        if fresh:
+            return entry.response
+        call = handler(request, **kwargs)
+        response = await call
+        return self._store(key, entry, response, await call.trailing_metadata())
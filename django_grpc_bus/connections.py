@@ -0,0 +1,93 @@
+"""
+Database connection policies, run by the servicers around every request on
+the thread handling it.  The policy is set by the ``DB_CONNECTION_POLICY``
+setting or the ``connection_policy`` attribute of a service::
+
+    MESSAGE_BUS = {
+        'DB_CONNECTION_POLICY': 'django_grpc_bus.connections.PersistentConnections',
+    }
+
+The query log of the connections is only reset when ``DEBUG`` is on, it is
+not recorded otherwise.
+"""
+import threading
+import time
+
+from django import db
+from django.conf import settings
+
+
+def get_initialized_connections():
+    """The connections already opened by the current thread."""
+    try:
+        return db.connections.all(initialized_only=True)
+    except TypeError:
+        return db.connections.all()
+
+
+class BaseConnectionPolicy:
+    """
+    A base class from which all connection policy classes should inherit.
+    """
+
+    def request_started(self):
+        if settings.DEBUG:
+            db.reset_queries()
+
+    def request_finished(self, error=None):
+        """Called after the request, with the exception it raised if any."""
+        pass
+
+
+class CloseOldConnections(BaseConnectionPolicy):
+    """
+    The handling of Django's request handlers: connections that errored or
+    outlived ``CONN_MAX_AGE`` are closed before and after every request.
+    """
+
+    def request_started(self):
+        super().request_started()
+        db.close_old_connections()
+
+    def request_finished(self, error=None):
+        db.close_old_connections()
+
+
+class PersistentConnections(BaseConnectionPolicy):
+    """
+    Keeps the connections of every worker thread open between requests.
+    They are checked every ``check_interval`` seconds, and closed when
+    unusable or older than ``CONN_MAX_AGE``.  A connection with a database
+    error is checked at the end of the request.  Set ``CONN_MAX_AGE`` to
+    ``None`` (or a long time) for the connections to persist.
+    """
+    check_interval = 60
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request_started(self):
+        super().request_started()
+        now = time.monotonic()
+        if now - getattr(self._local, 'checked_at', float('-inf')) >= self.check_interval:
+            self._local.checked_at = now
+            db.close_old_connections()
+
+    def request_finished(self, error=None):
+        if error is not None:
+            for connection in get_initialized_connections():
+                if connection.errors_occurred:
+                    connection.close_if_unusable_or_obsolete()
+
+
+class PooledConnections(BaseConnectionPolicy):
+    """
+    Hands every connection back after the request, for databases behind a
+    connection pool shared by the worker threads: the ``pool`` option of the
+    PostgreSQL backend (Django 5.1+), where closing a connection returns it
+    to the pool, or an external pooler such as PgBouncer.
+    """
+
+    def request_finished(self, error=None):
+        for connection in get_initialized_connections():
+            connection.close()
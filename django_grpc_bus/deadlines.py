@@ -0,0 +1,125 @@
+"""
+Deadlines of the requests being served.
+
+The servicers keep the deadline of the call they are handling for the
+thread (or task) running it, so that:
+
+- clients calling other servlets from a handler send at most the time left,
+  see :func:`time_remaining`;
+- database queries are not started once the deadline has passed, and SQLite
+  queries running past it are interrupted. The handler is then aborted with
+  ``DEADLINE_EXCEEDED``.
+"""
+import contextvars
+import time
+
+import grpc
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+
+from .connections import get_initialized_connections
+
+# gRPC reports the calls without a deadline with hundreds of years left.
+_NO_DEADLINE = 10 ** 9
+_SQLITE_PROGRESS_STEPS = 10000
+
+_current = contextvars.ContextVar('django_grpc_bus_deadline', default=None)
+_END = object()
+
+
+def get_deadline(context):
+    """``time.monotonic()`` deadline of the call of ``context``, ``None`` without one."""
+    remaining = context.time_remaining()
+    if remaining is None or remaining > _NO_DEADLINE:
+        return None
+    return time.monotonic() + remaining
+
+
+def set_deadline(deadline, context):
+    """
+    Make ``deadline`` the deadline of the current request, ``context`` being
+    aborted when the database is used past it. Returns the token to pass to
+    :func:`reset_deadline`.
+    """
+    return _current.set((deadline, context))
+
+
+def reset_deadline(token):
+    _current.reset(token)
+
+
+def time_remaining():
+    """
+    Seconds left before the deadline of the request served by the current
+    thread or task, ``None`` if it has no deadline.
+    """
+    current = _current.get()
+    if current is None:
+        return None
+    return current[0] - time.monotonic()
+
+
+def iterate_with_deadline(messages, deadline, context):
+    """
+    Iterate ``messages`` with ``deadline`` set while every message is built,
+    for the streamed responses produced once the handler has returned.
+    """
+    while True:
+        token = _current.set((deadline, context))
+        try:
+            message = next(messages, _END)
+        finally:
+            _current.reset(token)
+        if message is _END:
+            return
+        yield message
+
+
+class DeadlineExceeded(Exception):
+    """Stops the handler of a call that already ended on its deadline."""
+
+
+def _abort(context):
+    if getattr(context, 'ends_on_deadline', False):
+        raise DeadlineExceeded('Deadline exceeded')
+    context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, 'Deadline exceeded')
+
+
+def _check_deadline(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    deadline, servicer_context = current
+    if deadline <= time.monotonic():
+        _abort(servicer_context)
+    try:
+        return execute(sql, params, many, context)
+    except DatabaseError:
+        # An SQLite query interrupted by _sqlite_progress.
+        if deadline <= time.monotonic():
+            _abort(servicer_context)
+        raise
+
+
+def _sqlite_progress():
+    current = _current.get()
+    return current is not None and current[0] <= time.monotonic()
+
+
+def _guard_connection(sender=None, connection=None, **kwargs):
+    # Ahead of the wrappers installed with execute_wrapper(), which pops the
+    # last one on exit.
+    if _check_deadline not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _check_deadline)
+    if connection.vendor == 'sqlite' and connection.connection is not None:
+        connection.connection.set_progress_handler(_sqlite_progress, _SQLITE_PROGRESS_STEPS)
+
+
+def guard_connections():
+    """
+    Check the deadline of the current request on every query, on the
+    connections opened from now on and the ones of the current thread.
+    """
+    connection_created.connect(_guard_connection, dispatch_uid='django_grpc_bus.deadlines')
+    for connection in get_initialized_connections():
+        _guard_connection(connection=connection)
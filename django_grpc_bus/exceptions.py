@@ -1,6 +1,8 @@
 
 from typing import List
 
+import grpc
+
 
 class GRPCException(Exception):
     pass
@@ -22,6 +24,35 @@ class ProtobufError(GRPCException):
     pass
 
 
+class BatchItemError(GRPCException):
+    def __init__(self, code, details=None, **kwargs):
+        self.code = code
+        self.details = details or ''
+
+    def __str__(self):
+        return f"Batch request failed with status code `{self.code}`. {self.details}".strip()
+
+
+class CircuitOpenError(GRPCException, grpc.RpcError):
+    """
+    A call refused by an open circuit breaker. It reads as ``UNAVAILABLE``,
+    like the errors of the servlet that opened it.
+    """
+
+    def __init__(self, name, retry_in=0, **kwargs):
+        self.name = name
+        self.retry_in = retry_in
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return str(self)
+
+    def __str__(self):
+        return f"Circuit breaker of `{self.name}` is open, retry in {self.retry_in:.1f}s."
+
+
 class ServiceNotFound(ProtobufError):
     def __init__(self, service_name, available_services=None, **kwargs):
         self.fail_service = service_name
@@ -0,0 +1,118 @@
+"""
+Filter backends reading their parameters from the fields of the request
+message, the ones generated for ``<Model>ListRequest`` by
+:class:`~django_grpc_bus.protobuf.generators.ModelProtoGenerator`.
+"""
+import grpc
+from django.core.exceptions import FieldDoesNotExist
+from google.protobuf.descriptor import FieldDescriptor
+
+
+def get_request_value(request, name):
+    """
+    Value of the ``name`` field of the request message, ``None`` when the
+    message has no such field or the field is not set.
+    """
+    descriptor = getattr(request, 'DESCRIPTOR', None)
+    field = descriptor.fields_by_name.get(name) if descriptor is not None else None
+    if field is None:
+        return None
+    value = getattr(request, name)
+    if field.label == FieldDescriptor.LABEL_REPEATED:
+        return list(value) if len(value) else None
+    if field.has_presence:
+        return value if request.HasField(name) else None
+    return value if value != field.default_value else None
+
+
+class BaseFilterBackend:
+    """
+    A base class from which all filter backend classes should inherit.
+    """
+
+    def filter_queryset(self, request, queryset, service):
+        """
+        Return a filtered queryset.
+        """
+        raise NotImplementedError(".filter_queryset() must be overridden.")
+
+
+class LookupFilter(BaseFilterBackend):
+    """
+    Filters the queryset with the lookups listed in ``filter_fields`` of the
+    service, each lookup is read from the request field of the same name::
+
+        class PostService(generics.ModelService):
+            filter_fields = {
+                'title': ['exact', 'icontains'],
+                'created': ['gte', 'lte'],
+            }
+
+    reads ``title``, ``title__icontains``, ``created__gte`` and
+    ``created__lte``.  A list of field names is the same as their ``exact``
+    lookup.  Unset request fields are ignored.
+    """
+
+    @staticmethod
+    def get_lookups(service):
+        filter_fields = getattr(service, 'filter_fields', None) or {}
+        if isinstance(filter_fields, (list, tuple)):
+            filter_fields = {field: ['exact'] for field in filter_fields}
+        for field, lookups in filter_fields.items():
+            for lookup in lookups:
+                yield field if lookup == 'exact' else f'{field}__{lookup}'
+
+    def filter_queryset(self, request, queryset, service):
+        filter_kwargs = {}
+        for lookup in self.get_lookups(service):
+            value = get_request_value(request, lookup)
+            if value is not None:
+                filter_kwargs[lookup] = value
+        if filter_kwargs:
+            queryset = queryset.filter(**filter_kwargs)
+        return queryset
+
+
+class OrderingFilter(BaseFilterBackend):
+    """
+    Orders the queryset by the comma separated fields of the ``order_by``
+    request field, ``-`` prefixed fields are in descending order::
+
+        class PostService(generics.ModelService):
+            ordering_fields = ['title', 'created']
+
+    Fields missing from ``ordering_fields`` are rejected with
+    ``INVALID_ARGUMENT``, ``'__all__'`` allows every model field.
+    """
+    ordering_request_field = 'order_by'
+
+    def get_ordering(self, request, queryset, service):
+        value = get_request_value(request, self.ordering_request_field)
+        if not value:
+            return None
+        ordering = [term.strip() for term in value.split(',') if term.strip()]
+        invalid = [term for term in ordering if not self.is_valid_field(queryset.model, term.lstrip('-'), service)]
+        if invalid:
+            service.context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                'Ordering by %s is not allowed' % ', '.join(invalid)
+            )
+        return ordering
+
+    @staticmethod
+    def is_valid_field(model, field_name, service):
+        ordering_fields = getattr(service, 'ordering_fields', None)
+        if ordering_fields == '__all__':
+            if field_name == 'pk':
+                return True
+            try:
+                return model._meta.get_field(field_name).concrete
+            except FieldDoesNotExist:
+                return False
+        return field_name in (ordering_fields or ())
+
+    def filter_queryset(self, request, queryset, service):
+        ordering = self.get_ordering(request, queryset, service)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
@@ -1,12 +1,24 @@
+import hashlib
+import itertools
+
 import grpc
-from django.core.exceptions import ValidationError
-from django.db.models.query import QuerySet
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Prefetch
+from django.db.models.query import ModelIterable, QuerySet
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from . import mixins, services
+from .cache import (
+    CACHE_CONTROL_METADATA_KEY, ETAG_METADATA_KEY, IF_NONE_MATCH_METADATA_KEY, NOT_MODIFIED_METADATA_KEY,
+)
+from .filters import get_request_value
+from .serializers import BaseProtoSerializer, ModelProtoSerializer
+from .settings import message_bus_settings
 from .utils import model_meta
 
+_related_lookups = {}
+
 
 class GenericService(services.Service):
     """
@@ -19,6 +31,33 @@ class GenericService(services.Service):
     # Set this if you want to use object lookups other than id
     lookup_field = None
     lookup_request_field = None
+    # Number of objects fetched and serialized at a time by ``list()``, set
+    # to ``None`` to fetch the whole queryset at once.
+    list_chunk_size = 1000
+
+    # Lookups and ordering fields the filter backends accept from the
+    # requests of ``filter_actions``, the other requests carry object data.
+    filter_fields = None
+    ordering_fields = None
+    filter_actions = ('list',)
+    filter_backends = message_bus_settings.DEFAULT_FILTER_BACKENDS
+    pagination_class = message_bus_settings.DEFAULT_PAGINATION_CLASS
+    # Request field holding the ``google.protobuf.FieldMask`` of the fields
+    # to read.
+    read_mask_request_field = 'read_mask'
+    # Number of objects saved or deleted at a time by the bulk handlers, and
+    # their response message class, see ``get_bulk_response_class()``.
+    bulk_batch_size = 1000
+    bulk_response_class = None
+    # Add the ``select_related()`` and ``prefetch_related()`` lookups needed
+    # by the relational fields of the serializer to the queryset.
+    auto_prefetch = True
+    # A ``django_grpc_bus.cache.ResponseCache`` keeping the responses of
+    # ``retrieve()`` and ``list()``.
+    response_cache = None
+    # Seconds clients may keep the responses of ``retrieve()``, which then
+    # carry ``cache-control`` and ``etag`` trailing metadata.
+    cache_max_age = None
 
     def get_queryset(self):
         """
@@ -46,8 +85,188 @@ class GenericService(services.Service):
         if isinstance(queryset, QuerySet):
             # Ensure queryset is re-evaluated on each request.
             queryset = queryset.all()
+            if self.auto_prefetch:
+                queryset = self.prefetch_queryset(queryset)
+            read_mask = self.get_read_mask()
+            if read_mask:
+                queryset = self.mask_queryset(queryset, read_mask)
+        return queryset
+
+    def prefetch_queryset(self, queryset):
+        """
+        Follow the relations read by the serializer with ``select_related()``
+        and ``prefetch_related()``, so that serializing the queryset takes a
+        fixed number of queries.  Lookups the queryset already prefetches are
+        left as they are.
+        """
+        serializer_class = self.get_serializer_class()
+        if (not issubclass(serializer_class, ModelProtoSerializer)
+                or queryset._iterable_class is not ModelIterable
+                or queryset.model is not getattr(serializer_class.Meta, 'model', None)):
+            return queryset
+        select_related, prefetch_related = self.get_related_lookups(serializer_class)
+
+        if select_related and queryset.query.select_related is not True:
+            queryset = queryset.select_related(*select_related)
+        prefetched = {
+            lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            for lookup in queryset._prefetch_related_lookups
+        }
+        lookups = []
+        for lookup in prefetch_related:
+            if isinstance(lookup, tuple):
+                lookup, related_model = lookup
+                if lookup not in prefetched:
+                    lookups.append(Prefetch(lookup, queryset=related_model._default_manager.only('pk')))
+            elif lookup not in prefetched:
+                lookups.append(lookup)
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
         return queryset
 
+    def get_related_lookups(self, serializer_class):
+        """
+        Return the ``(select_related, prefetch_related)`` lookups of the
+        serializer, see :func:`~django_grpc_bus.utils.model_meta.get_related_lookups`.
+        """
+        read_mask = self.get_read_mask()
+        read_mask = frozenset(read_mask) if read_mask else None
+        key = (serializer_class, read_mask)
+        static = model_meta.has_static_fields(serializer_class)
+        if static and key in _related_lookups:
+            return _related_lookups[key]
+        serializer = self.get_serializer()
+        lookups = model_meta.get_related_lookups(serializer, serializer_class.Meta.model)
+        if static:
+            _related_lookups[key] = lookups
+        return lookups
+
+    def get_read_mask(self):
+        """
+        Return the set of top level fields in the ``read_mask`` of the
+        request, or ``None`` if the request does not restrict the fields.
+        """
+        field_mask = get_request_value(getattr(self, 'request', None), self.read_mask_request_field)
+        if field_mask is None or not field_mask.paths:
+            return None
+        read_mask = {path.split('.')[0] for path in field_mask.paths}
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        proto_class = getattr(meta, 'proto_class', None)
+        if proto_class is not None:
+            unknown = sorted(read_mask - set(proto_class.DESCRIPTOR.fields_by_name))
+            if unknown:
+                self.context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    'Unknown read_mask fields: %s' % ', '.join(unknown)
+                )
+        return read_mask
+
+    def mask_queryset(self, queryset, read_mask):
+        """
+        Load only the columns of the model fields in ``read_mask``, along
+        with the primary key and the relations followed by
+        ``select_related()``.  A masked field that is not a model field may
+        read any column, the queryset is left untouched then.
+        """
+        select_related = queryset.query.select_related
+        if select_related is True:
+            return queryset
+        columns = list(select_related or ())
+        opts = queryset.model._meta
+        for name in read_mask:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return queryset
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+            elif not field.is_relation:
+                return queryset
+        return queryset.only(*columns)
+
+    def get_response_cache(self):
+        """
+        Return the response cache of the service, or ``None``.  The cache
+        is invalidated by the signals of the model of the serializer.
+        """
+        if self.response_cache is not None:
+            self.response_cache.watch(self.get_serializer_class().Meta.model)
+        return self.response_cache
+
+    def get_cache_pk(self):
+        """
+        Return the primary key looked up by the request as a string, or
+        ``None`` when the lookup is not by primary key and the object can not
+        be cached.
+        """
+        pk_field = model_meta.get_model_pk(self.get_serializer_class().Meta.model)
+        lookup_field = self.lookup_field or pk_field.name
+        if lookup_field not in ('pk', pk_field.name):
+            return None
+        value = getattr(self.request, self.lookup_request_field or lookup_field, None)
+        try:
+            return str(pk_field.to_python(value))
+        except ValidationError:
+            return None
+
+    def get_cache_scope(self):
+        """
+        Return the part of the cache key telling apart the querysets a
+        request is served from.  Defaults to the service class, services
+        whose ``get_queryset()`` or ``filter_queryset()`` depend on the
+        request (e.g. scoped to the calling user) should override it::
+
+            def get_cache_scope(self):
+                return dict(self.context.invocation_metadata()).get('user-id', '')
+        """
+        return '%s.%s' % (self.__class__.__module__, self.__class__.__qualname__)
+
+    def get_cache_variant(self, request=None):
+        """
+        Return the part of the cache key telling apart the responses of one
+        object (or of the list ``request``) sent by different serializers,
+        read masks and queryset scopes.
+        """
+        serializer_class = self.get_serializer_class()
+        read_mask = self.get_read_mask()
+        variant = '%s.%s:%s:%s' % (
+            serializer_class.__module__, serializer_class.__qualname__,
+            ','.join(sorted(read_mask)) if read_mask else '*', self.get_cache_scope()
+        )
+        if request is None:
+            return variant
+        digest = hashlib.sha1(variant.encode('utf-8'))
+        digest.update(request.SerializeToString(deterministic=True))
+        return digest.hexdigest()
+
+    def set_cache_control(self, data):
+        """
+        Send the ``cache-control`` and ``etag`` trailing metadata of the
+        serialized response ``data``.  Return ``True`` when the request holds
+        the same ``etag`` in its ``if-none-match`` metadata, the response is
+        then flagged ``not-modified`` and need not be sent.
+        """
+        etag = hashlib.sha1(data).hexdigest()
+        metadata = dict(self.context.invocation_metadata() or ())
+        not_modified = metadata.get(IF_NONE_MATCH_METADATA_KEY) == etag
+        trailing_metadata = [
+            (CACHE_CONTROL_METADATA_KEY, 'max-age=%d' % self.cache_max_age),
+            (ETAG_METADATA_KEY, etag),
+        ]
+        if not_modified:
+            trailing_metadata.append((NOT_MODIFIED_METADATA_KEY, '1'))
+        self.context.set_trailing_metadata(trailing_metadata)
+        return not_modified
+
+    def invalidate_response_cache(self, pks):
+        """
+        Drop the cached responses of the ``pks`` objects, for changes that
+        send no model signal.
+        """
+        response_cache = self.get_response_cache()
+        if response_cache is not None:
+            response_cache.invalidate(self.get_serializer_class().Meta.model, pks, self.get_queryset().db)
+
     def get_serializer_class(self):
         """
         Return the class to use for the serializer. Defaults to using
@@ -95,6 +314,8 @@ class GenericService(services.Service):
         """
         serializer_class = self.get_serializer_class()
         kwargs.setdefault('context', self.get_serializer_context())
+        if issubclass(serializer_class, BaseProtoSerializer) and 'read_mask' not in kwargs:
+            kwargs['read_mask'] = self.get_read_mask()
         return serializer_class(*args, **kwargs)
 
     def get_serializer_context(self):
@@ -109,9 +330,91 @@ class GenericService(services.Service):
         }
 
     def filter_queryset(self, queryset):
-        """Given a queryset, filter it, returning a new queryset."""
+        """
+        Given a queryset, filter it with whichever filter backend is in use,
+        returning a new queryset.
+        """
+        if getattr(self, 'action', None) not in self.filter_actions:
+            return queryset
+        for backend in list(self.filter_backends or ()):
+            queryset = backend().filter_queryset(self.request, queryset, self)
         return queryset
 
+    @property
+    def paginator(self):
+        """
+        The paginator instance associated with the service, or ``None``.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def paginate_queryset(self, queryset):
+        """
+        Return a single page of results, or ``None`` if pagination is
+        disabled or not requested.
+        """
+        if self.paginator is None:
+            return None
+        return self.paginator.paginate_queryset(queryset, self.request, self)
+
+    def chunk_queryset(self, queryset):
+        """
+        Split the queryset into lists of at most ``list_chunk_size`` objects,
+        each chunk is fetched only when the previous one has been consumed.
+
+        A queryset of model instances that is unordered or ordered by primary
+        key is walked with keyset pagination on the primary key, any other
+        queryset is read through ``queryset.iterator()``.
+        """
+        chunk_size = self.list_chunk_size
+        if not chunk_size or not isinstance(queryset, QuerySet):
+            yield queryset
+            return
+
+        order_by = self._get_keyset_order(queryset)
+        if order_by is None:
+            iterator = queryset.iterator(chunk_size=chunk_size)
+            chunk = list(itertools.islice(iterator, chunk_size))
+            while chunk:
+                yield chunk
+                chunk = list(itertools.islice(iterator, chunk_size))
+            return
+
+        queryset = queryset.order_by(order_by)
+        lookup = 'pk__lt' if order_by.startswith('-') else 'pk__gt'
+        chunk = list(queryset[:chunk_size])
+        while chunk:
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            chunk = list(queryset.filter(**{lookup: chunk[-1].pk})[:chunk_size])
+
+    @staticmethod
+    def _get_keyset_order(queryset):
+        """
+        Return ``'pk'`` or ``'-pk'`` if the queryset can be paginated by its
+        primary key without changing its order, ``None`` otherwise.
+        """
+        query = queryset.query
+        if not query.can_filter() or queryset._iterable_class is not ModelIterable:
+            return None
+        order_by = tuple(query.order_by)
+        if not order_by and query.default_ordering:
+            order_by = tuple(queryset.model._meta.ordering)
+        if not order_by:
+            return 'pk'
+        if len(order_by) != 1 or not isinstance(order_by[0], str):
+            return None
+        pk_name = model_meta.get_model_pk(queryset.model).name
+        descending = order_by[0].startswith('-')
+        if order_by[0].lstrip('-') not in ('pk', pk_name):
+            return None
+        return '-pk' if descending else 'pk'
+
 
 class CreateService(mixins.CreateModelMixin,
                     GenericService):
@@ -167,14 +470,29 @@ class ReadOnlyModelService(mixins.RetrieveModelMixin,
     pass
 
 
+class BulkModelService(mixins.BulkCreateModelMixin,
+                       mixins.BulkUpdateModelMixin,
+                       mixins.BulkDestroyModelMixin,
+                       GenericService):
+    """
+    Concrete service that provides default ``bulk_create()``,
+    ``bulk_update()`` and ``bulk_destroy()`` handlers.
+    """
+    pass
+
+
 class ModelService(mixins.CreateModelMixin,
                    mixins.RetrieveModelMixin,
                    mixins.UpdateModelMixin,
                    mixins.DestroyModelMixin,
                    mixins.ListModelMixin,
+                   mixins.BulkCreateModelMixin,
+                   mixins.BulkUpdateModelMixin,
+                   mixins.BulkDestroyModelMixin,
                    GenericService):
     """
     Concrete service that provides default ``create()``, ``retrieve()``,
-    ``update()``, ``destroy()`` and ``list()`` handlers.
+    ``update()``, ``destroy()``, ``list()``, ``bulk_create()``,
+    ``bulk_update()`` and ``bulk_destroy()`` handlers.
     """
     pass
@@ -3,7 +3,9 @@ import inspect
 import os
 import re
 
+from django_grpc_bus.batch import BatchServicer
 from django_grpc_bus.generics import ModelService
+from django_grpc_bus.reflection import enable_server_reflection
 from django_grpc_bus.settings import message_bus_settings
 from django.utils.module_loading import import_string
 from grpc_health.v1 import health, health_pb2_grpc
@@ -20,6 +22,7 @@ class GrpcRegistry:
         self._grpc_module = self.get_module(grpc_module or f'{self.model_name}_pb2_grpc')
         self._module = self.get_module(f'{self.model_name}_pb2')
         self._servicer = self.get_servicer()
+        self.servicer = None
 
     @staticmethod
     def get_service(service):
@@ -59,7 +62,21 @@ class GrpcRegistry:
         return getattr(self._grpc_module, servicer)
 
     def register(self, server):
-        self._servicer(self._service.as_servicer(), server)
+        self.servicer = self._service.as_servicer(descriptor=self.descriptor)
+        self._servicer(self.servicer, server)
+
+    def register_async(self, server, executor=None):
+        # The sync servicer runs the batches in the executor.
+        self.servicer = self._service.as_servicer(descriptor=self.descriptor)
+        self._servicer(self._service.as_async_servicer(executor=executor, descriptor=self.descriptor), server)
+
+    @property
+    def descriptor(self):
+        return self._module.DESCRIPTOR.services_by_name[f'{self.model_name}']
+
+    @property
+    def service(self):
+        return self._service
 
     @property
     def name(self):
@@ -88,7 +105,7 @@ class BasicHandler:
             GrpcRegistry(grpc_module=grpc_module, service=service)
         )
 
-    def bind_to_server(self, server, enable_reflection=True):
+    def bind_to_server(self, server, enable_reflection=True, interceptors=None):
         service_names = [
             reflection.SERVICE_NAME,
             health.SERVICE_NAME,
@@ -96,14 +113,42 @@ class BasicHandler:
         health_servicer = health.HealthServicer(experimental_non_blocking=True)
         health_servicer.set('', HealthCheckResponse.SERVING)
 
+        # The batched requests go through the server interceptors again.
+        batch_servicer = BatchServicer(interceptors=interceptors)
+
         for service in self.registry:
             service.register(server)
+            batch_servicer.add_service(service.servicer, service.service, service.descriptor)
             service_names.append(service.name)
             status = HealthCheckResponse.SERVING
             health_servicer.set(service.name, status)
         health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+        server.add_generic_rpc_handlers((batch_servicer.get_handler(),))
+
+        if enable_reflection:
+            enable_server_reflection(service_names, server)
+
+    async def bind_to_aio_server(self, server, enable_reflection=True, executor=None, interceptors=None):
+        service_names = [
+            reflection.SERVICE_NAME,
+            health.SERVICE_NAME,
+        ]
+        health_servicer = health.aio.HealthServicer()
+        await health_servicer.set('', HealthCheckResponse.SERVING)
+
+        # The batched requests go through the server interceptors again.
+        batch_servicer = BatchServicer(interceptors=interceptors)
+
+        for service in self.registry:
+            service.register_async(server, executor=executor)
+            batch_servicer.add_service(service.servicer, service.service, service.descriptor)
+            service_names.append(service.name)
+            status = HealthCheckResponse.SERVING
+            await health_servicer.set(service.name, status)
+        health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+        server.add_generic_rpc_handlers((batch_servicer.get_async_handler(executor=executor),))
 
         if enable_reflection:
-            reflection.enable_server_reflection(service_names, server)
+            enable_server_reflection(service_names, server)
 
 
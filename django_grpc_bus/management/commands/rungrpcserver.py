@@ -5,7 +5,7 @@ import re
 import sys
 from datetime import datetime
 
-from django_grpc_bus.server import Server
+from django_grpc_bus.server import Server, ServerSupervisor
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import autoreload
@@ -33,6 +33,20 @@ class Command(BaseCommand):
             '--max-workers', type=int, default=10, dest='max_workers',
             help='Number of maximum worker threads.'
         )
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help=(
+                'Run the server on asyncio. Worker threads are only used '
+                'for the sync service handlers.'
+            )
+        )
+        parser.add_argument(
+            '--processes', type=int, default=1, dest='processes',
+            help=(
+                'Number of worker processes sharing the port. Each process '
+                'runs its own server with --max-workers threads.'
+            )
+        )
         parser.add_argument(
             '--dev', action='store_true', dest='development_mode',
             help=(
@@ -51,6 +65,10 @@ class Command(BaseCommand):
                     '"%s" is not a valid port number or address:port pair.' % options['address']
                 )
             self.address, self.port = m.groups()
+        if options['processes'] < 1:
+            raise CommandError('--processes must be a positive number.')
+        if options['processes'] > 1 and options['development_mode']:
+            raise CommandError('--processes can not be used with --dev.')
         self.run(**options)
 
     def run(self, **options):
@@ -62,10 +80,22 @@ class Command(BaseCommand):
                 autoreload.main(self.inner_run, None, options)
         else:
             self.stdout.write(f"Starting gRPC server at {self.address}:{self.port}\n")
+            if options['processes'] > 1:
+                ServerSupervisor(
+                    processes=options['processes'],
+                    server_kwargs={
+                        'host': self.address,
+                        'port': self.port,
+                        'worker': options['max_workers'],
+                        'use_async': options['use_async'],
+                    }
+                ).run()
+                return
             Server(
                 host=self.address,
                 port=self.port,
-                worker=options['max_workers']
+                worker=options['max_workers'],
+                use_async=options['use_async']
             ).run()
 
     def inner_run(self, *args, **options):
@@ -95,7 +125,8 @@ class Command(BaseCommand):
             Server(
                 host=self.address,
                 port=self.port,
-                worker=options['max_workers']
+                worker=options['max_workers'],
+                use_async=options['use_async']
             ).run()
         except OSError as e:
             # Use helpful error messages instead of ugly tracebacks.
@@ -0,0 +1,508 @@
+"""
+Server metrics: per method latency, message sizes, messages per stream,
+status codes, in-flight calls and database queries, along with the state of
+the server thread pool.
+
+They are collected by :class:`MetricsInterceptor` (or
+:class:`AsyncMetricsInterceptor` on a ``grpc.aio`` server)::
+
+    MESSAGE_BUS = {
+        'SERVER_INTERCEPTORS': ['django_grpc_bus.metrics.metrics_interceptor'],
+    }
+
+and read from :data:`server_metrics`, either as a dict with
+``server_metrics.snapshot()`` or in the Prometheus text format through
+:class:`PrometheusExporter`::
+
+    PrometheusExporter().serve(port=9100)
+"""
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+from . import services
+
+LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MESSAGE_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Counts of observed values per bucket upper bound, with their sum."""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'buckets': buckets, 'sum': self.sum, 'count': self.count}
+
+
+class MethodMetrics:
+    def __init__(self, metrics):
+        self.started = 0
+        self.in_flight = 0
+        self.codes = {}
+        self.latency = Histogram(metrics.latency_buckets)
+        self.request_bytes = Histogram(metrics.size_buckets)
+        self.response_bytes = Histogram(metrics.size_buckets)
+        self.messages_received = Histogram(metrics.message_buckets)
+        self.messages_sent = Histogram(metrics.message_buckets)
+        self.queries = Histogram(metrics.query_buckets)
+        self.query_seconds = Histogram(metrics.latency_buckets)
+
+    def snapshot(self):
+        return {
+            'started': self.started,
+            'in_flight': self.in_flight,
+            'codes': dict(self.codes),
+            'latency_seconds': self.latency.snapshot(),
+            'request_bytes': self.request_bytes.snapshot(),
+            'response_bytes': self.response_bytes.snapshot(),
+            'messages_received': self.messages_received.snapshot(),
+            'messages_sent': self.messages_sent.snapshot(),
+            'db_queries': self.queries.snapshot(),
+            'db_query_seconds': self.query_seconds.snapshot(),
+        }
+
+
+class ServerMetrics:
+    """
+    Metrics of the methods of a server, keyed by ``(service, method)``.
+    Updates take a single lock and a bisect, the snapshots are built on
+    demand.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS,
+                 message_buckets=MESSAGE_BUCKETS, query_buckets=QUERY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.message_buckets = tuple(message_buckets)
+        self.query_buckets = tuple(query_buckets)
+        self._lock = threading.Lock()
+        self._methods = {}
+        self._executors = []
+
+    def get_method(self, service, method) -> MethodMetrics:
+        key = (service, method)
+        try:
+            return self._methods[key]
+        except KeyError:
+            with self._lock:
+                return self._methods.setdefault(key, MethodMetrics(self))
+
+    def rpc_started(self, method_metrics: MethodMetrics):
+        with self._lock:
+            method_metrics.started += 1
+            method_metrics.in_flight += 1
+
+    def rpc_finished(self, method_metrics: MethodMetrics, code, seconds, received=None, sent=None):
+        """
+        Record a finished call, with the number of messages it received and
+        sent when they were streamed.
+        """
+        name = code.name if isinstance(code, grpc.StatusCode) else str(code)
+        with self._lock:
+            method_metrics.in_flight -= 1
+            method_metrics.codes[name] = method_metrics.codes.get(name, 0) + 1
+            method_metrics.latency.observe(seconds)
+            if received is not None:
+                method_metrics.messages_received.observe(received)
+            if sent is not None:
+                method_metrics.messages_sent.observe(sent)
+
+    def observe_request_bytes(self, method_metrics: MethodMetrics, size):
+        with self._lock:
+            method_metrics.request_bytes.observe(size)
+
+    def observe_response_bytes(self, method_metrics: MethodMetrics, size):
+        with self._lock:
+            method_metrics.response_bytes.observe(size)
+
+    def observe_queries(self, service, method, count, seconds):
+        method_metrics = self.get_method(service, method)
+        with self._lock:
+            method_metrics.queries.observe(count)
+            method_metrics.query_seconds.observe(seconds)
+
+    def track_queries(self):
+        """Record the database queries of the requests run by the servicers."""
+        if self.observe_queries not in services.query_observers:
+            services.query_observers.append(self.observe_queries)
+
+    def watch_executor(self, executor):
+        """Report the queue depth and the busy threads of ``executor``."""
+        if all(watched is not executor for watched in self._executors):
+            self._executors.append(executor)
+
+    @staticmethod
+    def get_executor_state(executor):
+        threads = len(getattr(executor, '_threads', ()))
+        idle_semaphore = getattr(executor, '_idle_semaphore', None)
+        idle = idle_semaphore._value if idle_semaphore is not None else 0
+        max_workers = getattr(executor, '_max_workers', threads)
+        busy = max(threads - idle, 0)
+        return {
+            'max_workers': max_workers,
+            'threads': threads,
+            'busy_threads': busy,
+            'queue_depth': executor._work_queue.qsize() if hasattr(executor, '_work_queue') else 0,
+            'saturation': busy / max_workers if max_workers else 0,
+        }
+
+    def snapshot(self):
+        with self._lock:
+            methods = {
+                f'{service}/{method}': method_metrics.snapshot()
+                for (service, method), method_metrics in self._methods.items()
+            }
+        return {
+            'methods': methods,
+            'thread_pools': [self.get_executor_state(executor) for executor in self._executors],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
+
+
+server_metrics = ServerMetrics()
+
+
+def _split_method(full_method):
+    service, _, method = full_method.lstrip('/').rpartition('/')
+    return service, method
+
+
+def _get_code(context, error=None):
+    code = context.code() if hasattr(context, 'code') else None
+    if code is not None and not isinstance(code, int):
+        return code
+    if isinstance(code, int):
+        return next((status for status in grpc.StatusCode if status.value[0] == code), grpc.StatusCode.UNKNOWN)
+    return grpc.StatusCode.OK if error is None else grpc.StatusCode.UNKNOWN
+
+
+class BaseMetricsInterceptor:
+    def __init__(self, metrics: ServerMetrics = None, track_queries=True):
+        self.metrics = metrics or server_metrics
+        # Queries are only counted once the interceptor serves a call, so
+        # that importing it leaves the servicers alone.
+        self._track_queries = track_queries
+
+    def _wrap_deserializer(self, deserializer, method_metrics):
+        metrics = self.metrics
+
+        def deserialize(data):
+            metrics.observe_request_bytes(method_metrics, len(data))
+            return deserializer(data) if deserializer is not None else data
+        return deserialize
+
+    def _wrap_serializer(self, serializer, method_metrics):
+        metrics = self.metrics
+
+        def serialize(message):
+            data = serializer(message) if serializer is not None else message
+            metrics.observe_response_bytes(method_metrics, len(data))
+            return data
+        return serialize
+
+    def _wrap_handler(self, handler, handler_call_details, behavior_wrapper):
+        if self._track_queries:
+            self.metrics.track_queries()
+            self._track_queries = False
+        method_metrics = self.metrics.get_method(*_split_method(handler_call_details.method))
+        if handler.request_streaming and handler.response_streaming:
+            behavior, factory = handler.stream_stream, grpc.stream_stream_rpc_method_handler
+        elif handler.request_streaming:
+            behavior, factory = handler.stream_unary, grpc.stream_unary_rpc_method_handler
+        elif handler.response_streaming:
+            behavior, factory = handler.unary_stream, grpc.unary_stream_rpc_method_handler
+        else:
+            behavior, factory = handler.unary_unary, grpc.unary_unary_rpc_method_handler
+        return factory(
+            behavior_wrapper(behavior, method_metrics, handler.request_streaming, handler.response_streaming),
+            request_deserializer=self._wrap_deserializer(handler.request_deserializer, method_metrics),
+            response_serializer=self._wrap_serializer(handler.response_serializer, method_metrics),
+        )
+
+
+class _CountingIterator:
+    def __init__(self, iterator):
+        self._iterator = iter(iterator)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
+
+
+class MetricsInterceptor(BaseMetricsInterceptor, grpc.ServerInterceptor):
+    """
+    Records the metrics of every call of a ``grpc.server`` in ``metrics``,
+    and the database queries of the servicers with ``track_queries``.
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        return self._wrap_handler(handler, handler_call_details, self._wrap_behavior)
+
+    def _wrap_behavior(self, behavior, method_metrics, request_streaming, response_streaming):
+        metrics = self.metrics
+
+        def unary_response(request, context):
+            if request_streaming:
+                request = _CountingIterator(request)
+            metrics.rpc_started(method_metrics)
+            start = time.perf_counter()
+            error = None
+            try:
+                return behavior(request, context)
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                metrics.rpc_finished(
+                    method_metrics, _get_code(context, error), time.perf_counter() - start,
+                    received=request.count if request_streaming else None,
+                )
+
+        def stream_response(request, context):
+            if request_streaming:
+                request = _CountingIterator(request)
+            metrics.rpc_started(method_metrics)
+            start = time.perf_counter()
+            error, sent = None, 0
+            try:
+                for message in behavior(request, context):
+                    sent += 1
+                    yield message
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                metrics.rpc_finished(
+                    method_metrics, _get_code(context, error), time.perf_counter() - start,
+                    received=request.count if request_streaming else None, sent=sent,
+                )
+
+        return stream_response if response_streaming else unary_response
+
+
+class _AsyncCountingIterator:
+    def __init__(self, iterator):
+        self._iterator = iterator.__aiter__() if hasattr(iterator, '__aiter__') else iterator
+        self.count = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if hasattr(self._iterator, '__anext__'):
+            item = await self._iterator.__anext__()
+        else:
+            try:
+                item = next(self._iterator)
+            except StopIteration:
+                raise StopAsyncIteration
+        self.count += 1
+        return item
+
+
+class AsyncMetricsInterceptor(BaseMetricsInterceptor, grpc.aio.ServerInterceptor):
+    """
+    :class:`MetricsInterceptor` for a ``grpc.aio`` server.
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        return self._wrap_handler(handler, handler_call_details, self._wrap_behavior)
+
+    def _wrap_behavior(self, behavior, method_metrics, request_streaming, response_streaming):
+        metrics = self.metrics
+
+        async def unary_response(request, context):
+            if request_streaming:
+                request = _AsyncCountingIterator(request)
+            metrics.rpc_started(method_metrics)
+            start = time.perf_counter()
+            error = None
+            try:
+                return await behavior(request, context)
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                metrics.rpc_finished(
+                    method_metrics, _get_code(context, error), time.perf_counter() - start,
+                    received=request.count if request_streaming else None,
+                )
+
+        async def stream_response(request, context):
+            if request_streaming:
+                request = _AsyncCountingIterator(request)
+            metrics.rpc_started(method_metrics)
+            start = time.perf_counter()
+            error = None
+            counting_context = _CountingWriteContext(context)
+            try:
+                responses = behavior(request, counting_context)
+                if inspect.isasyncgen(responses):
+                    async for message in responses:
+                        counting_context.sent += 1
+                        yield message
+                elif inspect.isawaitable(responses):
+                    # Handlers sending their messages with context.write().
+                    await responses
+                else:
+                    for message in responses:
+                        counting_context.sent += 1
+                        yield message
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                metrics.rpc_finished(
+                    method_metrics, _get_code(context, error), time.perf_counter() - start,
+                    received=request.count if request_streaming else None, sent=counting_context.sent,
+                )
+
+        return stream_response if response_streaming else unary_response
+
+
+class _CountingWriteContext:
+    """Servicer context counting the messages sent with ``write()``."""
+
+    def __init__(self, context):
+        self._context = context
+        self.sent = 0
+
+    async def write(self, message):
+        await self._context.write(message)
+        self.sent += 1
+
+    def __getattr__(self, item):
+        return getattr(self._context, item)
+
+
+def _format_labels(labels):
+    return '{%s}' % ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                             for name, value in labels.items())
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class PrometheusExporter:
+    """
+    Renders :class:`ServerMetrics` in the Prometheus text format, and serves
+    them over HTTP with :meth:`serve`.
+    """
+    namespace = 'grpc_server'
+
+    def __init__(self, metrics: ServerMetrics = None):
+        self.metrics = metrics or server_metrics
+
+    def render(self):
+        snapshot = self.metrics.snapshot()
+        lines = []
+
+        def add_metric(name, kind, help_text, samples):
+            name = f'{self.namespace}_{name}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                if kind == 'histogram':
+                    for bound, count in value['buckets']:
+                        lines.append(f'{name}_bucket{_format_labels({**labels, "le": _format_bound(bound)})} {count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        methods = []
+        for full_method, method_snapshot in sorted(snapshot['methods'].items()):
+            service, method = full_method.rsplit('/', 1)
+            methods.append(({'grpc_service': service, 'grpc_method': method}, method_snapshot))
+
+        add_metric('started_total', 'counter', 'Calls started.',
+                   [(labels, data['started']) for labels, data in methods])
+        add_metric('handled_total', 'counter', 'Calls completed, by status code.', [
+            ({**labels, 'grpc_code': code}, count)
+            for labels, data in methods for code, count in sorted(data['codes'].items())
+        ])
+        add_metric('in_flight', 'gauge', 'Calls in progress.',
+                   [(labels, data['in_flight']) for labels, data in methods])
+        for key, kind_help in (
+                ('latency_seconds', 'Call duration.'),
+                ('request_bytes', 'Size of the received messages.'),
+                ('response_bytes', 'Size of the sent messages.'),
+                ('messages_received', 'Messages received per streaming call.'),
+                ('messages_sent', 'Messages sent per streaming call.'),
+                ('db_queries', 'Database queries per call.'),
+                ('db_query_seconds', 'Database query time per call.')):
+            add_metric(key, 'histogram', kind_help, [(labels, data[key]) for labels, data in methods])
+
+        pools = list(enumerate(snapshot['thread_pools']))
+        for key, help_text in (
+                ('max_workers', 'Threads of the server thread pool.'),
+                ('threads', 'Threads started by the server thread pool.'),
+                ('busy_threads', 'Threads of the server thread pool running a call.'),
+                ('queue_depth', 'Calls waiting for a thread of the server thread pool.'),
+                ('saturation', 'Share of the server thread pool running calls.')):
+            add_metric(f'thread_pool_{key}', 'gauge', help_text,
+                       [({'pool': index}, state[key]) for index, state in pools])
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, addr=''):
+        """
+        Serve the metrics on ``http://addr:port/`` from a daemon thread,
+        return the HTTP server.
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+
+metrics_interceptor = MetricsInterceptor()
+async_metrics_interceptor = AsyncMetricsInterceptor()
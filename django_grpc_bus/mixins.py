@@ -1,4 +1,43 @@
+import itertools
+import json
+
+import grpc
+from django.db import connections, transaction
 from google.protobuf import empty_pb2
+from rest_framework.utils.model_meta import get_field_info
+
+from .cache import TrailingMetadataRecorder
+from .protobuf.batch import get_message_class
+from .utils import model_meta
+
+
+def _get_to_many_fields(model):
+    """Names of the forward to-many relations of ``model``."""
+    return {
+        name for name, relation in get_field_info(model).relations.items()
+        if relation.to_many and not relation.reverse
+    }
+
+
+def _bulk_set_many_to_many(model, objects, relations, using, clear=False):
+    """
+    Set the to-many relations of ``objects`` (``relations`` holds a dict of
+    relation name -> related objects per object) with one insert per
+    relation, clearing the existing links first if ``clear``.
+    """
+    for name in {name for item in relations for name in item}:
+        field = model._meta.get_field(name)
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        pairs = [(obj, item[name]) for obj, item in zip(objects, relations) if name in item]
+        manager = through._default_manager.using(using)
+        if clear:
+            manager.filter(**{f'{source}__in': [obj.pk for obj, _ in pairs]}).delete()
+        manager.bulk_create([
+            through(**{source: obj.pk, target: getattr(related, 'pk', related)})
+            for obj, related_objects in pairs for related in related_objects
+        ])
 
 
 class CreateModelMixin:
@@ -29,11 +68,54 @@ class ListModelMixin:
         .. note::
 
             This is a server streaming RPC.
+
+        The queryset is fetched and serialized in chunks of
+        ``list_chunk_size`` objects, so a message is sent before the next
+        chunk is read from the database.  When the request asks for a page,
+        only that page is sent and the token of the next one is set in the
+        trailing metadata.
+
+        With a ``response_cache`` the messages of the request are cached.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        for message in serializer.message:
+        response_cache = self.get_response_cache()
+        if response_cache is None:
+            yield from self.list_messages()
+            return
+
+        meta = self.get_serializer_class().Meta
+        key = response_cache.get_list_key(meta.model, self.get_cache_variant(request))
+        cached = response_cache.get_list(key)
+        if cached is not None:
+            messages, trailing_metadata = cached
+            if trailing_metadata:
+                context.set_trailing_metadata(trailing_metadata)
+            for data in messages:
+                yield meta.proto_class.FromString(data)
+            return
+
+        self.context = TrailingMetadataRecorder(context)
+        messages = []
+        for message in self.list_messages():
+            if messages is not None:
+                messages.append(message.SerializeToString())
+                if len(messages) > response_cache.max_list_size:
+                    messages = None
             yield message
+        if messages is not None:
+            response_cache.set_list(key, messages, self.context.trailing_metadata)
+
+    def list_messages(self):
+        """
+        Filter, paginate and serialize the queryset, yielding its messages.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            queryset = page
+        for chunk in self.chunk_queryset(queryset):
+            serializer = self.get_serializer(chunk, many=True)
+            for message in serializer.message:
+                yield message
 
 
 class RetrieveModelMixin:
@@ -44,10 +126,35 @@ class RetrieveModelMixin:
         The request have to include a field corresponding to
         ``lookup_request_field``.  If an object can be retrieved this returns
         a proto message of ``serializer.Meta.proto_class``.
+
+        With a ``response_cache``, objects looked up by primary key are
+        cached.  With a ``cache_max_age``, the response carries the
+        ``cache-control`` and ``etag`` trailing metadata and an empty message
+        is sent to a client already holding it.
         """
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        return serializer.message
+        response_cache = self.get_response_cache()
+        pk = self.get_cache_pk() if response_cache is not None else None
+        proto_class = self.get_serializer_class().Meta.proto_class
+        message, data = None, None
+        if pk is not None:
+            key = response_cache.get_object_key(self.get_serializer_class().Meta.model, pk)
+            variant = self.get_cache_variant()
+            data = response_cache.get_object(key, variant)
+            if data is None:
+                message = self.get_serializer(self.get_object()).message
+                data = message.SerializeToString(deterministic=True)
+                response_cache.set_object(key, variant, data)
+        else:
+            instance = self.get_object()
+            serializer = self.get_serializer(instance)
+            message = serializer.message
+
+        if self.cache_max_age is not None:
+            if data is None:
+                data = message.SerializeToString(deterministic=True)
+            if self.set_cache_control(data):
+                return proto_class()
+        return message if message is not None else proto_class.FromString(data)
 
 
 class UpdateModelMixin:
@@ -119,3 +226,199 @@ class DestroyModelMixin:
     def perform_destroy(self, instance):
         """Delete an object instance."""
         instance.delete()
+
+
+class BaseBulkModelMixin:
+    def get_bulk_batches(self, request_iterator):
+        """
+        Split the stream of request messages into lists of at most
+        ``bulk_batch_size`` messages.
+        """
+        request_iterator = iter(request_iterator)
+        batch = list(itertools.islice(request_iterator, self.bulk_batch_size))
+        while batch:
+            yield batch
+            batch = list(itertools.islice(request_iterator, self.bulk_batch_size))
+
+    def get_bulk_serializers(self, messages, instances=None, offset=0):
+        """
+        Return a validated serializer per message, the request is aborted
+        with ``INVALID_ARGUMENT`` on the first invalid message.
+        """
+        serializers = []
+        for index, message in enumerate(messages):
+            if instances is None:
+                serializer = self.get_serializer(message=message)
+            else:
+                serializer = self.get_serializer(instances[index], message=message)
+            if not serializer.is_valid():
+                self.context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    'Item %s: %s' % (offset + index, json.dumps(serializer.errors))
+                )
+            serializers.append(serializer)
+        return serializers
+
+    def get_bulk_response_class(self):
+        """
+        Return the message class of the bulk responses. Defaults to
+        ``bulk_response_class``, or the ``<Model>BulkResponse`` message of the
+        proto file of ``serializer.Meta.proto_class``.
+        """
+        if self.bulk_response_class is not None:
+            return self.bulk_response_class
+        meta = self.get_serializer_class().Meta
+        name = '%sBulkResponse' % meta.model.__name__
+        descriptor = meta.proto_class.DESCRIPTOR.file.message_types_by_name.get(name)
+        assert descriptor is not None, (
+            "'%s' should either include a `bulk_response_class` attribute, "
+            "or the proto file of its serializer should define %s."
+            % (self.__class__.__name__, name)
+        )
+        return get_message_class(descriptor)
+
+    def get_bulk_response(self, pks):
+        return self.get_bulk_response_class()(count=len(pks), ids=pks)
+
+    def get_bulk_pks(self, messages):
+        """Primary keys carried by the request messages."""
+        pk_name = model_meta.get_model_pk(self.get_queryset().model).name
+        return [getattr(message, pk_name) for message in messages]
+
+
+class BulkCreateModelMixin(BaseBulkModelMixin):
+    def bulk_create(self, request, context):
+        """
+        Create model instances from a stream of proto messages of
+        ``serializer.Meta.proto_class``.
+
+        Every message is validated by the serializer and the objects are
+        saved by ``bulk_create()`` in batches of ``bulk_batch_size``, one
+        transaction per batch.  Returns the count and the primary keys of the
+        created objects.
+
+        .. note::
+
+            This is a client streaming RPC.
+        """
+        pks = []
+        for messages in self.get_bulk_batches(request):
+            serializers = self.get_bulk_serializers(messages, offset=len(pks))
+            with transaction.atomic(using=self.get_queryset().db):
+                objects = self.perform_bulk_create(serializers)
+                self.invalidate_response_cache([obj.pk for obj in objects])
+            pks.extend(obj.pk for obj in objects)
+        return self.get_bulk_response(pks)
+
+    def perform_bulk_create(self, serializers):
+        """Save new object instances, return them."""
+        queryset = self.get_queryset()
+        model = queryset.model
+        to_many_fields = _get_to_many_fields(model)
+        objects, relations = [], []
+        for serializer in serializers:
+            data = dict(serializer.validated_data)
+            relations.append({name: data.pop(name) for name in to_many_fields if name in data})
+            objects.append(model(**data))
+        if (connections[queryset.db].features.can_return_rows_from_bulk_insert
+                or all(obj.pk is not None for obj in objects)):
+            objects = queryset.bulk_create(objects)
+        else:
+            # The backend does not set the primary keys of ``bulk_create()``,
+            # which the to-many relations and the response need.
+            for obj in objects:
+                obj.save(force_insert=True, using=queryset.db)
+        _bulk_set_many_to_many(model, objects, relations, queryset.db)
+        return objects
+
+
+class BulkUpdateModelMixin(BaseBulkModelMixin):
+    def bulk_update(self, request, context):
+        """
+        Update model instances from a stream of proto messages of
+        ``serializer.Meta.proto_class``, each carrying the primary key of the
+        instance to update.
+
+        Every message is validated by the serializer and the objects are
+        saved by ``bulk_update()`` in batches of ``bulk_batch_size``, one
+        transaction per batch.  Returns the count and the primary keys of the
+        updated objects.
+
+        .. note::
+
+            This is a client streaming RPC.
+        """
+        pks = []
+        for messages in self.get_bulk_batches(request):
+            instances = self.get_bulk_instances(self.get_bulk_pks(messages))
+            serializers = self.get_bulk_serializers(messages, instances, offset=len(pks))
+            with transaction.atomic(using=self.get_queryset().db):
+                self.perform_bulk_update(serializers)
+                self.invalidate_response_cache([instance.pk for instance in instances])
+            pks.extend(instance.pk for instance in instances)
+        return self.get_bulk_response(pks)
+
+    def get_bulk_instances(self, pks):
+        """
+        Return the instances of ``pks`` in the same order, the request is
+        aborted with ``NOT_FOUND`` if one of them does not exist.
+        """
+        queryset = self.get_queryset()
+        instances = {str(obj.pk): obj for obj in queryset.filter(pk__in=pks)}
+        missing = [str(pk) for pk in pks if str(pk) not in instances]
+        if missing:
+            self.context.abort(grpc.StatusCode.NOT_FOUND, (
+                '%s: %s not found!' %
+                (queryset.model.__name__, ', '.join(missing))
+            ))
+        return [instances[str(pk)] for pk in pks]
+
+    def perform_bulk_update(self, serializers):
+        """Save existing object instances."""
+        queryset = self.get_queryset()
+        model = queryset.model
+        to_many_fields = _get_to_many_fields(model)
+        objects, relations, fields = [], [], set()
+        for serializer in serializers:
+            instance = serializer.instance
+            relations.append({})
+            for attr, value in serializer.validated_data.items():
+                if attr in to_many_fields:
+                    relations[-1][attr] = value
+                else:
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+            objects.append(instance)
+        if fields:
+            queryset.bulk_update(objects, sorted(fields))
+        _bulk_set_many_to_many(model, objects, relations, queryset.db, clear=True)
+
+
+class BulkDestroyModelMixin(BaseBulkModelMixin):
+    def bulk_destroy(self, request, context):
+        """
+        Destroy the model instances whose primary keys are carried by a
+        stream of proto messages of ``serializer.Meta.proto_class``.
+
+        The objects are deleted in batches of ``bulk_batch_size``, one
+        transaction per batch.  Returns the count and the primary keys of the
+        deleted objects, unknown primary keys are skipped.
+
+        .. note::
+
+            This is a client streaming RPC.
+        """
+        pks = []
+        for messages in self.get_bulk_batches(request):
+            queryset = self.get_queryset().filter(pk__in=self.get_bulk_pks(messages))
+            with transaction.atomic(using=queryset.db):
+                deleted = self.perform_bulk_destroy(queryset)
+                self.invalidate_response_cache(deleted)
+            pks.extend(deleted)
+        return self.get_bulk_response(pks)
+
+    def perform_bulk_destroy(self, queryset):
+        """Delete the object instances of the queryset, return their pks."""
+        pks = list(queryset.values_list('pk', flat=True))
+        queryset.delete()
+        return pks
@@ -0,0 +1,147 @@
+"""
+Cursor pagination of list services. The page is selected by the
+``page_size`` and ``page_token`` request fields and the token of the next page
+is sent back in the ``next-page-token`` trailing metadata.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+
+import grpc
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+
+from .filters import get_request_value
+
+NEXT_PAGE_TOKEN_METADATA_KEY = 'next-page-token'
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (datetime.timedelta, decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class BasePagination:
+    def paginate_queryset(self, queryset, request, service):
+        raise NotImplementedError('paginate_queryset() must be implemented.')
+
+
+class CursorPagination(BasePagination):
+    """
+    Keyset pagination on the ordering of the queryset. The page token holds
+    the ordering and the values of the last object of the page, the next page
+    starts right after it, so pages stay consistent while rows are inserted
+    and the database can use an index on the ordering fields.
+
+    The ordering is the one set on the queryset (e.g. by
+    :class:`~django_grpc_bus.filters.OrderingFilter`) or the model default,
+    with the primary key added to break ties. It may only contain concrete,
+    non null fields of the model, other orderings are rejected with
+    ``FAILED_PRECONDITION``.
+    """
+    page_size = None
+    max_page_size = 1000
+    page_size_request_field = 'page_size'
+    page_token_request_field = 'page_token'
+
+    def get_page_size(self, request, service):
+        page_size = get_request_value(request, self.page_size_request_field) or self.page_size
+        if page_size is not None and page_size < 0:
+            service.context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'page_size must not be negative')
+        if not page_size or page_size > self.max_page_size:
+            return self.max_page_size
+        return page_size
+
+    def get_ordering(self, queryset, service):
+        """
+        Return the ordering as a list of ``(attname, descending)``, foreign
+        keys are ordered by their column.
+        """
+        query = queryset.query
+        ordering = list(query.order_by)
+        if not ordering and query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+
+        opts = queryset.model._meta
+        result = []
+        for term in ordering:
+            name = term.lstrip('-') if isinstance(term, str) else None
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if (field is None or not field.concrete or field.null
+                    or (field.is_relation and not field.many_to_one)):
+                service.context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION,
+                    '%s can not be paginated by %s' % (queryset.model.__name__, term)
+                )
+            result.append((field.attname, term.startswith('-')))
+            if field.primary_key:
+                return result
+        result.append((opts.pk.attname, False))
+        return result
+
+    @staticmethod
+    def get_order_by(ordering):
+        return [('-' if descending else '') + attname for attname, descending in ordering]
+
+    def decode_token(self, token, ordering, service):
+        terms = self.get_order_by(ordering)
+        try:
+            content = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            values = content['v']
+            if content['o'] != terms or len(values) != len(terms):
+                raise ValueError('ordering mismatch')
+        except (binascii.Error, UnicodeEncodeError, ValueError, KeyError, TypeError):
+            service.context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'Invalid page token')
+        return values
+
+    def encode_token(self, instance, ordering):
+        content = {
+            'o': self.get_order_by(ordering),
+            'v': [_encode_value(getattr(instance, attname)) for attname, _ in ordering],
+        }
+        return base64.urlsafe_b64encode(json.dumps(content).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def get_keyset_filter(ordering, values):
+        """
+        ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)``, honoring the
+        direction of every field.
+        """
+        keyset_filter = Q()
+        equal = {}
+        for (attname, descending), value in zip(ordering, values):
+            keyset_filter |= Q(**equal, **{f'{attname}__{"lt" if descending else "gt"}': value})
+            equal[attname] = value
+        return keyset_filter
+
+    def paginate_queryset(self, queryset, request, service):
+        """
+        Return the list of objects of the requested page, or ``None`` when
+        the request does not ask for pagination.
+        """
+        token = get_request_value(request, self.page_token_request_field)
+        if not token and not get_request_value(request, self.page_size_request_field) and not self.page_size:
+            return None
+
+        page_size = self.get_page_size(request, service)
+        ordering = self.get_ordering(queryset, service)
+        queryset = queryset.order_by(*self.get_order_by(ordering))
+        if token:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, self.decode_token(token, ordering, service)))
+
+        page = list(queryset[:page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            service.context.set_trailing_metadata((
+                (NEXT_PAGE_TOKEN_METADATA_KEY, self.encode_token(page[-1], ordering)),
+            ))
+        return page
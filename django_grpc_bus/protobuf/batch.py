@@ -0,0 +1,50 @@
+"""
+Messages of the batch service, which runs many unary requests of one method
+in a single call. They are built at runtime in their own descriptor pool,
+so they don't depend on the installed protobuf code generator and are not
+exposed through reflection.
+"""
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory, symbol_database
+
+SERVICE_NAME = 'django_grpc_bus.Batch'
+METHOD_NAME = 'Call'
+METHOD_FULL_NAME = f'/{SERVICE_NAME}/{METHOD_NAME}'
+
+_pool = descriptor_pool.DescriptorPool()
+
+
+def _build_file():
+    field = descriptor_pb2.FieldDescriptorProto
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name='django_grpc_bus/batch.proto',
+        package='django_grpc_bus',
+        syntax='proto3',
+    )
+    request = file_proto.message_type.add(name='BatchRequest')
+    request.field.add(name='method', number=1, type=field.TYPE_STRING, label=field.LABEL_OPTIONAL)
+    request.field.add(name='requests', number=2, type=field.TYPE_BYTES, label=field.LABEL_REPEATED)
+
+    result = file_proto.message_type.add(name='BatchResult')
+    result.field.add(name='response', number=1, type=field.TYPE_BYTES, label=field.LABEL_OPTIONAL)
+    result.field.add(name='code', number=2, type=field.TYPE_INT32, label=field.LABEL_OPTIONAL)
+    result.field.add(name='details', number=3, type=field.TYPE_STRING, label=field.LABEL_OPTIONAL)
+
+    response = file_proto.message_type.add(name='BatchResponse')
+    response.field.add(
+        name='results', number=1, type=field.TYPE_MESSAGE, label=field.LABEL_REPEATED,
+        type_name='.django_grpc_bus.BatchResult',
+    )
+    return _pool.Add(file_proto)
+
+
+def get_message_class(descriptor):
+    if hasattr(message_factory, 'GetMessageClass'):
+        return message_factory.GetMessageClass(descriptor)
+    return symbol_database.Default().GetPrototype(descriptor)
+
+
+_file = _build_file()
+
+BatchRequest = get_message_class(_file.message_types_by_name['BatchRequest'])
+BatchResult = get_message_class(_file.message_types_by_name['BatchResult'])
+BatchResponse = get_message_class(_file.message_types_by_name['BatchResponse'])
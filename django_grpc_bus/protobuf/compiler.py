@@ -0,0 +1,341 @@
+"""
+Compiles the converters used by
+:class:`~django_grpc_bus.serializers.CompiledModelProtoSerializer`.
+
+A converter is the source of a plain Python function generated for one
+``(serializer class, proto class, fields)`` combination, so a conversion is a
+straight sequence of attribute copies instead of a walk over DRF fields, a
+dict and ``ParseDict``.
+"""
+import keyword
+from typing import Callable, Dict, Tuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.fields import SkipField
+from rest_framework.settings import ISO_8601, api_settings
+
+from ..utils.model_meta import has_static_fields
+from .json_format import _map_key, parse_dict
+
+_COERCIONS = {
+    FieldDescriptor.CPPTYPE_INT32: int,
+    FieldDescriptor.CPPTYPE_INT64: int,
+    FieldDescriptor.CPPTYPE_UINT32: int,
+    FieldDescriptor.CPPTYPE_UINT64: int,
+    FieldDescriptor.CPPTYPE_DOUBLE: float,
+    FieldDescriptor.CPPTYPE_FLOAT: float,
+    FieldDescriptor.CPPTYPE_BOOL: bool,
+}
+
+# DRF fields whose representation of a model attribute is the attribute itself.
+_PLAIN_FIELDS = {
+    drf_fields.CharField.to_representation,
+    drf_fields.IntegerField.to_representation,
+    drf_fields.FloatField.to_representation,
+    drf_fields.BooleanField.to_representation,
+}
+
+# DRF fields whose representation only depends on their own arguments, so the
+# field instance is shared by every serializer using the compiled function.
+_CODEC_FIELDS = (
+    drf_fields.DateTimeField,
+    drf_fields.DateField,
+    drf_fields.TimeField,
+    drf_fields.DurationField,
+    drf_fields.DecimalField,
+    drf_fields.UUIDField,
+    drf_fields.ChoiceField,
+) + ((drf_fields.BigIntegerField,) if hasattr(drf_fields, 'BigIntegerField') else ())
+
+_data_printer = None
+
+_message_builders: Dict[Tuple, Callable] = {}
+_data_builders: Dict[type, Callable] = {}
+
+
+def get_timezone():
+    """Timezone datetimes are represented in, as DRF's ``DateTimeField`` does."""
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def _datetime_to_iso(value, tz, to_representation):
+    if tz is None or value.utcoffset() is None:
+        return to_representation(value)
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _date_to_iso(value):
+    return value if isinstance(value, str) else value.isoformat()
+
+
+def _is_iso_format(drf_field, default):
+    output_format = getattr(drf_field, 'format', default)
+    return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+
+def _get_coercion(proto_field):
+    if proto_field.type == FieldDescriptor.TYPE_STRING:
+        return str
+    return _COERCIONS.get(proto_field.cpp_type)
+
+
+def _is_map(proto_field):
+    return proto_field.message_type is not None and proto_field.message_type.GetOptions().map_entry
+
+
+def _attr(name):
+    if name.isidentifier() and not keyword.iskeyword(name):
+        return f'.{name}'
+    return None
+
+
+def _get_model_field(model, drf_field):
+    if model is None or len(drf_field.source_attrs) != 1 or not _attr(drf_field.source):
+        return None
+    try:
+        return model._meta.get_field(drf_field.source)
+    except FieldDoesNotExist:
+        return None
+
+
+def _get_data_printer():
+    # Built on first use, protobuf 5.26 renamed ``including_default_value_fields``.
+    global _data_printer
+    if _data_printer is None:
+        try:
+            _data_printer = json_format._Printer(
+                including_default_value_fields=True, preserving_proto_field_name=True
+            )
+        except TypeError:
+            _data_printer = json_format._Printer(
+                always_print_fields_with_no_presence=True, preserving_proto_field_name=True
+            )
+    return _data_printer
+
+
+def _get_json_converter(proto_field):
+    to_json = _get_data_printer()._FieldToJsonObject
+    if _is_map(proto_field):
+        value_field = proto_field.message_type.fields_by_name['value']
+        return lambda value: {_map_key(key): to_json(value_field, value[key]) for key in value}
+    if proto_field.label == FieldDescriptor.LABEL_REPEATED:
+        return lambda value: [to_json(proto_field, item) for item in value]
+    return lambda value: to_json(proto_field, value)
+
+
+def _get_value(target, name):
+    attr = _attr(name)
+    return f'{target}{attr}' if attr else f'getattr({target}, {name!r})'
+
+
+class _FunctionWriter:
+    def __init__(self, name, args):
+        self.lines = [f'def {name}({", ".join(args)}):']
+        self.namespace = {}
+
+    def add(self, value, prefix='_c'):
+        """Make ``value`` available to the generated code, return its name."""
+        name = f'{prefix}{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def write(self, line, indent=1):
+        self.lines.append('    ' * indent + line)
+
+    def compile(self, name):
+        code = '\n'.join(self.lines) + '\n'
+        exec(compile(code, f'<django_grpc_bus {name}>', 'exec'), self.namespace)
+        function = self.namespace[name]
+        function.__source__ = code
+        return function
+
+
+class _MessageBuilderCompiler:
+    """
+    Generates ``build(instance, serializer, tz) -> message``, ``tz`` being
+    the result of :func:`get_timezone`.
+
+    Concrete model fields serialized by plain DRF fields are copied straight
+    from the instance, dates, decimals, UUIDs and choices go through the
+    shared DRF field, foreign keys are read from the ``<name>_id`` attribute
+    and to-many primary key relations from the related manager. Any other
+    field (method fields, nested serializers, custom fields, ...) is looked up
+    in ``serializer.fields`` and serialized by DRF, so it sees the current
+    context.
+    """
+
+    def __init__(self, serializer, proto_class):
+        self.proto_fields = proto_class.DESCRIPTOR.fields_by_name
+        self.model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+        self.writer = _FunctionWriter('build', ['instance', 'serializer', 'tz'])
+        self.writer.namespace.update({
+            'proto_class': proto_class,
+            'SkipField': SkipField,
+            'PKOnlyObject': relations.PKOnlyObject,
+            'parse_dict': parse_dict,
+        })
+        self.readable_fields = list(serializer._readable_fields)
+
+    def compile(self):
+        self.writer.write('message = proto_class()')
+        for drf_field in self.readable_fields:
+            proto_field = self.proto_fields.get(drf_field.field_name)
+            if proto_field is not None:
+                self._write_field(drf_field, proto_field)
+        self.writer.write('return message')
+        return self.writer.compile('build')
+
+    def _write_field(self, drf_field, proto_field):
+        model_field = _get_model_field(self.model, drf_field)
+        to_representation = getattr(type(drf_field), 'to_representation', None)
+        plain_field = model_field is not None and model_field.concrete and not model_field.is_relation
+
+        if plain_field and to_representation in _PLAIN_FIELDS:
+            self._write_attribute(model_field.attname, proto_field)
+        elif plain_field and isinstance(drf_field, _CODEC_FIELDS):
+            self._write_attribute(model_field.attname, proto_field, self._get_codec(drf_field))
+        elif (model_field is not None and model_field.concrete and model_field.is_relation
+              and not model_field.many_to_many and type(drf_field) is relations.PrimaryKeyRelatedField
+              and drf_field.pk_field is None):
+            self._write_attribute(model_field.attname, proto_field)
+        elif (model_field is not None and isinstance(drf_field, relations.ManyRelatedField)
+              and type(drf_field.child_relation) is relations.PrimaryKeyRelatedField
+              and drf_field.child_relation.pk_field is None
+              and proto_field.label == FieldDescriptor.LABEL_REPEATED and _get_coercion(proto_field)):
+            self._write_related_pks(drf_field.source, proto_field)
+        else:
+            self._write_drf_field(drf_field, proto_field)
+
+    def _get_codec(self, drf_field):
+        """
+        Expression representing ``value`` the way ``drf_field`` does, with
+        shortcuts for the default formats.
+        """
+        add = self.writer.add
+        to_representation = add(drf_field.to_representation)
+        field_class = type(drf_field)
+        if (field_class is drf_fields.DateTimeField and not hasattr(drf_field, 'timezone')
+                and _is_iso_format(drf_field, api_settings.DATETIME_FORMAT)):
+            return f'{add(_datetime_to_iso)}(value, tz, {to_representation})'
+        if field_class is drf_fields.DateField and _is_iso_format(drf_field, api_settings.DATE_FORMAT):
+            return f'{add(_date_to_iso)}(value)'
+        if field_class is drf_fields.UUIDField and drf_field.uuid_format == 'hex_verbose':
+            return f'{add(str)}(value)'
+        return f'{to_representation}(value)'
+
+    def _write_attribute(self, attname, proto_field, codec=None):
+        write = self.writer.write
+        write(f'value = instance.{attname}')
+        write('if value is not None:')
+        if codec:
+            write(f'value = {codec}', 2)
+            write('if value is not None:', 2)
+            self._write_assign(proto_field, 'value', 3)
+        else:
+            self._write_assign(proto_field, 'value', 2)
+
+    def _write_related_pks(self, source, proto_field):
+        coercion = self.writer.add(_get_coercion(proto_field))
+        write = self.writer.write
+        write('if instance.pk is not None:')
+        write(f'{_get_value("message", proto_field.name)}.extend('
+              f'[{coercion}(item.pk) for item in instance.{source}.all()])', 2)
+
+    def _write_drf_field(self, drf_field, proto_field):
+        write = self.writer.write
+        write(f'field = serializer.fields[{drf_field.field_name!r}]')
+        write('try:')
+        write('value = field.get_attribute(instance)', 2)
+        write('except SkipField:')
+        write('pass', 2)
+        write('else:')
+        write('if (value.pk if isinstance(value, PKOnlyObject) else value) is not None:', 2)
+        write('value = field.to_representation(value)', 3)
+        self._write_assign(proto_field, 'value', 3)
+
+    def _write_assign(self, proto_field, value, indent):
+        write = self.writer.write
+        name = proto_field.name
+        coercion = _get_coercion(proto_field)
+        if coercion is None or _is_map(proto_field):
+            write(f'parse_dict({{{name!r}: {value}}}, message)', indent)
+        elif proto_field.label == FieldDescriptor.LABEL_REPEATED:
+            coercion = self.writer.add(coercion)
+            write(f'{_get_value("message", name)}.extend([{coercion}(item) for item in {value}])', indent)
+        elif _attr(name):
+            write(f'message.{name} = {self.writer.add(coercion)}({value})', indent)
+        else:
+            write(f'setattr(message, {name!r}, {self.writer.add(coercion)}({value}))', indent)
+
+
+class _DataBuilderCompiler:
+    """
+    Generates ``build(message) -> dict``, equivalent to
+    :func:`~django_grpc_bus.protobuf.json_format.message_to_dict` except that
+    64 bit integers stay ints.
+    """
+
+    def __init__(self, proto_class):
+        self.descriptor = proto_class.DESCRIPTOR
+        self.writer = _FunctionWriter('build', ['message'])
+
+    def compile(self):
+        write = self.writer.write
+        write('data = {}')
+        for proto_field in self.descriptor.fields:
+            name = proto_field.name
+            value = _get_value('message', name)
+            if _get_coercion(proto_field) is None or _is_map(proto_field):
+                value = f'{self.writer.add(_get_json_converter(proto_field))}({value})'
+            elif proto_field.label == FieldDescriptor.LABEL_REPEATED:
+                value = f'list({value})'
+            if proto_field.label != FieldDescriptor.LABEL_REPEATED and proto_field.has_presence:
+                write(f'if message.HasField({name!r}):')
+                write(f'data[{name!r}] = {value}', 2)
+            else:
+                write(f'data[{name!r}] = {value}')
+        write('return data')
+        return self.writer.compile('build')
+
+
+def get_message_builder(serializer, proto_class) -> Callable:
+    """
+    Return the compiled ``build(instance, serializer, tz)`` function turning
+    model instances into ``proto_class`` messages the way ``serializer``
+    does.  Serializers with static fields share one function per class and
+    read mask, so their fields are only built when DRF serializes one of
+    them.
+    """
+    serializer_class = type(serializer)
+    if has_static_fields(serializer_class):
+        key = (serializer_class, proto_class, serializer.read_mask)
+    else:
+        key = (serializer_class, proto_class, serializer.read_mask, tuple(serializer.fields))
+    try:
+        return _message_builders[key]
+    except KeyError:
+        pass
+    builder = _message_builders[key] = _MessageBuilderCompiler(serializer, proto_class).compile()
+    return builder
+
+
+def get_data_builder(proto_class) -> Callable:
+    """
+    Return the compiled ``build(message)`` function turning ``proto_class``
+    messages into serializer data.
+    """
+    try:
+        return _data_builders[proto_class]
+    except KeyError:
+        pass
+    builder = _data_builders[proto_class] = _DataBuilderCompiler(proto_class).compile()
+    return builder
@@ -37,10 +37,39 @@ class ModelProtoGenerator:
         # Default
         models.Field: 'string',
     }
+    # Proto types of the filter lookups that do not take a value of the
+    # field type.
+    lookup_types = {
+        'isnull': 'bool',
+        'iexact': 'string',
+        'contains': 'string',
+        'icontains': 'string',
+        'startswith': 'string',
+        'istartswith': 'string',
+        'endswith': 'string',
+        'iendswith': 'string',
+        'regex': 'string',
+        'iregex': 'string',
+        'date': 'string',
+        'time': 'string',
+        'year': 'int32',
+        'iso_year': 'int32',
+        'quarter': 'int32',
+        'month': 'int32',
+        'week': 'int32',
+        'week_day': 'int32',
+        'iso_week_day': 'int32',
+        'day': 'int32',
+        'hour': 'int32',
+        'minute': 'int32',
+        'second': 'int32',
+    }
+    list_lookups = ('in', 'range')
 
-    def __init__(self, model, field_names=None, package=None):
+    def __init__(self, model, field_names=None, package=None, filter_fields=None):
         self.model = model
         self.field_names = field_names
+        self.filter_fields = filter_fields or {}
         if package is None:
             package = model.__name__.lower()
         self.package = package
@@ -55,6 +84,7 @@ class ModelProtoGenerator:
         # self._writer.write_line('package %s;' % self.package)
         # self._writer.write_line('')
         self._writer.write_line('import "google/protobuf/empty.proto";')
+        self._writer.write_line('import "google/protobuf/field_mask.proto";')
         self._writer.write_line('')
         self._generate_service()
         self._writer.write_line('')
@@ -84,6 +114,11 @@ class ModelProtoGenerator:
                 'rpc destroy(%sData) returns (google.protobuf.Empty) {}' %
                 self.model.__name__
             )
+            for action in ('bulk_create', 'bulk_update', 'bulk_destroy'):
+                self._writer.write_line(
+                    'rpc %s(stream %sData) returns (%sBulkResponse) {}' %
+                    (action, self.model.__name__, self.model.__name__)
+                )
         self._writer.write_line('}')
 
     def _generate_message(self):
@@ -99,6 +134,18 @@ class ModelProtoGenerator:
         self._writer.write_line('}')
         self._writer.write_line('')
         self._writer.write_line('message %sListRequest {' % self.model.__name__)
+        with self._writer.indent():
+            self._writer.write_line('int32 page_size = 1;')
+            self._writer.write_line('string page_token = 2;')
+            self._writer.write_line('string order_by = 3;')
+            self._writer.write_line('google.protobuf.FieldMask read_mask = 4;')
+            number = 4
+            for field_name, proto_type in self.get_filter_fields().items():
+                number += 1
+                self._writer.write_line(
+                    '%s %s = %s;' %
+                    (proto_type, field_name, number)
+                )
         self._writer.write_line('}')
         self._writer.write_line('')
         self._writer.write_line('message %sRetrieveRequest {' % self.model.__name__)
@@ -111,6 +158,13 @@ class ModelProtoGenerator:
                 '%s %s = 1;' %
                 (pk_proto_type, pk_field_name)
             )
+            self._writer.write_line('google.protobuf.FieldMask read_mask = 2;')
+        self._writer.write_line('}')
+        self._writer.write_line('')
+        self._writer.write_line('message %sBulkResponse {' % self.model.__name__)
+        with self._writer.indent():
+            self._writer.write_line('int32 count = 1;')
+            self._writer.write_line('repeated %s ids = 2;' % pk_proto_type)
         self._writer.write_line('}')
 
     def get_fields(self):
@@ -128,6 +182,28 @@ class ModelProtoGenerator:
             )
         return fields
 
+    def get_filter_fields(self):
+        """
+        Return the dict of filter request field names -> proto types, a
+        ``name__lookup`` field for every lookup of ``filter_fields`` (just
+        ``name`` for ``exact``).  Scalar filters are ``optional`` so unset
+        filters can be told apart from zero values, which needs protoc 3.15.
+        """
+        fields = OrderedDict()
+        for field_name, lookups in self.filter_fields.items():
+            proto_type = self.build_proto_type(field_name, self.field_info, self.model)
+            proto_type = proto_type.replace('repeated ', '')
+            for lookup in lookups:
+                parts = lookup.split('__')
+                lookup_type = self.lookup_types.get(parts[-1]) or self.lookup_types.get(parts[0], proto_type)
+                if parts[-1] in self.list_lookups:
+                    lookup_type = 'repeated ' + lookup_type
+                else:
+                    lookup_type = 'optional ' + lookup_type
+                name = field_name if lookup == 'exact' else '%s__%s' % (field_name, lookup)
+                fields[name] = lookup_type
+        return fields
+
     def get_field_names(self):
         field_names = self.field_names
         if not field_names:
@@ -1,8 +1,19 @@
+import inspect
+from collections.abc import Mapping
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
 from google.protobuf.json_format import MessageToDict, ParseDict
 
+# protobuf 5.26 renamed ``including_default_value_fields``.
+if 'including_default_value_fields' in inspect.signature(MessageToDict).parameters:
+    _DEFAULT_VALUE_FIELDS = 'including_default_value_fields'
+else:
+    _DEFAULT_VALUE_FIELDS = 'always_print_fields_with_no_presence'
+
 
 def message_to_dict(message, **kwargs):
-    kwargs.setdefault('including_default_value_fields', True)
+    kwargs.setdefault(_DEFAULT_VALUE_FIELDS, kwargs.pop('including_default_value_fields', True))
     kwargs.setdefault('preserving_proto_field_name', True)
     return MessageToDict(message, **kwargs)
 
@@ -10,3 +21,105 @@ def message_to_dict(message, **kwargs):
 def parse_dict(js_dict, message, **kwargs):
     kwargs.setdefault('ignore_unknown_fields', True)
     return ParseDict(js_dict, message, **kwargs)
+
+
+_printer = None
+
+
+def _get_printer():
+    """
+    Return the private printer of ``json_format`` converting one field at a
+    time, built on first use, or ``None`` when this protobuf version lacks it.
+    """
+    global _printer
+    if _printer is None:
+        try:
+            printer = json_format._Printer(preserving_proto_field_name=True)
+        except (AttributeError, TypeError):
+            printer = None
+        supported = hasattr(printer, '_FieldToJsonObject') and hasattr(json_format, '_WKTJSONMETHODS')
+        _printer = printer if supported else False
+    return _printer or None
+
+
+def _map_key(key):
+    if isinstance(key, bool):
+        return 'true' if key else 'false'
+    return str(key)
+
+
+class MessageView(Mapping):
+    """
+    Read only dict view of a protobuf message. A field is converted the way
+    ``MessageToDict(message, preserving_proto_field_name=True)`` converts it,
+    but only when it is accessed, and nested messages are views as well::
+
+        view = MessageView(message)
+        view['name']
+        view.to_dict()
+    """
+    __slots__ = ('_message', '_cache')
+
+    def __init__(self, message):
+        self._message = message
+        self._cache = {}
+
+    @property
+    def message(self):
+        return self._message
+
+    def _convert_value(self, field, value):
+        if (field.type == FieldDescriptor.TYPE_MESSAGE
+                and field.message_type.full_name not in json_format._WKTJSONMETHODS):
+            return MessageView(value)
+        return _get_printer()._FieldToJsonObject(field, value)
+
+    def _convert(self, field, value):
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            value_field = field.message_type.fields_by_name['value']
+            return {_map_key(key): self._convert_value(value_field, value[key]) for key in value}
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            return [self._convert_value(field, item) for item in value]
+        return self._convert_value(field, value)
+
+    def _get_field(self, key):
+        field = self._message.DESCRIPTOR.fields_by_name.get(key)
+        if field is None:
+            return None
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            return field if len(getattr(self._message, key)) else None
+        if field.has_presence:
+            return field if self._message.HasField(key) else None
+        return field if getattr(self._message, key) != field.default_value else None
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        field = self._get_field(key)
+        if field is None:
+            raise KeyError(key)
+        if _get_printer() is None:
+            # Fields can not be converted one by one, convert them all.
+            self._cache.update(self.to_dict())
+            return self._cache[key]
+        value = self._cache[key] = self._convert(field, getattr(self._message, key))
+        return value
+
+    def __contains__(self, key):
+        return key in self._cache or self._get_field(key) is not None
+
+    def __iter__(self):
+        for field, value in self._message.ListFields():
+            if not field.is_extension:
+                yield field.name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        return MessageToDict(self._message, preserving_proto_field_name=True)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.to_dict()!r})'
@@ -0,0 +1,66 @@
+"""
+Server reflection reporting a fingerprint of the served schema in the
+``schema-fingerprint`` initial metadata of every reflection call, so clients
+keeping a :class:`~django_grpc_bus.client.descriptor_cache.DescriptorCache`
+tell a changed schema apart without resolving it.
+"""
+import grpc
+from google.protobuf import descriptor_pb2, descriptor_pool
+from grpc_reflection.v1alpha import reflection, reflection_pb2_grpc
+
+from .client.descriptor_cache import make_fingerprint
+
+SCHEMA_FINGERPRINT_METADATA_KEY = 'schema-fingerprint'
+
+
+def get_schema_fingerprint(service_names, pool=None):
+    """
+    Fingerprint of the files defining ``service_names`` and their transitive
+    dependencies in ``pool``.
+    """
+    pool = pool or descriptor_pool.Default()
+    files = {}
+
+    def collect(file_descriptor):
+        if file_descriptor.name in files:
+            return
+        files[file_descriptor.name] = descriptor_pb2.FileDescriptorProto.FromString(file_descriptor.serialized_pb)
+        for dependency in file_descriptor.dependencies:
+            collect(dependency)
+
+    for name in service_names:
+        try:
+            collect(pool.FindFileContainingSymbol(name))
+        except KeyError:
+            continue
+    return make_fingerprint(service_names, files.values())
+
+
+class ReflectionServicer(reflection.ReflectionServicer):
+    def __init__(self, service_names, pool=None):
+        super().__init__(service_names, pool=pool)
+        self.schema_fingerprint = get_schema_fingerprint(service_names, pool)
+
+    def ServerReflectionInfo(self, request_iterator, context):
+        context.send_initial_metadata(((SCHEMA_FINGERPRINT_METADATA_KEY, self.schema_fingerprint),))
+        yield from super().ServerReflectionInfo(request_iterator, context)
+
+
+class AsyncReflectionServicer(reflection.aio.ReflectionServicer):
+    def __init__(self, service_names, pool=None):
+        super().__init__(service_names, pool=pool)
+        self.schema_fingerprint = get_schema_fingerprint(service_names, pool)
+
+    async def ServerReflectionInfo(self, request_iterator, context):
+        await context.send_initial_metadata(((SCHEMA_FINGERPRINT_METADATA_KEY, self.schema_fingerprint),))
+        async for response in super().ServerReflectionInfo(request_iterator, context):
+            yield response
+
+
+def enable_server_reflection(service_names, server, pool=None):
+    """``grpc_reflection``'s ``enable_server_reflection`` with the schema fingerprint."""
+    if isinstance(server, grpc.aio.Server):
+        servicer = AsyncReflectionServicer(service_names, pool=pool)
+    else:
+        servicer = ReflectionServicer(service_names, pool=pool)
+    reflection_pb2_grpc.add_ServerReflectionServicer_to_server(servicer, server)
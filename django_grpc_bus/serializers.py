@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework.exceptions import ValidationError
 from rest_framework.serializers import (
     BaseSerializer, Serializer, ListSerializer, ModelSerializer,
@@ -5,14 +6,19 @@ from rest_framework.serializers import (
 )
 from rest_framework.settings import api_settings
 
+from .protobuf import compiler
 from .protobuf.json_format import (
     message_to_dict, parse_dict
 )
 
 
 class BaseProtoSerializer(BaseSerializer):
+    default_list_serializer_class = None
+
     def __init__(self, *args, **kwargs):
         message = kwargs.pop('message', None)
+        read_mask = kwargs.pop('read_mask', None)
+        self.read_mask = frozenset(read_mask) if read_mask else None
         if message is not None:
             self.initial_message = message
             kwargs['data'] = self.message_to_data(message)
@@ -35,10 +41,14 @@ class BaseProtoSerializer(BaseSerializer):
     @classmethod
     def many_init(cls, *args, **kwargs):
         allow_empty = kwargs.pop('allow_empty', None)
+        # The messages are converted by the list serializer.
+        message = kwargs.pop('message', None)
         child_serializer = cls(*args, **kwargs)
         list_kwargs = {
             'child': child_serializer,
         }
+        if message is not None:
+            list_kwargs['message'] = message
         if allow_empty is not None:
             list_kwargs['allow_empty'] = allow_empty
         list_kwargs.update({
@@ -46,11 +56,20 @@ class BaseProtoSerializer(BaseSerializer):
             if key in LIST_SERIALIZER_KWARGS
         })
         meta = getattr(cls, 'Meta', None)
-        list_serializer_class = getattr(meta, 'list_serializer_class', ListProtoSerializer)
+        list_serializer_class = getattr(
+            meta, 'list_serializer_class', cls.default_list_serializer_class or ListProtoSerializer
+        )
         return list_serializer_class(*args, **list_kwargs)
 
 
 class ProtoSerializer(BaseProtoSerializer, Serializer):
+    @property
+    def _readable_fields(self):
+        """Readable fields, restricted to the ``read_mask`` if one is given."""
+        for field in super()._readable_fields:
+            if self.read_mask is None or field.field_name in self.read_mask:
+                yield field
+
     def message_to_data(self, message):
         """Protobuf message -> Dict of python primitive datatypes.
         """
@@ -72,6 +91,14 @@ class ProtoSerializer(BaseProtoSerializer, Serializer):
 
 
 class ListProtoSerializer(BaseProtoSerializer, ListSerializer):
+    def __init__(self, *args, **kwargs):
+        # The messages are converted by the child, once ListSerializer has set it.
+        message = kwargs.pop('message', None)
+        super().__init__(*args, **kwargs)
+        if message is not None:
+            self.initial_message = message
+            self.initial_data = self.message_to_data(message)
+
     def message_to_data(self, message):
         """
         List of protobuf messages -> List of dicts of python primitive datatypes.
@@ -100,3 +127,67 @@ class ListProtoSerializer(BaseProtoSerializer, ListSerializer):
 class ModelProtoSerializer(ProtoSerializer, ModelSerializer):
     pass
 
+
+class CompiledListProtoSerializer(ListProtoSerializer):
+    @property
+    def message(self):
+        if not hasattr(self, '_message'):
+            if not self.child.can_build_from_instance(self):
+                return super().message
+            iterable = self.instance
+            if isinstance(iterable, models.manager.BaseManager):
+                iterable = iterable.all()
+            build = self.child.get_message_builder()
+            tz = compiler.get_timezone()
+            self._message = [build(item, self.child, tz) for item in iterable]
+        return self._message
+
+
+class CompiledModelProtoSerializer(ModelProtoSerializer):
+    """
+    A ``ModelProtoSerializer`` that builds messages straight from model
+    instances with a function compiled once per serializer class, proto class
+    and set of fields, instead of going through ``to_representation()`` and
+    ``ParseDict``.  Incoming messages are read by a compiled function as well,
+    validation and saving still go through DRF::
+
+        class PostProtoSerializer(CompiledModelProtoSerializer):
+            class Meta:
+                model = Post
+                proto_class = post_pb2.Post
+                fields = ['id', 'title', 'content', 'created', 'tags']
+
+    Dates, times, decimals, UUIDs and choices are represented by their DRF
+    fields, foreign keys and to-many relations by primary keys.  Fields that
+    depend on the serializer context (method fields, nested serializers,
+    custom fields) are serialized by DRF.
+    """
+    default_list_serializer_class = CompiledListProtoSerializer
+
+    def message_to_data(self, message):
+        return compiler.get_data_builder(type(message))(message)
+
+    def get_message_builder(self):
+        return compiler.get_message_builder(self, self.Meta.proto_class)
+
+    def can_build_from_instance(self, serializer):
+        """
+        Whether the message of ``serializer`` (this one or its list
+        serializer) is the representation of its instance, which is what
+        ``data`` returns as long as the data is valid.
+        """
+        if serializer.instance is None or getattr(serializer, '_errors', None):
+            return False
+        return not hasattr(serializer, 'initial_data') or hasattr(serializer, '_validated_data')
+
+    def instance_to_message(self, instance):
+        """Model instance -> Protobuf message."""
+        return self.get_message_builder()(instance, self, compiler.get_timezone())
+
+    @property
+    def message(self):
+        if not hasattr(self, '_message'):
+            if not self.can_build_from_instance(self):
+                return super().message
+            self._message = self.instance_to_message(self.instance)
+        return self._message
@@ -1,11 +1,20 @@
+import asyncio
+import collections
+import logging
 import os
+import signal
+import time
 from concurrent import futures
 
 import grpc
+from django import db
 
 from .exceptions import ServerSSLConfigError
+from .metrics import BaseMetricsInterceptor
 from .settings import message_bus_settings
 
+logger = logging.getLogger(__name__)
+
 
 class Server:
     def __init__(self,
@@ -18,7 +27,9 @@ class Server:
                  alts: bool = False,
                  private_key: bytes = None,
                  certificate: bytes = None,
-                 handler=message_bus_settings.ROOT_HANDLERS_HOOK
+                 handler=message_bus_settings.ROOT_HANDLERS_HOOK,
+                 use_async: bool = False,
+                 options=None,
                  ):
         self.host = host
         self.port = port
@@ -33,6 +44,8 @@ class Server:
         self._server_credentials = None
         self.thread_pool = futures.ThreadPoolExecutor(max_workers=self.worker)
         self.interceptors = interceptors
+        self.use_async = use_async
+        self.options = options
 
     @property
     def endpoint(self):
@@ -59,24 +72,191 @@ class Server:
         else:
             self.server.add_insecure_port(self.endpoint)
 
+    def _watch_thread_pool(self):
+        for interceptor in self.interceptors or ():
+            if isinstance(interceptor, BaseMetricsInterceptor):
+                interceptor.metrics.watch_executor(self.thread_pool)
+
     def run(self, wait=True):
+        if self.use_async:
+            # The aio server lives on the loop created here, so it always
+            # blocks. Await ``run_async()`` to start it on a running loop.
+            asyncio.run(self.run_async())
+            return
         if self.debug:
             os.environ['GRPC_VERBOSITY'] = 'debug'
-        self.server = grpc.server(self.thread_pool, interceptors=self.interceptors)
+        self.server = grpc.server(self.thread_pool, interceptors=self.interceptors, options=self.options)
+        self._watch_thread_pool()
         self.handler.bind_to_server(
             self.server,
-            enable_reflection=self.enable_reflection
+            enable_reflection=self.enable_reflection,
+            interceptors=self.interceptors
         )
         self._add_port()
         self.server.start()
         if wait:
             self.wait_for_termination()
 
+    async def run_async(self, wait=True):
+        """
+        Run on ``grpc.aio.server``. Sync service handlers run in
+        ``thread_pool``, so ``worker`` bounds the concurrent ORM work instead
+        of the number of open RPCs.
+        """
+        if self.debug:
+            os.environ['GRPC_VERBOSITY'] = 'debug'
+        self.server = grpc.aio.server(interceptors=self.interceptors, options=self.options)
+        self._watch_thread_pool()
+        await self.handler.bind_to_aio_server(
+            self.server,
+            enable_reflection=self.enable_reflection,
+            executor=self.thread_pool,
+            interceptors=self.interceptors
+        )
+        self._add_port()
+        await self.server.start()
+        if wait:
+            await self.server.wait_for_termination()
+
     def stop(self, grace=None):
         if self.server:
             self.server.stop(grace)
 
+    async def stop_async(self, grace=None):
+        if self.server:
+            await self.server.stop(grace)
+
     def wait_for_termination(self):
         if self.server:
             self.server.wait_for_termination()
 
+
+class ServerSupervisor:
+    """
+    Pre-forks ``processes`` workers, each running its own :class:`Server`
+    bound to the same port with ``SO_REUSEPORT``, so the kernel spreads the
+    connections over every core::
+
+        ServerSupervisor(processes=4, server_kwargs={'port': '50051'}).run()
+
+    Crashed workers are restarted, after ``restart_delay`` seconds doubled
+    for every other crash of the last ``restart_window`` seconds up to
+    ``max_restart_delay``. Once more than ``max_restarts`` crashes happened
+    in the window the supervisor gives up, stops the other workers and
+    :attr:`crash_looping` is set. On ``SIGTERM`` or ``SIGINT`` every worker is
+    stopped with ``grace`` and the supervisor exits once they are done.
+    """
+    restart_delay = 1
+    max_restart_delay = 30
+    max_restarts = 5
+    restart_window = 60
+
+    def __init__(self, processes: int, server_kwargs: dict = None, grace: float = None):
+        self.processes = processes
+        self.server_kwargs = server_kwargs or {}
+        self.grace = grace
+        self.workers = set()
+        self.crash_looping = False
+        self._crashes = collections.deque()
+        self._stopping = False
+
+    def get_server(self):
+        options = list(self.server_kwargs.get('options') or [])
+        options.append(('grpc.so_reuseport', 1))
+        return Server(**{**self.server_kwargs, 'options': options})
+
+    def run(self):
+        # Connections must not be shared with the forked workers.
+        db.connections.close_all()
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.processes):
+            self.spawn_worker()
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if pid not in self.workers:
+                continue
+            self.workers.discard(pid)
+            if self._stopping:
+                continue
+            delay = self.get_restart_delay()
+            if delay is None:
+                logger.error(
+                    f'gRPC worker {pid} exited with status {status}, more than {self.max_restarts} '
+                    f'workers crashed within {self.restart_window}s, stopping.'
+                )
+                self.crash_looping = True
+                self.stop()
+                continue
+            logger.warning(f'gRPC worker {pid} exited with status {status}, restarting in {delay}s.')
+            self._sleep(delay)
+            if not self._stopping:
+                self.spawn_worker()
+
+    def get_restart_delay(self):
+        """
+        Record a crash and return the seconds to wait before the restart, or
+        ``None`` when the workers are crash looping.
+        """
+        now = time.monotonic()
+        self._crashes.append(now)
+        while self._crashes[0] < now - self.restart_window:
+            self._crashes.popleft()
+        if len(self._crashes) > self.max_restarts:
+            return None
+        return min(self.restart_delay * 2 ** (len(self._crashes) - 1), self.max_restart_delay)
+
+    def _sleep(self, seconds):
+        # In steps, so that a stop signal is not held up by the backoff.
+        deadline = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < deadline:
+            time.sleep(max(min(deadline - time.monotonic(), 0.1), 0))
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return pid
+        try:
+            self.run_worker()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('gRPC worker failed.')
+            os._exit(1)
+        os._exit(0)
+
+    def run_worker(self):
+        # Interrupts reach the whole process group, the supervisor fans
+        # the shutdown out with SIGTERM instead.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        server = self.get_server()
+        if server.use_async:
+            async def serve():
+                loop = asyncio.get_running_loop()
+                loop.add_signal_handler(
+                    signal.SIGTERM, lambda: loop.create_task(server.stop_async(self.grace))
+                )
+                await server.run_async()
+            asyncio.run(serve())
+        else:
+            signal.signal(signal.SIGTERM, lambda signum, frame: server.stop(self.grace))
+            server.run()
+
+    def _handle_stop(self, signum, frame):
+        if self._stopping:
+            return
+        self._stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.discard(pid)
+
+    def stop(self):
+        self._handle_stop(signal.SIGTERM, None)
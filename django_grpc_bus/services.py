@@ -1,22 +1,91 @@
+import asyncio
+import contextlib
+import inspect
+import logging
+import threading
+import time
 from functools import update_wrapper
 
 import grpc
 from django.db.models.query import QuerySet
 from django import db
 
+from . import deadlines
+from .settings import message_bus_settings
+
+logger = logging.getLogger('django_grpc_bus.services')
+
+# Callables ``observer(service_name, action, count, seconds)`` told the number
+# and the duration of the database queries of every request.
+query_observers = []
+
 
 class Service:
+    # Number of database queries a request is expected to stay within, the
+    # requests running more are logged with a warning.
+    query_budget = None
+    # Database connection handling around the requests, see
+    # ``django_grpc_bus.connections``.
+    connection_policy = message_bus_settings.DB_CONNECTION_POLICY
+    # Keep the deadline of the requests for the clients calling other
+    # servlets and for the database queries, see ``django_grpc_bus.deadlines``.
+    propagate_deadline = True
+    # Unary actions served through ``django_grpc_bus.Batch/Call`` as well,
+    # only the reads by default, see ``django_grpc_bus.batch``.
+    batch_actions = ('retrieve',)
+
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
     @classmethod
-    def as_servicer(cls, **initkwargs):
+    def _get_instance_factory(cls, initkwargs):
+        """
+        Return ``new(request, context, action)`` creating the service
+        instance of a request.  Unless ``__init__()`` is overridden, the
+        instance is created without running it and its attributes are set
+        directly.
+        """
+        if cls.__init__ is not Service.__init__ or cls.__new__ is not object.__new__ or any(
+                hasattr(inspect.getattr_static(cls, key), '__set__') for key in initkwargs):
+            def new(request, context, action):
+                self = cls(**initkwargs)
+                self.request = request
+                self.context = context
+                self.action = action
+                return self
+            return new
+
+        create = object.__new__
+        if not initkwargs:
+            def new(request, context, action):
+                self = create(cls)
+                self.request = request
+                self.context = context
+                self.action = action
+                return self
+            return new
+
+        def new(request, context, action):
+            self = create(cls)
+            self.__dict__.update(initkwargs)
+            self.request = request
+            self.context = context
+            self.action = action
+            return self
+        return new
+
+    @classmethod
+    def as_servicer(cls, descriptor=None, **initkwargs):
         """
         Returns a gRPC servicer instance::
 
             servicer = PostService.as_servicer()
             add_PostControllerServicer_to_server(servicer, server)
+
+        The servicer class gets a handler method per RPC of ``descriptor``
+        (the ``ServiceDescriptor`` of the service), other handlers are built
+        the first time they are looked up.
         """
         for key in initkwargs:
             if not hasattr(cls, key):
@@ -33,32 +102,415 @@ class Service:
                     ' Use `.all()` or call `.get_queryset()` instead.'
                 )
             cls.queryset._fetch_all = force_evaluation
+        new_service = cls._get_instance_factory(initkwargs)
+        connection_policy = initkwargs.get('connection_policy', cls.connection_policy)()
+        service_name = descriptor.full_name if descriptor is not None else cls.__name__
+        propagate_deadline = initkwargs.get('propagate_deadline', cls.propagate_deadline)
+        if propagate_deadline:
+            deadlines.guard_connections()
+
+        def make_handler(action):
+            if not hasattr(cls, action):
+                def handler(servicer, request, context):
+                    return not_implemented(request, context)
+                update_wrapper(handler, not_implemented)
+                return handler
+
+            def handler(servicer, request, context):
+                deadline = deadlines.get_deadline(context) if propagate_deadline else None
+                token = deadlines.set_deadline(deadline, context) if deadline is not None else None
+                connection_policy.request_started()
+                try:
+                    self = new_service(request, context, action)
+                    if self.query_budget is None and not query_observers:
+                        response = getattr(self, action)(request, context)
+                    else:
+                        response = _run_counting_queries(self, service_name, action, request, context)
+                except BaseException as error:
+                    connection_policy.request_finished(error)
+                    raise
+                finally:
+                    if token is not None:
+                        deadlines.reset_deadline(token)
+                if not inspect.isgenerator(response):
+                    connection_policy.request_finished()
+                    return response
+                if deadline is not None:
+                    response = deadlines.iterate_with_deadline(response, deadline, context)
+                return _finish_stream(response, connection_policy)
+            update_wrapper(handler, getattr(cls, action))
+            return handler
 
         class Servicer:
+            def _run_batch(self, action, requests, context, intercept=None):
+                """
+                Run the unary ``action`` for every request in one db
+                connection cycle. Returns a ``(response, item_context)``
+                pair per request, a failed request has no response.
+                ``intercept(behavior)`` wraps the ``behavior(request,
+                context)`` running one request, for the server interceptors.
+                """
+                def behavior(request, item_context):
+                    service = new_service(request, item_context, action)
+                    return getattr(service, action)(request, item_context)
+
+                if intercept is not None:
+                    behavior = intercept(behavior)
+                deadline = deadlines.get_deadline(context) if propagate_deadline else None
+                token = deadlines.set_deadline(deadline, context) if deadline is not None else None
+                connection_policy.request_started()
+                failure = None
+                try:
+                    results = []
+                    for request in requests:
+                        item_context = BatchItemContext(context)
+                        response = None
+                        try:
+                            response = behavior(request, item_context)
+                        except BatchItemAborted:
+                            pass
+                        except Exception as error:  # pylint: disable=broad-except
+                            failure = error
+                            item_context.fail(error)
+                        results.append((response, item_context))
+                except BaseException as error:
+                    connection_policy.request_finished(error)
+                    raise
+                finally:
+                    if token is not None:
+                        deadlines.reset_deadline(token)
+                connection_policy.request_finished(failure)
+                return results
+
             def __getattr__(self, action):
-                if not hasattr(cls, action):
-                    return not_implemented
-
-                def handler(request, context):
-                    # db connection state managed similarly to the wsgi handler
-                    db.reset_queries()
-                    db.close_old_connections()
-                    try:
-                        self = cls(**initkwargs)
-                        self.request = request
-                        self.context = context
-                        self.action = action
-                        return getattr(self, action)(request, context)
-                    finally:
-                        db.close_old_connections()
-                update_wrapper(handler, getattr(cls, action))
-                return handler
+                if action.startswith('__'):
+                    raise AttributeError(action)
+                setattr(Servicer, action, make_handler(action))
+                return getattr(self, action)
+
+        if descriptor is not None:
+            for method in descriptor.methods:
+                setattr(Servicer, method.name, make_handler(method.name))
         update_wrapper(Servicer, cls, updated=())
         return Servicer()
 
+    @classmethod
+    def as_async_servicer(cls, executor=None, descriptor=None, **initkwargs):
+        """
+        Returns a servicer instance for a ``grpc.aio`` server::
+
+            servicer = PostService.as_async_servicer(executor=thread_pool)
+            add_PostControllerServicer_to_server(servicer, server)
+
+        Coroutine and async generator handlers run on the event loop and can
+        use Django's async ORM. Sync handlers run in ``executor``; a streamed
+        response is produced by a single job, so the generator, its database
+        connection and its deadline stay on one thread, and the job waits
+        while the client is slower than the handler.
+        Handlers are built like in :meth:`as_servicer`.
+        """
+        servicer = cls.as_servicer(descriptor=descriptor, **initkwargs)
+        new_service = cls._get_instance_factory(initkwargs)
+        propagate_deadline = initkwargs.get('propagate_deadline', cls.propagate_deadline)
+
+        def set_deadline(context):
+            # Handlers run in a task of their own, the deadline is dropped
+            # with it.  The ORM runs the queries in other threads.
+            deadline = deadlines.get_deadline(context) if propagate_deadline else None
+            if deadline is not None:
+                deadlines.set_deadline(deadline, SyncServicerContext(context, asyncio.get_running_loop()))
+
+        def make_handler(action):
+            if not hasattr(cls, action):
+                async def handler(servicer, request, context):
+                    return await async_not_implemented(request, context)
+                update_wrapper(handler, async_not_implemented)
+                return handler
+
+            method = getattr(cls, action)
+            sync_handler = getattr(servicer, action)
+            if inspect.isasyncgenfunction(method):
+                async def handler(servicer, request, context):
+                    set_deadline(context)
+                    self = new_service(request, context, action)
+                    async for message in getattr(self, action)(request, context):
+                        yield message
+            elif inspect.iscoroutinefunction(method):
+                async def handler(servicer, request, context):
+                    set_deadline(context)
+                    self = new_service(request, context, action)
+                    return await getattr(self, action)(request, context)
+            elif inspect.isgeneratorfunction(method):
+                async def handler(servicer, request, context):
+                    loop = asyncio.get_running_loop()
+                    messages = _stream_in_executor(
+                        executor, sync_handler, SyncRequestIterator.wrap(request, loop),
+                        SyncServicerContext(context, loop)
+                    )
+                    async for message in messages:
+                        yield message
+            else:
+                async def handler(servicer, request, context):
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(
+                        executor, sync_handler, SyncRequestIterator.wrap(request, loop),
+                        SyncServicerContext(context, loop)
+                    )
+            update_wrapper(handler, method)
+            return handler
+
+        class AsyncServicer:
+            def __getattr__(self, action):
+                if action.startswith('__'):
+                    raise AttributeError(action)
+                setattr(AsyncServicer, action, make_handler(action))
+                return getattr(self, action)
+
+        if descriptor is not None:
+            for method in descriptor.methods:
+                setattr(AsyncServicer, method.name, make_handler(method.name))
+        update_wrapper(AsyncServicer, cls, updated=())
+        return AsyncServicer()
+
+
+_STREAM_END = object()
+
+
+async def _stream_in_executor(executor, handler, *args, buffer_size=1):
+    """
+    Runs the generator ``handler(*args)`` from start to end in one
+    ``executor`` job, yielding its messages on the loop. The job blocks
+    while ``buffer_size`` messages wait for the client.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    credits = threading.Semaphore(buffer_size)
+    closed = threading.Event()
+
+    def produce():
+        messages = handler(*args)
+        try:
+            for message in messages:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+                credits.acquire()
+                if closed.is_set():
+                    break
+        finally:
+            # Close on this thread, for the generator's own cleanup.
+            close = getattr(messages, 'close', None)
+            if close is not None:
+                close()
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+    job = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            message = await queue.get()
+            if message is _STREAM_END:
+                break
+            yield message
+            credits.release()
+        await job
+    finally:
+        if not job.done():
+            # The call went away, stop the producer at its next message.
+            closed.set()
+            credits.release()
+            job.add_done_callback(lambda job: job.cancelled() or job.exception())
+
+
+class QueryCounter:
+    """
+    Counts the queries run on the database connections of the current thread
+    while it is active, and the time they took::
+
+        with QueryCounter() as counter:
+            ...
+        print(counter.count, counter.seconds)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def __enter__(self):
+        self._stack = contextlib.ExitStack()
+        for connection in db.connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stack.close()
+        return False
+
+
+def _report_queries(service, service_name, action, counter):
+    if service.query_budget is not None and counter.count > service.query_budget:
+        logger.warning(
+            '%s.%s ran %d queries, over its budget of %d',
+            service.__class__.__name__, action, counter.count, service.query_budget
+        )
+    for observer in query_observers:
+        observer(service_name, action, counter.count, counter.seconds)
+
+
+def _run_counting_queries(service, service_name, action, request, context):
+    """
+    Run the ``action`` of ``service`` counting its queries, a streamed
+    response is counted until its last message.
+    """
+    if inspect.isgeneratorfunction(getattr(service.__class__, action)):
+        def stream():
+            with QueryCounter() as counter:
+                try:
+                    yield from getattr(service, action)(request, context)
+                finally:
+                    _report_queries(service, service_name, action, counter)
+        return stream()
+
+    with QueryCounter() as counter:
+        try:
+            return getattr(service, action)(request, context)
+        finally:
+            _report_queries(service, service_name, action, counter)
+
+
+def _finish_stream(messages, connection_policy):
+    """
+    Yield the streamed response ``messages``, the request is finished after
+    the last message.
+    """
+    error = None
+    try:
+        yield from messages
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        connection_policy.request_finished(error)
+
+
+class BatchItemAborted(Exception):
+    pass
+
+
+class BatchItemContext:
+    """
+    Servicer context of one request of a batch, ``abort()`` fails the
+    request instead of the whole batch.
+    """
+
+    def __init__(self, context):
+        self._context = context
+        self._code = grpc.StatusCode.OK
+        self._details = ''
+
+    def abort(self, code, details='', trailing_metadata=tuple()):
+        self._code = code
+        self._details = details
+        raise BatchItemAborted(details)
+
+    def fail(self, error):
+        """Fail the request with the unexpected ``error``, unless a status was set."""
+        if self._code == grpc.StatusCode.OK:
+            self._code = grpc.StatusCode.UNKNOWN
+        if not self._details:
+            self._details = f'Exception calling application: {error}'
+
+    def code(self):
+        return self._code
+
+    def set_code(self, code):
+        self._code = code
+
+    def details(self):
+        return self._details
+
+    def set_details(self, details):
+        self._details = details
+
+    def __getattr__(self, item):
+        return getattr(self._context, item)
+
+
+class AsyncBatchItemContext(BatchItemContext):
+    """:class:`BatchItemContext` of the ``grpc.aio`` servers."""
+
+    async def abort(self, code, details='', trailing_metadata=tuple()):
+        super().abort(code, details, trailing_metadata)
+
+
+class SyncServicerContext:
+    """
+    Exposes a ``grpc.aio`` servicer context to sync handlers running in a
+    thread pool. Its coroutine methods are run on the server loop and waited
+    for, so ``abort()`` raises in the handler thread like on a sync server.
+    """
+    # The aio servers end the calls on their deadline, the handlers running
+    # past it are stopped without aborting, see ``django_grpc_bus.deadlines``.
+    ends_on_deadline = True
+
+    def __init__(self, context, loop):
+        self._context = context
+        self._loop = loop
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def abort(self, code, details='', trailing_metadata=tuple()):
+        return self._run(self._context.abort(code, details, trailing_metadata))
+
+    def send_initial_metadata(self, initial_metadata):
+        return self._run(self._context.send_initial_metadata(initial_metadata))
+
+    def __getattr__(self, item):
+        return getattr(self._context, item)
+
+
+class SyncRequestIterator:
+    """
+    Iterates the request stream of a ``grpc.aio`` call from a sync handler
+    running in a thread pool, every message is read on the server loop.
+    """
+
+    def __init__(self, request_iterator, loop):
+        self._request_iterator = request_iterator.__aiter__()
+        self._loop = loop
+
+    @classmethod
+    def wrap(cls, request, loop):
+        return cls(request, loop) if hasattr(request, '__aiter__') else request
+
+    def __iter__(self):
+        return self
+
+    async def _read(self):
+        return await self._request_iterator.__anext__()
+
+    def __next__(self):
+        future = asyncio.run_coroutine_threadsafe(self._read(), self._loop)
+        try:
+            return future.result()
+        except StopAsyncIteration:
+            raise StopIteration
+
 
 def not_implemented(request, context):
     """Method not implemented"""
     context.set_code(grpc.StatusCode.UNIMPLEMENTED)
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
+
+
+async def async_not_implemented(request, context):
+    """Method not implemented"""
+    await context.abort(grpc.StatusCode.UNIMPLEMENTED, 'Method not implemented!')
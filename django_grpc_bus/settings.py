@@ -8,10 +8,14 @@ MESSAGE_BUS = {
     'PRODUCER_ROOT': os.path.join(settings.BASE_DIR, 'generated_grpc'),
     'SERVICE_TEMPLATE': os.path.join(Path(__file__).resolve().parent, 'service_template'),
     'HANDLER_TEMPLATE': os.path.join(Path(__file__).resolve().parent, 'handler_template'),
+    'DESCRIPTOR_CACHE_DIR': os.path.join(BASE_DIR, '.grpc_descriptors'),
+    'CLIENT_HOOKS': ['path.to.call_stats'],
+    'CLIENT_HOOK_SAMPLE_RATE': 0.1,
     'SERVLETS': {
         'server1': {
             'host': localhost,
             'port': 50051,
+            'schema_fingerprint': 'release-1.0.2',
         },
         'server2': {
             'host': localhost,
@@ -42,7 +46,19 @@ DEFAULTS = {
     'PRODUCER_ROOT': os.path.join(settings.BASE_DIR, 'generated_grpc'),
     'SERVICE_TEMPLATE': os.path.join(Path(__file__).resolve().parent, 'service_template'),
     'HANDLER_TEMPLATE': os.path.join(Path(__file__).resolve().parent, 'handler_template'),
+    # Default deadline in seconds of the unary calls of the clients, and of
+    # their streaming calls (``None`` for none, the streams may run long).
     'SERVICE_TIMEOUT': 15,
+    'SERVICE_STREAM_TIMEOUT': None,
+    'DESCRIPTOR_CACHE_DIR': None,
+    'DEFAULT_FILTER_BACKENDS': [
+        'django_grpc_bus.filters.LookupFilter',
+        'django_grpc_bus.filters.OrderingFilter',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'django_grpc_bus.pagination.CursorPagination',
+    'DB_CONNECTION_POLICY': 'django_grpc_bus.connections.CloseOldConnections',
+    'CLIENT_HOOKS': [],
+    'CLIENT_HOOK_SAMPLE_RATE': 1.0,
     'SERVLETS': {}
 }
 
@@ -56,6 +72,11 @@ IMPORT_STRINGS = [
     'SERVICE_TEMPLATE',
     'HANDLER_TEMPLATE',
     'SERVICE_TIMEOUT',
+    'SERVICE_STREAM_TIMEOUT',
+    'DEFAULT_FILTER_BACKENDS',
+    'DEFAULT_PAGINATION_CLASS',
+    'DB_CONNECTION_POLICY',
+    'CLIENT_HOOKS',
     'SERVLETS',
 ]
 
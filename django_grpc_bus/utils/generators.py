@@ -38,7 +38,8 @@ class ProtoGenerator:
         generator = generators.ModelProtoGenerator(
             model=model.model,
             field_names=model.fields,
-            package=f'{app_name}'
+            package=f'{app_name}',
+            filter_fields=model.filter_fields,
         )
         proto = generator.get_proto()
         cls.save_proto(
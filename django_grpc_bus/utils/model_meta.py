@@ -1,3 +1,5 @@
+from rest_framework import relations, serializers
+from rest_framework.utils.model_meta import get_field_info
 
 
 def get_model_pk(model):
@@ -11,3 +13,61 @@ def get_model_pk(model):
         rel = pk.remote_field
 
     return pk
+
+
+def has_static_fields(serializer_class):
+    """
+    Whether every instance of ``serializer_class`` has the same fields, which
+    is the case unless ``__init__()`` or ``get_fields()`` is overridden.
+    """
+    return all(
+        getattr(serializer_class, name).__module__.partition('.')[0] in ('rest_framework', 'django_grpc_bus')
+        for name in ('__init__', 'get_fields')
+    )
+
+
+def get_related_lookups(serializer, model, prefix=''):
+    """
+    Return the ``(select_related, prefetch_related)`` lookups needed to
+    serialize instances of ``model`` with ``serializer`` without a query per
+    object.
+
+    Forward and reverse one-to-one relations are followed by
+    ``select_related()`` and to-many relations by ``prefetch_related()``,
+    down into nested serializers.  A prefetched relation that only gives its
+    primary keys is a ``(lookup, related_model)`` pair, to be loaded with
+    ``only('pk')``.  Foreign keys only giving their primary key are read from
+    their column and need no lookup.
+    """
+    select_related, prefetch_related = [], []
+    field_info = get_field_info(model)
+    for field in serializer._readable_fields:
+        source_attrs = getattr(field, 'source_attrs', None)
+        if not source_attrs or source_attrs[0] not in field_info.relations:
+            continue
+        relation = field_info.relations[source_attrs[0]]
+        lookup = prefix + source_attrs[0]
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+
+        if isinstance(nested, serializers.BaseSerializer) and len(source_attrs) == 1:
+            nested_select, nested_prefetch = get_related_lookups(nested, relation.related_model, lookup + '__')
+        else:
+            nested_select, nested_prefetch = [], []
+            if len(source_attrs) == 1 and (
+                    isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None
+                    and not relation.reverse and not relation.to_many):
+                continue
+            if len(source_attrs) == 1 and (
+                    isinstance(field, relations.ManyRelatedField)
+                    and isinstance(field.child_relation, relations.PrimaryKeyRelatedField)):
+                prefetch_related.append((lookup, relation.related_model))
+                continue
+
+        if relation.to_many:
+            prefetch_related.append(lookup)
+            prefetch_related.extend(nested_select)
+        else:
+            select_related.append(lookup)
+            select_related.extend(nested_select)
+        prefetch_related.extend(nested_prefetch)
+    return list(dict.fromkeys(select_related)), list(dict.fromkeys(prefetch_related))
@@ -48,14 +48,18 @@ class BaseSerializable:
 
 
 class Model(BaseSerializable):
-    attrs = ('name', 'fields')
+    attrs = ('name', 'fields', 'filter_fields', 'ordering_fields')
 
     def __init__(self, name, **kwargs):
         self._app_name = kwargs.pop('app_name', None)
+        filter_fields = kwargs.pop('filter_fields', None)
+        ordering_fields = kwargs.pop('ordering_fields', None)
         self._name = name
         self._model = self.get_model(self._app_name, name)
         self._all_fields = [field.name for field in self._model._meta.fields]
         self._fields = self.get_fields(**kwargs)
+        self._filter_fields = self.get_filter_fields(filter_fields)
+        self._ordering_fields = self.get_ordering_fields(ordering_fields)
 
     @staticmethod
     def get_model(app_name, model_name):
@@ -84,6 +88,37 @@ class Model(BaseSerializable):
                     field_list.append(field)
         return field_list
 
+    def get_filter_fields(self, filter_fields=None):
+        """
+        Normalize ``filter_fields`` to a dict of field name -> lookups, a
+        list of field names stands for their ``exact`` lookup.
+        """
+        if not filter_fields:
+            return None
+        if isinstance(filter_fields, (tuple, list)):
+            filter_fields = {field: ['exact'] for field in filter_fields}
+        if not isinstance(filter_fields, dict):
+            raise ValueError(
+                f'Error in configuration of {self._app_name}.{self._name}, '
+                '`filter_fields` must be a list of fields or a dict of fields and lookups.'
+            )
+        result = {}
+        for field, lookups in filter_fields.items():
+            self.model._meta.get_field(field)
+            if isinstance(lookups, str):
+                lookups = [lookups]
+            result[field] = list(lookups or ['exact'])
+        return result
+
+    def get_ordering_fields(self, ordering_fields=None):
+        if not ordering_fields:
+            return None
+        if ordering_fields == '__all__':
+            return list(self.all_fields)
+        for field in ordering_fields:
+            self.model._meta.get_field(field)
+        return list(ordering_fields)
+
     @property
     def model(self):
         return self._model
@@ -92,6 +127,14 @@ class Model(BaseSerializable):
     def fields(self):
         return self._fields
 
+    @property
+    def filter_fields(self):
+        return self._filter_fields
+
+    @property
+    def ordering_fields(self):
+        return self._ordering_fields
+
     @property
     def name(self):
         return self._model.__name__
@@ -10,24 +10,24 @@ setup(
     download_url='https://github.com/rameezarshad/django-grpc-framework/archive/main.zip',
     author='Rameez Arshad',
     author_email='rameez.arshad@outlook.in',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     install_requires=[
         "django>=2.2",
         "djangorestframework>=3.10",
         "grpcio>=1.34.0",
         "grpcio-health-checking>=1.34.0",
         "grpcio-reflection>=1.34.0",
-        "grpcio-tools>=1.34.0",
+        "grpcio-tools>=1.38.0",
         "isort>=5.6.4",
+        "protobuf>=3.15.0",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     zip_safe=False,
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
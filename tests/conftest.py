@@ -0,0 +1,27 @@
+import os
+
+import django
+from django.conf import settings
+
+
+def pytest_configure():
+    settings.configure(
+        BASE_DIR=os.path.dirname(os.path.abspath(__file__)),
+        SECRET_KEY='tests',
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'django_grpc_bus',
+        ],
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            }
+        },
+        USE_TZ=True,
+        MESSAGE_BUS={
+            'SERVLETS': {},
+        },
+    )
+    django.setup()
@@ -0,0 +1,26 @@
+import pytest
+
+from django_grpc_bus.client.client import ServiceClient
+
+
+class Client:
+    def __init__(self, method_names):
+        self.method_names = method_names
+
+    def get_methods_meta(self, service):
+        return dict.fromkeys(self.method_names)
+
+    def get_method_callable(self, service, method):
+        return lambda request=None: (service, method, request)
+
+
+def test_service_client_registers_the_methods():
+    service = ServiceClient(Client(['retrieve', 'list']), 'Post')
+    assert service.method_names == ('retrieve', 'list')
+    assert service.retrieve({'id': 1}) == ('Post', 'retrieve', {'id': 1})
+
+
+@pytest.mark.parametrize('method', ['messages', 'batch', 'client'])
+def test_service_client_rejects_colliding_methods(method):
+    with pytest.raises(ValueError, match=f'Post.{method} collides'):
+        ServiceClient(Client(['retrieve', method]), 'Post')
@@ -0,0 +1,24 @@
+import pytest
+from google.protobuf import descriptor_pb2
+
+from django_grpc_bus.protobuf import json_format
+from django_grpc_bus.protobuf.json_format import MessageView, message_to_dict
+
+
+def test_message_to_dict_includes_default_values():
+    message = descriptor_pb2.EnumValueDescriptorProto(name='A')
+    assert message_to_dict(message) == {'name': 'A', 'number': 0}
+    assert message_to_dict(message, including_default_value_fields=False) == {'name': 'A'}
+
+
+@pytest.mark.parametrize('printer', [None, False])
+def test_message_view_converts_like_message_to_dict(monkeypatch, printer):
+    monkeypatch.setattr(json_format, '_printer', printer)
+    message = descriptor_pb2.EnumDescriptorProto(
+        name='E', value=[descriptor_pb2.EnumValueDescriptorProto(name='A', number=1)]
+    )
+    view = MessageView(message)
+    assert view['name'] == 'E'
+    assert dict(view['value'][0]) == {'name': 'A', 'number': 1}
+    assert 'options' not in view
+    assert dict(view) == view.to_dict()
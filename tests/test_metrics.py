@@ -0,0 +1,60 @@
+import asyncio
+import collections
+
+import grpc
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+from grpc_health.v1._async import HealthServicer
+
+from django_grpc_bus import services
+from django_grpc_bus.metrics import AsyncMetricsInterceptor, MetricsInterceptor, ServerMetrics
+
+
+class _HandlerCallDetails(collections.namedtuple('_HandlerCallDetails', ('method', 'invocation_metadata')),
+                          grpc.HandlerCallDetails):
+    pass
+
+
+def test_async_interceptor_counts_messages_written_by_coroutine_handlers():
+    metrics = ServerMetrics()
+
+    async def main():
+        server = grpc.aio.server(interceptors=[AsyncMetricsInterceptor(metrics, track_queries=False)])
+        health = HealthServicer()
+        health_pb2_grpc.add_HealthServicer_to_server(health, server)
+        port = server.add_insecure_port('127.0.0.1:0')
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f'127.0.0.1:{port}') as channel:
+                stub = health_pb2_grpc.HealthStub(channel)
+                call = stub.Watch(health_pb2.HealthCheckRequest(service=''))
+                first = await call.read()
+                await health.set('', health_pb2.HealthCheckResponse.NOT_SERVING)
+                second = await call.read()
+                call.cancel()
+            return first.status, second.status
+        finally:
+            await server.stop(None)
+
+    statuses = asyncio.run(main())
+
+    assert statuses == (health_pb2.HealthCheckResponse.SERVING, health_pb2.HealthCheckResponse.NOT_SERVING)
+    watch = metrics.snapshot()['methods']['grpc.health.v1.Health/Watch']
+    assert watch['started'] == 1
+    assert watch['in_flight'] == 0
+    assert watch['messages_sent']['count'] == 1
+    assert watch['messages_sent']['sum'] == 2
+
+
+def test_interceptors_track_queries_once_they_serve_a_call():
+    metrics = ServerMetrics()
+    interceptor = MetricsInterceptor(metrics)
+    assert metrics.observe_queries not in services.query_observers
+
+    def continuation(handler_call_details):
+        return grpc.unary_unary_rpc_method_handler(lambda request, context: request)
+
+    try:
+        interceptor.intercept_service(continuation, _HandlerCallDetails('/Item/retrieve', ()))
+        assert metrics.observe_queries in services.query_observers
+    finally:
+        services.query_observers.remove(metrics.observe_queries)
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.db import connection
+
+from django_grpc_bus.mixins import BulkCreateModelMixin
+
+
+class GroupService(BulkCreateModelMixin):
+    def get_queryset(self):
+        return Group.objects.all()
+
+
+@pytest.fixture
+def db():
+    call_command('migrate', verbosity=0)
+    yield
+    Group.objects.all().delete()
+
+
+@pytest.mark.parametrize('can_return_rows', [True, False])
+def test_bulk_create_sets_the_primary_keys(db, monkeypatch, can_return_rows):
+    monkeypatch.setattr(type(connection.features), 'can_return_rows_from_bulk_insert', can_return_rows)
+    permission = Permission.objects.first()
+    serializers = [
+        SimpleNamespace(validated_data={'name': 'a', 'permissions': [permission]}),
+        SimpleNamespace(validated_data={'name': 'b'}),
+    ]
+    objects = GroupService().perform_bulk_create(serializers)
+    assert all(obj.pk is not None for obj in objects)
+    assert [obj.name for obj in objects] == ['a', 'b']
+    assert list(objects[0].permissions.all()) == [permission]
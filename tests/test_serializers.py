@@ -0,0 +1,23 @@
+from google.protobuf import descriptor_pb2
+from rest_framework import serializers
+
+from django_grpc_bus.serializers import ListProtoSerializer, ProtoSerializer
+
+
+class EnumValueProtoSerializer(ProtoSerializer):
+    name = serializers.CharField()
+    number = serializers.IntegerField()
+
+    class Meta:
+        proto_class = descriptor_pb2.EnumValueDescriptorProto
+
+
+def test_many_serializer_validates_a_list_of_messages():
+    messages = [
+        descriptor_pb2.EnumValueDescriptorProto(name='A', number=1),
+        descriptor_pb2.EnumValueDescriptorProto(name='B', number=2),
+    ]
+    serializer = EnumValueProtoSerializer(message=messages, many=True)
+    assert isinstance(serializer, ListProtoSerializer)
+    assert serializer.is_valid(), serializer.errors
+    assert serializer.validated_data == [{'name': 'A', 'number': 1}, {'name': 'B', 'number': 2}]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from concurrent import futures
+
+from django_grpc_bus.connections import BaseConnectionPolicy
+from django_grpc_bus.services import Service, _stream_in_executor
+
+
+def test_sync_stream_runs_on_one_thread():
+    threads = []
+    closed = threading.Event()
+
+    def handler(count):
+        try:
+            for i in range(count):
+                threads.append(threading.get_ident())
+                yield i
+        finally:
+            threads.append(threading.get_ident())
+            closed.set()
+
+    async def main(executor):
+        messages = []
+        async for message in _stream_in_executor(executor, handler, 10):
+            messages.append(message)
+            await asyncio.sleep(0)
+        return messages
+
+    with futures.ThreadPoolExecutor(max_workers=4) as executor:
+        assert asyncio.run(main(executor)) == list(range(10))
+    assert closed.is_set()
+    assert len(set(threads)) == 1
+
+
+def test_sync_stream_is_closed_when_the_call_goes_away():
+    produced = []
+    closed = threading.Event()
+
+    def handler():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    async def main(executor):
+        messages = _stream_in_executor(executor, handler)
+        async for message in messages:
+            if message == 2:
+                break
+        await messages.aclose()
+
+    with futures.ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(main(executor))
+    assert closed.wait(5)
+    # The producer waits for the client, it is at most a message ahead.
+    assert len(produced) <= 5
+
+
+def test_streamed_response_finishes_the_request_after_the_last_message():
+    events = []
+
+    class Policy(BaseConnectionPolicy):
+        def request_started(self):
+            events.append('started')
+
+        def request_finished(self, error=None):
+            events.append(('finished', error))
+
+    class StreamService(Service):
+        def list(self, request, context):
+            for i in range(2):
+                events.append(i)
+                yield i
+
+    class Context:
+        def time_remaining(self):
+            return None
+
+    servicer = StreamService.as_servicer(connection_policy=Policy)
+    messages = servicer.list(None, Context())
+    assert events == ['started']
+    assert list(messages) == [0, 1]
+    assert events == ['started', 0, 1, ('finished', None)]